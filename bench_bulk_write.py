@@ -0,0 +1,121 @@
+"""
+Storing a bulk job's prediction rows: INSERT per row vs COPY in batches.
+
+"row by row" is how single saves work: one INSERT statement per report,
+each committed on its own (autocommit), through the pool.
+"executemany" sends the same INSERT for every row in one transaction.
+"COPY" is src/fApi/bulk_writer.BulkWriter: binary COPY FROM STDIN in batches
+of BATCH_SIZE, one transaction for the job. Rows are compact reports as
+reports.report_record() builds them. Prints rows/s for each.
+
+Needs a PostgreSQL you can write to; the benchmark creates and drops its own
+predictions table in a separate schema. Run from the repository root:
+    BENCH_DATABASE_URL=postgresql://postgres@localhost/postgres python bench_bulk_write.py
+"""
+import asyncio
+import os
+import sys
+import time
+import uuid
+
+import asyncpg
+import numpy as np
+
+from src.fApi import database, report_codec, reports
+from src.fApi.bulk_writer import BulkWriter
+
+DSN = os.getenv("BENCH_DATABASE_URL")
+SCHEMA = "bench_bulk"
+ROWS = 20000
+ROW_BY_ROW_ROWS = 2000  # Enough for a stable rate; the full job would take minutes
+BATCH_SIZE = 5000
+USER = str(uuid.uuid4())
+rng = np.random.default_rng(42)
+
+
+def prediction(i):
+    monthly_ghi = np.round(rng.uniform(90, 200, 12), 2).tolist()
+    monthly_generation = np.round(np.asarray(monthly_ghi) * 11.25, 2).tolist()
+    return reports.report_record(
+        USER,
+        {"latitude": round(8 + i % 2800 / 100, 4), "longitude": round(68 + i % 2900 / 100, 4),
+         "area": 100, "areaUnit": "sqm", "predictionMode": "historical"},
+        {"monthly_ghi": monthly_ghi, "yearly_ghi": round(sum(monthly_ghi), 2),
+         "monthly_generation": monthly_generation, "yearly_generation": round(sum(monthly_generation), 2),
+         "monthly_labels": report_codec.MONTH_LABELS, "state": "DELHI"},
+    )
+
+
+async def setup():
+    conn = await asyncpg.connect(DSN)
+    await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    await conn.execute(f"CREATE SCHEMA {SCHEMA}")
+    await conn.execute(f"""
+        CREATE TABLE {SCHEMA}.predictions (
+            id bigserial PRIMARY KEY, user_id uuid NOT NULL, created_at timestamptz NOT NULL DEFAULT now(),
+            input_data jsonb, result_data jsonb, series bytea
+        )
+    """)
+    await conn.execute(f"CREATE INDEX ON {SCHEMA}.predictions (user_id, created_at DESC, id DESC)")
+    await conn.close()
+
+
+async def teardown():
+    conn = await asyncpg.connect(DSN)
+    await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    await conn.close()
+
+
+async def truncate():
+    async with database.connection() as conn:
+        await conn.execute("TRUNCATE predictions")
+
+
+async def row_by_row(records):
+    for record in records:
+        async with database.connection() as conn:
+            await conn.execute(reports.INSERT_SQL["predictions"], *record)
+
+
+async def executemany(records):
+    async with database.connection() as conn:
+        async with conn.transaction():
+            await conn.executemany(reports.INSERT_SQL["predictions"], records)
+
+
+async def copy(records):
+    async with BulkWriter("predictions", reports.REPORT_COLUMNS, batch_size=BATCH_SIZE, schema_name=SCHEMA) as writer:
+        await writer.write_many(records)
+
+
+async def run(name, write, records):
+    await truncate()
+    start = time.perf_counter()
+    await write(records)
+    rate = len(records) / (time.perf_counter() - start)
+    async with database.connection() as conn:
+        assert await conn.fetchval("SELECT count(*) FROM predictions") == len(records)
+    print(f"{name:<28} {len(records):>6} rows   {rate:10.0f} rows/s")
+    return rate
+
+
+async def main():
+    if not DSN:
+        sys.exit("Set BENCH_DATABASE_URL to a PostgreSQL database the benchmark may create a schema in")
+    records = [prediction(i) for i in range(ROWS)]
+    await setup()
+    await database.open_pool(DSN, min_size=1, max_size=1, server_settings={"search_path": SCHEMA})
+    try:
+        print(f"🧪 Storing a job of compact prediction reports ({len(records[0][3])} B series each)")
+        print("=" * 60)
+        before = await run("row by row (autocommit)", row_by_row, records[:ROW_BY_ROW_ROWS])
+        await run("executemany, one transaction", executemany, records)
+        after = await run(f"COPY, batches of {BATCH_SIZE}", copy, records)
+        print(f"COPY vs row by row: {after / before:.0f}x")
+    finally:
+        await database.close_pool()
+        await teardown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,110 @@
+"""
+Profile-query latency under concurrent load: a connection per request vs the pool.
+
+"before" is the original handler body: connect, one SELECT by id, close.
+"after" goes through src/fApi/database.fetch_profile(): a pooled asyncpg
+connection and the prepared statement cached on it. Both run CONCURRENCY
+requests at a time and report p50/p99 per request; the upsert is timed too.
+
+Needs a PostgreSQL you can write to; the benchmark creates and drops its own
+profiles table in a separate schema. Run from the repository root:
+    BENCH_DATABASE_URL=postgresql://postgres@localhost/postgres python bench_db_pool.py
+"""
+import asyncio
+import os
+import sys
+import time
+import uuid
+
+import asyncpg
+import numpy as np
+
+from src.fApi import database
+
+DSN = os.getenv("BENCH_DATABASE_URL")
+SCHEMA = "bench_profiles"
+CONCURRENCY = 32
+REQUESTS = 2000
+POOL_SIZE = 10
+USERS = [str(uuid.uuid4()) for _ in range(100)]
+
+
+async def setup():
+    conn = await asyncpg.connect(DSN)
+    await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    await conn.execute(f"CREATE SCHEMA {SCHEMA}")
+    await conn.execute(f"""
+        CREATE TABLE {SCHEMA}.profiles (
+            id uuid PRIMARY KEY, first_name text, last_name text, number text,
+            password text, is_social_login boolean
+        )
+    """)
+    await conn.executemany(f"INSERT INTO {SCHEMA}.profiles VALUES ($1, 'Asha', 'Rao', '9999999999', NULL, true)",
+                           [(user,) for user in USERS])
+    await conn.close()
+
+
+async def teardown():
+    conn = await asyncpg.connect(DSN)
+    await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    await conn.close()
+
+
+async def connect_per_request(i):
+    conn = await asyncpg.connect(DSN, server_settings={"search_path": SCHEMA})
+    await conn.fetchrow(database.FETCH_PROFILE, USERS[i % len(USERS)])
+    await conn.close()
+
+
+async def pooled_lookup(i):
+    await database.fetch_profile(USERS[i % len(USERS)])
+
+
+async def pooled_upsert(i):
+    await database.upsert_profile(USERS[i % len(USERS)], "Asha", "Rao", "9999999999", None, True)
+
+
+async def run(name, request):
+    limit = asyncio.Semaphore(CONCURRENCY)
+    latencies = []
+
+    async def timed(i):
+        async with limit:
+            start = time.perf_counter()
+            await request(i)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(timed(i) for i in range(REQUESTS)))
+    elapsed = time.perf_counter() - start
+    p50, p99 = np.percentile(np.array(latencies) * 1000, [50, 99])
+    print(f"{name:<26} p50 {p50:7.2f} ms   p99 {p99:7.2f} ms   {REQUESTS / elapsed:8.0f} req/s")
+    return p99
+
+
+async def main():
+    if not DSN:
+        sys.exit("Set BENCH_DATABASE_URL to a PostgreSQL database the benchmark may create a schema in")
+    await setup()
+    try:
+        print(f"🧪 {REQUESTS} profile requests, {CONCURRENCY} at a time")
+        print("=" * 72)
+        before = await run("connect per request", connect_per_request)
+        # Default DB_POOL_MIN: the pool must keep what it grew to under load,
+        # not fall back to min_size and reconnect (as a min=max setup would hide)
+        await database.open_pool(DSN, max_size=POOL_SIZE, server_settings={"search_path": SCHEMA})
+        try:
+            after = await run(f"pool (up to {POOL_SIZE} connections)", pooled_lookup)
+            await run("pool, upsert", pooled_upsert)
+            pool = await database.get_pool()
+            print(f"connections kept open after the load: {pool.get_size()} of {POOL_SIZE} "
+                  f"(min_size {database.MIN_SIZE})")
+        finally:
+            await database.close_pool()
+        print(f"p99 improvement: {before / after:.1f}x")
+    finally:
+        await teardown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
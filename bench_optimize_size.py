@@ -0,0 +1,80 @@
+"""
+Response time of /optimize-size for 1,000 candidate capacities.
+
+Reports the end-to-end request time (in-process, through the ASGI app) and the
+solver on its own, next to the same grid evaluated one candidate at a time.
+Needs the GHI model and state boundaries; run from the repository root:
+    python bench_optimize_size.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, "src/model")
+os.environ.setdefault("LOG_LEVEL", "WARNING")  # One "completed" record per request would drown the output
+
+import api  # noqa: E402
+import lifetime  # noqa: E402
+import sizing  # noqa: E402
+from tariffs import get_tariff  # noqa: E402
+
+CANDIDATES = 1000
+REPEAT = 20
+REQUEST = {
+    "latitude": 28.6139,
+    "longitude": 77.2090,
+    "roof_area": 1000,
+    "area_unit": "sqft",
+    "monthly_consumption": [300, 280, 350, 450, 550, 600, 520, 480, 450, 380, 320, 310],
+    "candidates": CANDIDATES,
+}
+
+
+def best_ms(fn, repeat=REPEAT):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000, float(np.median(times)) * 1000
+
+
+def main():
+    api.load_models()
+    client = TestClient(api.app)
+    state = api.state_lookup.get_state_from_coords(REQUEST["latitude"], REQUEST["longitude"])
+    tariff = get_tariff(state)
+    capacity = api.resolve_capacity(state, api.area_in_square_meters(REQUEST["roof_area"], REQUEST["area_unit"]))
+    monthly_ghi, _ = api.model.predict(REQUEST["latitude"], REQUEST["longitude"])
+    per_kw = api.generation_from_ghi(monthly_ghi, 1.0)
+    consumption = REQUEST["monthly_consumption"]
+    max_capacity = capacity["final_allowed_capacity"]
+
+    def endpoint():
+        response = client.post("/optimize-size", json=REQUEST)
+        assert response.status_code == 200, response.text
+
+    def solver():
+        sizing.optimize_capacity(per_kw, consumption, tariff, max_capacity, candidates=CANDIDATES)
+
+    def one_at_a_time():
+        for kw in np.linspace(max_capacity / CANDIDATES, max_capacity, CANDIDATES):
+            lifetime.simulate_lifetime(per_kw * kw, consumption, tariff, kw * lifetime.COST_PER_KW)
+
+    endpoint()
+    optimal = client.post("/optimize-size", json=REQUEST).json()["optimal"]
+    print(f"🧪 /optimize-size, {CANDIDATES} candidates up to {max_capacity:.2f} kW ({state})")
+    print(f"   optimal: {optimal['capacity_kw']:.3f} kW, NPV ₹{optimal['npv']:,.0f}, payback {optimal['payback_years']:.1f} years")
+    print("=" * 60)
+    for name, fn, repeat in [("endpoint (end-to-end)", endpoint, REPEAT),
+                             ("solver (grid + refine)", solver, REPEAT),
+                             ("one candidate at a time", one_at_a_time, 3)]:
+        best, median = best_ms(fn, repeat)
+        print(f"{name:<26} best: {best:8.2f} ms  median: {median:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Per-worker memory of the pre-forked model API (src/model/serve.py).
+
+Starts the launcher with 1..16 workers, warms every worker with a few
+predictions and reports each worker's unique set size (USS: pages private to
+that process) and proportional set size (PSS) from /proc/<pid>/smaps_rollup.
+Linux only. Run from the repository root:
+    python bench_prefork_memory.py
+"""
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import requests
+
+WORKER_COUNTS = [1, 2, 4, 8, 16]
+PORT = 8011
+URL = f"http://127.0.0.1:{PORT}"
+PAYLOAD = {"latitude": 28.6139, "longitude": 77.2090, "roof_area": 100, "area_unit": "sqm"}
+
+
+def read_rollup_kb(pid):
+    """Return {field: kB} from /proc/<pid>/smaps_rollup"""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return fields
+
+
+def child_pids(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(p) for p in f.read().split()]
+
+
+def wait_until_serving(timeout=300):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            requests.post(f"{URL}/get-state", json={"latitude": 28.6, "longitude": 77.2}, timeout=2)
+            return True
+        except requests.RequestException:
+            time.sleep(0.5)
+    return False
+
+
+def measure(workers):
+    master = subprocess.Popen(
+        [sys.executable, os.path.join("src", "model", "serve.py"),
+         "--workers", str(workers), "--port", str(PORT), "--host", "127.0.0.1"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        if not wait_until_serving():
+            raise RuntimeError("launcher did not start serving")
+        # Enough requests that every worker has scored at least once
+        for _ in range(workers * 8):
+            requests.post(f"{URL}/predict", json=PAYLOAD, timeout=30)
+
+        children = child_pids(master.pid)
+        rollups = [read_rollup_kb(pid) for pid in children]
+        uss = [r["Private_Clean"] + r["Private_Dirty"] for r in rollups]
+        pss = [r["Pss"] for r in rollups]
+        master_rss = read_rollup_kb(master.pid)["Rss"]
+        return master_rss, uss, pss
+    finally:
+        master.send_signal(signal.SIGTERM)
+        master.wait(timeout=30)
+
+
+def main():
+    print("🧪 Pre-fork memory benchmark (kB)")
+    print("=" * 72)
+    print(f"{'workers':>7} | {'master RSS':>10} | {'mean USS/worker':>15} | {'max USS':>9} | {'total PSS':>10}")
+    print("-" * 72)
+    for workers in WORKER_COUNTS:
+        master_rss, uss, pss = measure(workers)
+        print(f"{workers:>7} | {master_rss:>10} | {sum(uss) / len(uss):>15.0f} | {max(uss):>9} | {sum(pss):>10}")
+
+
+if __name__ == "__main__":
+    main()
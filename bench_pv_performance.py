@@ -0,0 +1,59 @@
+"""
+Full-year hourly (8760) generation with the POA/temperature PV model.
+
+Times pv_performance.pv_generation() for one site and for batches of sites in
+one call, next to the constant efficiency factor it replaces, and reports how
+far the two yearly totals are apart. Synthetic weather, no data files needed.
+Run from the repository root:
+    python bench_pv_performance.py
+"""
+import timeit
+
+import numpy as np
+
+from src.model import hourly, pv_performance
+from src.model.api import PANEL_AREA_PER_KW, SYSTEM_EFFICIENCY, generation_from_ghi
+
+rng = np.random.default_rng(42)
+CAPACITY_KW = 5.0
+BATCHES = [1, 10, 100, 1000]
+
+
+def synthetic_sites(n):
+    lat = rng.uniform(8, 34, n)
+    lon = rng.uniform(68, 97, n)
+    monthly_ghi = rng.uniform(100, 200, (n, 12))
+    ghi = hourly.disaggregate_monthly(monthly_ghi, hourly.sun_elevation_factor(lat, lon))
+    # Diurnal temperature swing peaking mid-afternoon
+    air_temperature = 25 + 8 * np.sin(2 * np.pi * (hourly.HOUR_OF_DAY - 9) / 24) + rng.uniform(-5, 5, (n, 1))
+    wind_speed = rng.uniform(0.5, 5, (n, hourly.HOURS))
+    return lat, lon, ghi, air_temperature, wind_speed
+
+
+def per_call_ms(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number * 1000
+
+
+def main():
+    print("🧪 Full-year hourly generation (8760 hours per site)")
+    print("=" * 72)
+    for n in BATCHES:
+        lat, lon, ghi, air_temperature, wind_speed = synthetic_sites(n)
+        array_kw = CAPACITY_KW * PANEL_AREA_PER_KW * SYSTEM_EFFICIENCY
+
+        def poa_model():
+            return pv_performance.pv_generation(lat, lon, ghi, air_temperature, wind_speed, array_kw)
+
+        def constant_factor():
+            return generation_from_ghi(ghi, CAPACITY_KW)
+
+        number = max(1, 100 // n)
+        poa_ms = per_call_ms(poa_model, number)
+        constant_ms = per_call_ms(constant_factor, number)
+        difference = (poa_model().sum(axis=-1) / constant_factor().sum(axis=-1) - 1) * 100
+        print(f"{n:>5} site(s)  POA model: {poa_ms:9.2f} ms ({poa_ms / n:6.2f} ms/site)  "
+              f"constant: {constant_ms:7.2f} ms  yearly kWh {difference.mean():+.1f}%")
+
+
+if __name__ == "__main__":
+    main()
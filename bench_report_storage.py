@@ -0,0 +1,154 @@
+"""
+Saved-report storage: JSON as the client saved it vs compact float32 series.
+
+"json" is what the profile page used to insert: input_data and result_data
+as JSON, series and labels included. "compact" is src/fApi/report_codec.py:
+the same JSON without series and derivable labels, plus the packed blob.
+Reports mirror what PredictionPage/TariffPage save (a historical and a
+realtime prediction, and a financial analysis built on a realtime one).
+
+Reports bytes per row and the CPU cost of the write path (encode) and the
+read path (decode). With BENCH_DATABASE_URL set, it also inserts and reads
+back ROWS reports of each kind in a scratch schema and reports rows/s and
+table size on disk. Run from the repository root:
+    python bench_report_storage.py
+    BENCH_DATABASE_URL=postgresql://postgres@localhost/postgres python bench_report_storage.py
+"""
+import asyncio
+import json
+import os
+import timeit
+from datetime import date, timedelta
+
+import numpy as np
+
+from src.fApi import report_codec
+
+N = 20000
+ROWS = 5000
+SCHEMA = "bench_reports"
+DSN = os.getenv("BENCH_DATABASE_URL")
+rng = np.random.default_rng(42)
+
+
+def series(n, low, high):
+    return np.round(rng.uniform(low, high, n), 2).tolist()
+
+
+def historical():
+    monthly_ghi, monthly_generation = series(12, 90, 200), series(12, 1500, 3000)
+    return (
+        {"latitude": "28.6139", "longitude": "77.2090", "area": "100", "areaUnit": "sqm",
+         "predictionMode": "historical", "temperature": "", "windSpeed": "", "startDate": ""},
+        {"monthly_ghi": monthly_ghi, "yearly_ghi": round(sum(monthly_ghi), 2),
+         "monthly_generation": monthly_generation, "yearly_generation": round(sum(monthly_generation), 2),
+         "monthly_labels": report_codec.MONTH_LABELS, "state": "DELHI", "co2_saved_yearly": 15917.43,
+         "co2_saved_25_years": 397935.65, "trees_equivalent": 795.9, "water_saved": 73569.57, "coal_saved": 7764.6},
+    )
+
+
+def realtime():
+    daily_ghi, daily_generation = series(30, 3, 7), series(30, 40, 90)
+    return (
+        {"latitude": "28.6139", "longitude": "77.2090", "area": "100", "areaUnit": "sqm",
+         "predictionMode": "realtime", "temperature": "", "windSpeed": "", "startDate": "2025-05-01"},
+        {"daily_ghi": daily_ghi, "total_ghi": round(sum(daily_ghi), 2),
+         "daily_generation": daily_generation, "total_generation": round(sum(daily_generation), 2),
+         "daily_labels": [(date(2025, 5, 1) + timedelta(days=i)).isoformat() for i in range(30)],
+         "weather_source": "openweather", "forecast_days": 5, "state": "DELHI",
+         "co2_saved_monthly": 1226.46, "trees_equivalent": 61.3, "water_saved": 5668.62, "coal_saved": 598.27},
+    )
+
+
+def financial():
+    _, prediction = realtime()
+    return (
+        {"state": "DELHI", "unitsConsumed": "300", "selectedMonth": 0, "isHistorical": False, "isRealtime": True,
+         "monthly_generation": None, "daily_generation": prediction["daily_generation"],
+         "yearly_generation": prediction["total_generation"]},
+        {"billSavings": 1812.5, "exportIncome": 0, "exportAllowed": True, "tariff": 3.5,
+         "policy": "Net metering up to 500 kW", "metering": "Net", "state": "DELHI", "produced": 1900.2,
+         "consumed": 300, "month": "Current Month", "originalBill": 2100, "newBill": 287.5},
+    )
+
+
+def dumps(value):
+    return json.dumps(value, separators=(",", ":"))
+
+
+def json_write(report):
+    return dumps(report[0]), dumps(report[1])
+
+
+def compact_write(report):
+    input_data, result_data, blob = report_codec.compact(*report)
+    return dumps(input_data), dumps(result_data), blob
+
+
+def json_read(stored):
+    return json.loads(stored[0]), json.loads(stored[1])
+
+
+def compact_read(stored):
+    return report_codec.expand(json.loads(stored[0]), json.loads(stored[1]), stored[2])
+
+
+def size(stored):
+    return sum(len(part.encode() if isinstance(part, str) else part) for part in stored)
+
+
+def per_call_us(fn):
+    return min(timeit.repeat(fn, number=N, repeat=3)) / N * 1e6
+
+
+async def database_throughput(name, report):
+    import asyncpg  # type: ignore
+
+    conn = await asyncpg.connect(DSN)
+    await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    await conn.execute(f"CREATE SCHEMA {SCHEMA}")
+    try:
+        for layout, write, read in (("json", json_write, json_read), ("compact", compact_write, compact_read)):
+            table = f"{SCHEMA}.{layout}"
+            await conn.execute(f"CREATE TABLE {table} (id bigserial PRIMARY KEY, input_data jsonb, "
+                               f"result_data jsonb, series bytea)")
+            rows = [write(report) for _ in range(ROWS)]
+            columns, values = ("input_data, result_data, series", "$1, $2, $3") if layout == "compact" \
+                else ("input_data, result_data", "$1, $2")
+            start = asyncio.get_running_loop().time()
+            await conn.executemany(f"INSERT INTO {table} ({columns}) VALUES ({values})", rows)
+            write_s = asyncio.get_running_loop().time() - start
+            start = asyncio.get_running_loop().time()
+            for row in await conn.fetch(f"SELECT input_data, result_data, series FROM {table}"):
+                read((row["input_data"], row["result_data"], row["series"]))
+            read_s = asyncio.get_running_loop().time() - start
+            on_disk = await conn.fetchval(f"SELECT pg_total_relation_size('{table}')")
+            print(f"  {name:<11} {layout:<8} write {ROWS / write_s:8.0f} rows/s   read {ROWS / read_s:8.0f} rows/s"
+                  f"   {on_disk / ROWS:6.0f} bytes/row on disk")
+    finally:
+        await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await conn.close()
+
+
+def main():
+    reports = {"historical": historical(), "realtime": realtime(), "financial": financial()}
+    print(f"🧪 Saved report storage, best of 3 x {N} calls")
+    print("=" * 78)
+    for name, report in reports.items():
+        stored_json, stored_compact = json_write(report), compact_write(report)
+        assert compact_read(stored_compact) == json_read(stored_json)
+        before, after = size(stored_json), size(stored_compact)
+        print(f"{name:<11} {before:5d} -> {after:4d} bytes ({before / after:.1f}x)   "
+              f"write {per_call_us(lambda: json_write(report)):5.1f} -> {per_call_us(lambda: compact_write(report)):5.1f} µs   "
+              f"read {per_call_us(lambda: json_read(stored_json)):5.1f} -> "
+              f"{per_call_us(lambda: compact_read(stored_compact)):5.1f} µs")
+    if DSN:
+        print(f"PostgreSQL, {ROWS} rows per table")
+        for name, report in reports.items():
+            asyncio.run(database_throughput(name, report))
+    else:
+        print("(set BENCH_DATABASE_URL to also measure PostgreSQL throughput and size on disk)")
+
+
+if __name__ == "__main__":
+    main()
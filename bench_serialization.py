@@ -0,0 +1,104 @@
+"""
+Serialization time per prediction response, before and after the fast path.
+
+"before" is the previous handler tail: per-element float(round(...)) list
+comprehensions, a fully validated Pydantic model, FastAPI's response_model
+re-validation and jsonable_encoder + json.dumps.
+"after" is the current one: NumPy rounding, model_construct() and orjson.
+Run from the repository root:
+    python bench_serialization.py
+"""
+import json
+import timeit
+from datetime import datetime, timedelta
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+
+from src.model.api import PredictionResponse, RealtimePredictionResponse
+from src.model.responses import ORJSONResponse, round_array
+
+N = 20000
+rng = np.random.default_rng(42)
+# The models return float32, exactly like these
+monthly_ghi = rng.uniform(90, 200, 12).astype(np.float32)
+daily_ghi = rng.uniform(3, 7, 30).astype(np.float32)
+capacity = 10.0 * 10 * 0.15 * 0.75
+labels = [(datetime(2024, 5, 1) + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(30)]
+scalars = dict(co2_saved_yearly=15917.43, co2_saved_25_years=397935.65, trees_equivalent=795.9,
+               water_saved=73569.57, coal_saved=7764.6)
+realtime_scalars = dict(co2_saved_monthly=1226.46, trees_equivalent=61.3, water_saved=5668.62, coal_saved=598.27)
+
+
+def predict_before():
+    generation = [ghi * capacity for ghi in monthly_ghi]
+    model = PredictionResponse(
+        monthly_ghi=[float(round(ghi, 2)) for ghi in monthly_ghi],
+        yearly_ghi=float(np.mean(monthly_ghi) * 12),
+        monthly_generation=[float(round(gen, 2)) for gen in generation],
+        yearly_generation=float(round(sum(generation), 2)),
+        state="DELHI",
+        **scalars,
+    )
+    validated = PredictionResponse.model_validate(model.model_dump())
+    return json.dumps(jsonable_encoder(validated)).encode()
+
+
+def predict_after():
+    ghi = np.asarray(monthly_ghi, dtype=np.float64)
+    generation = ghi * capacity
+    return ORJSONResponse(dict(PredictionResponse.model_construct(
+        monthly_ghi=round_array(ghi),
+        yearly_ghi=float(ghi.mean() * 12),
+        monthly_generation=round_array(generation),
+        yearly_generation=round(float(generation.sum()), 2),
+        state="DELHI",
+        **scalars,
+    ))).body
+
+
+def realtime_before():
+    generation = [ghi * capacity for ghi in daily_ghi]
+    model = RealtimePredictionResponse(
+        daily_ghi=[float(round(ghi, 2)) for ghi in daily_ghi],
+        total_ghi=float(sum(daily_ghi)),
+        daily_generation=[float(round(gen, 2)) for gen in generation],
+        total_generation=float(round(sum(generation), 2)),
+        daily_labels=labels,
+        state="DELHI",
+        **realtime_scalars,
+    )
+    validated = RealtimePredictionResponse.model_validate(model.model_dump())
+    return json.dumps(jsonable_encoder(validated)).encode()
+
+
+def realtime_after():
+    ghi = np.asarray(daily_ghi, dtype=np.float64)
+    generation = ghi * capacity
+    return ORJSONResponse(dict(RealtimePredictionResponse.model_construct(
+        daily_ghi=round_array(ghi),
+        total_ghi=float(ghi.sum()),
+        daily_generation=round_array(generation),
+        total_generation=round(float(generation.sum()), 2),
+        daily_labels=labels,
+        state="DELHI",
+        **realtime_scalars,
+    ))).body
+
+
+def per_call_us(fn):
+    return min(timeit.repeat(fn, number=N, repeat=3)) / N * 1e6
+
+
+def main():
+    print(f"🧪 Response serialization, best of 3 x {N} calls")
+    print("=" * 60)
+    for name, before, after in [("/predict", predict_before, predict_after),
+                                ("/predict-realtime", realtime_before, realtime_after)]:
+        assert json.loads(before()).keys() == json.loads(after()).keys()
+        b, a = per_call_us(before), per_call_us(after)
+        print(f"{name:<18} before: {b:7.1f} µs  after: {a:7.1f} µs  ({b / a:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Sun position and clear-sky irradiance for a year of hours x many sites.
+
+Times solar_geometry.hourly_geometry() with a cold cache (every grid cell
+computed, in one vectorized call) and a warm one (tables reused), next to the
+uncached solar_position() + clear_sky() it replaces. Run from the repository
+root:
+    python bench_solar_geometry.py
+"""
+import time
+
+import numpy as np
+
+from src.model import solar_geometry
+
+rng = np.random.default_rng(42)
+SITES = [100, 1000, 5000]
+
+
+def elapsed_ms(fn):
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    print("🧪 Solar geometry + clear sky, 8760 hours per site")
+    print("=" * 72)
+    for n in SITES:
+        lat = rng.uniform(8, 34, n)
+        lon = rng.uniform(68, 97, n)
+        solar_geometry._cache = solar_geometry.GeometryCache(max_cells=n)
+
+        def uncached():
+            sun = solar_geometry.solar_position(lat, lon)
+            return solar_geometry.clear_sky(sun["cos_zenith"])
+
+        def cached():
+            return solar_geometry.hourly_geometry(lat, lon)
+
+        direct_ms = elapsed_ms(uncached)
+        cold_ms = elapsed_ms(cached)
+        warm_ms = min(elapsed_ms(cached) for _ in range(3))
+        print(f"{n:>5} sites  direct: {direct_ms:8.0f} ms  cold cache: {cold_ms:8.0f} ms  "
+              f"warm cache: {warm_ms:8.0f} ms  ({solar_geometry.cache_info()['cells']} cells)")
+
+
+if __name__ == "__main__":
+    main()
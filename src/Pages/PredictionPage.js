@@ -46,14 +46,14 @@ const PredictionPage = () => {
     }
 
     // Additional validation for real-time mode
-    if (predictionMode === 'realtime' && (!temperature || !windSpeed || !startDate)) {
-      setError('Please provide all required fields for real-time prediction.');
+    if (predictionMode === 'realtime' && !startDate) {
+      setError('Please provide a start date for real-time prediction.');
       setIsLoading(false);
       return;
     }
 
     try {
-      let endpoint = predictionMode === 'historical' ? 'predict' : 'predict-realtime';
+      let endpoint = predictionMode === 'historical' ? 'analyze' : 'predict-realtime';
       let requestData = {
         latitude: parseFloat(latitude),
         longitude: parseFloat(longitude),
@@ -61,14 +61,16 @@ const PredictionPage = () => {
         area_unit: areaUnit
       };
 
-      // Add real-time specific data
+      // Add real-time specific data: the fetched forecast if any, else the
+      // entered values; with neither, the backend fetches the forecast itself
       if (predictionMode === 'realtime') {
-        requestData = {
-          ...requestData,
-          temperature: parseFloat(temperature),
-          wind_speed: parseFloat(windSpeed),
-          start_date: startDate
-        };
+        requestData = { ...requestData, start_date: startDate };
+        if (weatherForecast && weatherForecast.length > 0) {
+          requestData.forecast = weatherForecast;
+        } else if (temperature && windSpeed) {
+          requestData.temperature = parseFloat(temperature);
+          requestData.wind_speed = parseFloat(windSpeed);
+        }
       }
 
       console.log(`Sending request to ${endpoint} with data:`, requestData);
@@ -76,33 +78,15 @@ const PredictionPage = () => {
       const response = await axios.post(`http://localhost:8001/${endpoint}`, requestData);
 
       console.log('API Response:', response.data);
-      // Log the detected state and capacity details
-      if (response.data && response.data.state) {
-        // These values are not in the response, so we recalculate them here for logging
-        const state = response.data.state;
-        const area_in_sqm = requestData.area_unit === 'sqft' ? requestData.roof_area * 0.092903 : requestData.roof_area;
-        const max_possible_capacity = area_in_sqm / 10;
-        // State cap mapping (should match backend)
-        const STATE_CAPACITY_LIMITS = {
-          'andhra pradesh': 1000, 'assam': 500, 'bihar': 1000, 'chhattisgarh': 500, 'goa': 500, 'gujarat': 1000, 'haryana': 500, 'himachal pradesh': 500, 'jammu & kashmir': 1000, 'jharkhand': 500, 'karnataka': 500, 'kerala': 1000, 'madhya pradesh': 500, 'maharashtra': 5000, 'manipur': 10, 'meghalaya': 500, 'mizoram': 10, 'nagaland': 500, 'odisha': 500, 'punjab': 500, 'rajasthan': 1000, 'sikkim': 500, 'tamil nadu': 500, 'telangana': 1000, 'tripura': 500, 'uttar pradesh': 1000, 'uttarakhand': 1000, 'west bengal': 500, 'delhi': 10000, 'chandigarh': 500, 'andaman & nicobar': 500, 'dadra & nagar haveli & diu': 500, 'ladakh': 1000, 'lakshadweep': 500, 'puducherry': 500,
-        };
-        let key = state.trim().toLowerCase();
-        if (!(key in STATE_CAPACITY_LIMITS)) {
-          // Try partial match
-          for (const k in STATE_CAPACITY_LIMITS) {
-            if (k.includes(key) || key.includes(k)) {
-              key = k;
-              break;
-            }
-          }
-        }
-        const state_cap = STATE_CAPACITY_LIMITS[key] || 500;
-        const final_allowed_capacity = Math.min(state_cap, max_possible_capacity);
-        console.log(`State: ${state}`);
-        console.log(`Roof area: ${area_in_sqm} sqm`);
+      // Log the detected state and capacity details (computed by the backend for /analyze)
+      if (response.data && response.data.capacity) {
+        const { max_possible_capacity, state_cap, final_allowed_capacity, limited_by } = response.data.capacity;
+        console.log(`State: ${response.data.state}`);
         console.log(`State cap: ${state_cap} kW`);
         console.log(`Max possible capacity: ${max_possible_capacity} kW`);
-        console.log(`Final allowed capacity: ${final_allowed_capacity} kW`);
+        console.log(`Final allowed capacity: ${final_allowed_capacity} kW (limited by ${limited_by})`);
+      } else if (response.data && response.data.state) {
+        console.log(`State: ${response.data.state}`);
       } else {
         console.log('No state detected in API response.');
       }
@@ -331,7 +315,7 @@ const PredictionPage = () => {
                     <input
                       type="date"
                       value={startDate}
-                      onChange={e => setStartDate(e.target.value)}
+                      onChange={e => { setStartDate(e.target.value); setWeatherForecast(null); }}
                       className="w-full px-4 py-3 border-2 border-gray-200 rounded-lg text-base bg-gray-50 text-gray-800 outline-none focus:border-purple-500 focus:shadow-purple-100"
                     />
                   </div>
@@ -381,7 +365,7 @@ const PredictionPage = () => {
                   <div className="flex gap-8">
                     <div className="flex-1 flex flex-col gap-2">
                       <label className="font-poppins text-base text-purple-500 font-medium mb-0.5">
-                        Temperature (°C)
+                        Temperature (°C) <span className="text-gray-500 text-sm">(optional)</span>
                       </label>
                       <input
                         type="number"
@@ -393,7 +377,7 @@ const PredictionPage = () => {
                     </div>
                     <div className="flex-1 flex flex-col gap-2">
                       <label className="font-poppins text-base text-purple-500 font-medium mb-0.5">
-                        Wind Speed (m/s)
+                        Wind Speed (m/s) <span className="text-gray-500 text-sm">(optional)</span>
                       </label>
                       <input
                         type="number"
@@ -562,8 +546,8 @@ const PredictionPage = () => {
               <button
                 className="bg-blue-600 hover:bg-blue-700 text-white font-semibold py-3 px-6 rounded-lg shadow-md transition-colors duration-200 flex items-center space-x-2"
                 onClick={async () => {
-                  const { data: { user } } = await supabase.auth.getUser();
-                  if (!user) {
+                  const { data: { session } } = await supabase.auth.getSession();
+                  if (!session) {
                     alert('Please log in to save your prediction.');
                     return;
                   }
@@ -578,15 +562,21 @@ const PredictionPage = () => {
                     startDate
                   };
                   const resultData = predictionResults;
-                  const { error } = await supabase
-                    .from('predictions')
-                    .insert([
-                      {
-                        user_id: user.id,
-                        input_data: inputData,
-                        result_data: resultData,
-                      }
-                    ]);
+                  // Saved through the profile service, which stores the series compactly
+                  let error = null;
+                  try {
+                    const response = await fetch('http://localhost:8000/api/reports/predictions', {
+                      method: 'POST',
+                      headers: {
+                        'Content-Type': 'application/json',
+                        Authorization: `Bearer ${session.access_token}`,
+                      },
+                      body: JSON.stringify({ input_data: inputData, result_data: resultData }),
+                    });
+                    if (!response.ok) error = new Error((await response.json()).detail || response.statusText);
+                  } catch (e) {
+                    error = e;
+                  }
                   if (error) {
                     alert('Failed to save prediction: ' + error.message);
                   } else {
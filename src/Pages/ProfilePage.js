@@ -6,9 +6,24 @@ import jsPDF from 'jspdf';
 import html2canvas from 'html2canvas';
 import FinancialAnalysisResultView from '../components/FinancialAnalysisResultView';
 
+const REPORTS_API = 'http://localhost:8000/api/reports';
+const PAGE_SIZE = 20;
+
+// Summary rows, one page at a time; the full report is fetched when it is opened
+const fetchReports = async (token, kind, path = '', params = '') => {
+  const response = await fetch(`${REPORTS_API}/${kind}${path}${params}`, {
+    headers: { Authorization: `Bearer ${token}` },
+  });
+  if (!response.ok) throw new Error(`Failed to load ${kind}: ${response.status}`);
+  return response.json();
+};
+
 const ProfilePage = () => {
   const [predictions, setPredictions] = useState([]);
   const [financialAnalyses, setFinancialAnalyses] = useState([]);
+  const [cursors, setCursors] = useState({ predictions: null, financial: null });
+  const [details, setDetails] = useState({});
+  const [token, setToken] = useState(null);
   const [loading, setLoading] = useState(true);
   const [user, setUser] = useState(null);
   const [expanded, setExpanded] = useState({ type: null, idx: null });
@@ -17,23 +32,60 @@ const ProfilePage = () => {
 
   useEffect(() => {
     const fetchUserAndData = async () => {
-      const { data: { user } } = await supabase.auth.getUser();
+      const { data: { session } } = await supabase.auth.getSession();
+      const user = session ? session.user : null;
       setUser(user);
       if (!user) {
         setLoading(false);
         return;
       }
-      const [{ data: predData }, { data: finData }] = await Promise.all([
-        supabase.from('predictions').select('*').eq('user_id', user.id).order('created_at', { ascending: false }),
-        supabase.from('financial_analyses').select('*').eq('user_id', user.id).order('created_at', { ascending: false })
-      ]);
-      setPredictions(predData || []);
-      setFinancialAnalyses(finData || []);
+      setToken(session.access_token);
+      try {
+        const [predPage, finPage] = await Promise.all([
+          fetchReports(session.access_token, 'predictions', '', `?limit=${PAGE_SIZE}`),
+          fetchReports(session.access_token, 'financial-analyses', '', `?limit=${PAGE_SIZE}`)
+        ]);
+        setPredictions(predPage.items);
+        setFinancialAnalyses(finPage.items);
+        setCursors({ predictions: predPage.nextCursor, financial: finPage.nextCursor });
+      } catch (error) {
+        console.error('Error fetching saved reports:', error);
+      }
       setLoading(false);
     };
     fetchUserAndData();
   }, []);
 
+  const loadMore = async (type) => {
+    const kind = type === 'prediction' ? 'predictions' : 'financial-analyses';
+    const key = type === 'prediction' ? 'predictions' : 'financial';
+    try {
+      const page = await fetchReports(token, kind, '', `?limit=${PAGE_SIZE}&cursor=${encodeURIComponent(cursors[key])}`);
+      if (type === 'prediction') setPredictions([...predictions, ...page.items]);
+      else setFinancialAnalyses([...financialAnalyses, ...page.items]);
+      setCursors({ ...cursors, [key]: page.nextCursor });
+    } catch (error) {
+      alert(error.message);
+    }
+  };
+
+  const toggleExpanded = async (type, idx, id) => {
+    if (expanded.type === type && expanded.idx === idx) {
+      setExpanded({ type: null, idx: null });
+      return;
+    }
+    setExpanded({ type, idx });
+    const detailKey = `${type}:${id}`;
+    if (details[detailKey]) return;
+    try {
+      const kind = type === 'prediction' ? 'predictions' : 'financial-analyses';
+      const report = await fetchReports(token, kind, `/${encodeURIComponent(id)}`);
+      setDetails((current) => ({ ...current, [detailKey]: report }));
+    } catch (error) {
+      alert(error.message);
+    }
+  };
+
   const handleDelete = async (type, id) => {
     if (!window.confirm('Are you sure you want to delete this item?')) return;
     const table = type === 'prediction' ? 'predictions' : 'financial_analyses';
@@ -84,15 +136,14 @@ const ProfilePage = () => {
       ) : (
         <div className="space-y-4 mb-12">
           {predictions.map((pred, idx) => {
-            const input = pred.input_data || {};
-            const result = pred.result_data || {};
+            const detail = details[`prediction:${pred.id}`];
             return (
               <div key={pred.id} className="bg-white rounded-lg shadow p-4 border-l-4 border-blue-500">
-                <div className="flex justify-between items-center cursor-pointer" onClick={() => setExpanded(expanded.type === 'prediction' && expanded.idx === idx ? { type: null, idx: null } : { type: 'prediction', idx })}>
+                <div className="flex justify-between items-center cursor-pointer" onClick={() => toggleExpanded('prediction', idx, pred.id)}>
                   <div>
-                    <div className="font-semibold text-lg">{input.predictionMode === 'realtime' ? 'Real-time' : 'Historical'} Prediction</div>
-                    <div className="text-sm text-gray-600">{new Date(pred.created_at).toLocaleString()}</div>
-                    <div className="text-sm text-gray-700 mt-1">Lat: {input.latitude}, Lon: {input.longitude}, Area: {input.area} {input.areaUnit}</div>
+                    <div className="font-semibold text-lg">{pred.mode === 'realtime' ? 'Real-time' : 'Historical'} Prediction</div>
+                    <div className="text-sm text-gray-600">{new Date(pred.createdAt).toLocaleString()}</div>
+                    <div className="text-sm text-gray-700 mt-1">Lat: {pred.latitude}, Lon: {pred.longitude}, Area: {pred.area} {pred.areaUnit}</div>
                   </div>
                   <div className="flex items-center gap-2">
                     {expanded.type === 'prediction' && expanded.idx === idx && (
@@ -117,12 +168,23 @@ const ProfilePage = () => {
                 </div>
                 {expanded.type === 'prediction' && expanded.idx === idx && (
                   <div className="mt-4 text-sm text-gray-800" ref={el => printRefs.current.predictions[idx] = el}>
-                    <PredictionResultView input={input} result={result} />
+                    {detail ? (
+                      <PredictionResultView input={detail.input_data} result={detail.result_data} />
+                    ) : (
+                      <div className="text-center text-gray-500">Loading...</div>
+                    )}
                   </div>
                 )}
               </div>
             );
           })}
+          {cursors.predictions && (
+            <div className="text-center">
+              <button className="text-blue-500 font-semibold hover:underline text-sm px-2 py-1" onClick={() => loadMore('prediction')}>
+                Load more
+              </button>
+            </div>
+          )}
         </div>
       )}
       <h2 className="text-3xl font-bold mb-6 text-center">Your Saved Financial Analyses</h2>
@@ -131,15 +193,14 @@ const ProfilePage = () => {
       ) : (
         <div className="space-y-4">
           {financialAnalyses.map((fa, idx) => {
-            const input = fa.input_data || {};
-            const result = fa.result_data || {};
+            const detail = details[`financial:${fa.id}`];
             return (
               <div key={fa.id} className="bg-white rounded-lg shadow p-4 border-l-4 border-green-500">
-                <div className="flex justify-between items-center cursor-pointer" onClick={() => setExpanded(expanded.type === 'financial' && expanded.idx === idx ? { type: null, idx: null } : { type: 'financial', idx })}>
+                <div className="flex justify-between items-center cursor-pointer" onClick={() => toggleExpanded('financial', idx, fa.id)}>
                   <div>
-                    <div className="font-semibold text-lg">Financial Analysis ({result.state})</div>
-                    <div className="text-sm text-gray-600">{new Date(fa.created_at).toLocaleString()}</div>
-                    <div className="text-sm text-gray-700 mt-1">Units Consumed: {input.unitsConsumed} | Month: {input.selectedMonth !== undefined ? input.selectedMonth : 'N/A'}</div>
+                    <div className="font-semibold text-lg">Financial Analysis ({fa.state})</div>
+                    <div className="text-sm text-gray-600">{new Date(fa.createdAt).toLocaleString()}</div>
+                    <div className="text-sm text-gray-700 mt-1">Units Consumed: {fa.unitsConsumed} | Month: {fa.month || 'N/A'}</div>
                   </div>
                   <div className="flex items-center gap-2">
                     {expanded.type === 'financial' && expanded.idx === idx && (
@@ -164,12 +225,23 @@ const ProfilePage = () => {
                 </div>
                 {expanded.type === 'financial' && expanded.idx === idx && (
                   <div className="mt-4 text-sm text-gray-800" ref={el => printRefs.current.financial[idx] = el}>
-                    <FinancialAnalysisResultView input={input} result={result} />
+                    {detail ? (
+                      <FinancialAnalysisResultView input={detail.input_data} result={detail.result_data} />
+                    ) : (
+                      <div className="text-center text-gray-500">Loading...</div>
+                    )}
                   </div>
                 )}
               </div>
             );
           })}
+          {cursors.financial && (
+            <div className="text-center">
+              <button className="text-blue-500 font-semibold hover:underline text-sm px-2 py-1" onClick={() => loadMore('financial')}>
+                Load more
+              </button>
+            </div>
+          )}
         </div>
       )}
     </div>
@@ -561,8 +561,8 @@ const TariffPage = () => {
               <button
                 className="px-6 py-2 bg-blue-600 text-white rounded-lg font-semibold shadow hover:bg-blue-700 transition-colors"
                 onClick={async () => {
-                  const { data: { user } } = await supabase.auth.getUser();
-                  if (!user) {
+                  const { data: { session } } = await supabase.auth.getSession();
+                  if (!session) {
                     alert('Please log in to save your financial analysis.');
                     return;
                   }
@@ -577,15 +577,21 @@ const TariffPage = () => {
                     yearly_generation
                   };
                   const resultData = results;
-                  const { error } = await supabase
-                    .from('financial_analyses')
-                    .insert([
-                      {
-                        user_id: user.id,
-                        input_data: inputData,
-                        result_data: resultData,
-                      }
-                    ]);
+                  // Saved through the profile service, which stores the series compactly
+                  let error = null;
+                  try {
+                    const response = await fetch('http://localhost:8000/api/reports/financial-analyses', {
+                      method: 'POST',
+                      headers: {
+                        'Content-Type': 'application/json',
+                        Authorization: `Bearer ${session.access_token}`,
+                      },
+                      body: JSON.stringify({ input_data: inputData, result_data: resultData }),
+                    });
+                    if (!response.ok) error = new Error((await response.json()).detail || response.statusText);
+                  } catch (e) {
+                    error = e;
+                  }
                   if (error) {
                     alert('Failed to save financial analysis: ' + error.message);
                   } else {
@@ -0,0 +1,154 @@
+"""
+Structured logging shared by the model API and the profile service.
+
+Records are formatted as one JSON object per line and handed to a background
+thread through a queue, so request handlers never block on stdout. The level
+comes from the LOG_LEVEL environment variable (default INFO); per-request
+detail is only emitted at DEBUG.
+
+Each service logs under its own root logger ("solar" for the model API,
+"solar.fapi" for the profile service; see their logger.py). Every root in a
+process writes through the same queue and writer thread.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+_queue_handler = None
+_listener = None
+_depth_observers = []
+
+
+class JsonFormatter(logging.Formatter):
+    """Format a record as a single JSON line, merging `extra={"fields": {...}}`"""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def _report_depth():
+    if _depth_observers:
+        depth = _queue_handler.queue.qsize()
+        for observer in _depth_observers:
+            observer(depth)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler reporting the queue depth after every record it queues"""
+
+    def enqueue(self, record):
+        super().enqueue(record)
+        _report_depth()
+
+
+class _QueueListener(logging.handlers.QueueListener):
+    """QueueListener reporting the queue depth after every record it writes"""
+
+    def handle(self, record):
+        super().handle(record)
+        _report_depth()
+
+
+def _start_listener():
+    """Attach a fresh queue and listener thread to the shared queue handler"""
+    global _listener
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+    _queue_handler.queue = log_queue
+    _listener = _QueueListener(log_queue, stream_handler, respect_handler_level=False)
+    _listener.start()
+
+
+def _stop_listener():
+    """Flush queued records on interpreter exit"""
+    if _listener is not None:
+        _listener.stop()
+
+
+def setup_logging(root_name, level=None):
+    """
+    Configure the `root_name` logger tree; safe to call repeatedly.
+
+    The queue and listener thread are created on the first call and
+    recreated in forked children (see src/model/serve.py), since threads do
+    not survive fork().
+    """
+    global _queue_handler
+    root = logging.getLogger(root_name)
+    root.setLevel((level or os.getenv("LOG_LEVEL", "INFO")).upper())
+    if _queue_handler is None:
+        _queue_handler = _QueueHandler(queue.SimpleQueue())
+        _start_listener()
+        os.register_at_fork(after_in_child=_start_listener)
+        atexit.register(_stop_listener)
+    if _queue_handler not in root.handlers:
+        root.addHandler(_queue_handler)
+        root.propagate = False
+    return root
+
+
+def queue_depth():
+    """Number of records waiting for the listener thread"""
+    if _queue_handler is None:
+        return 0
+    return _queue_handler.queue.qsize()
+
+
+def watch_queue_depth(observer):
+    """
+    Call observer(depth) whenever a record is queued or written.
+
+    For gauges: a set_function() gauge is not exported in prometheus_client's
+    multiprocess mode, so metrics.py sets its gauge through this instead.
+    """
+    _depth_observers.append(observer)
+    observer(queue_depth())
+
+
+def get_logger(root_name, name):
+    setup_logging(root_name)
+    return logging.getLogger(f"{root_name}.{name}")
+
+
+class StageTimer:
+    """Collects wall-clock durations of the named stages of one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def total(self):
+        return time.perf_counter() - self.started
+
+    def summary_ms(self):
+        """Stage timings in milliseconds, plus the total, for a summary record"""
+        summary = {f"{name}_ms": round(seconds * 1000, 3) for name, seconds in self.stages.items()}
+        summary["total_ms"] = round(self.total() * 1000, 3)
+        return summary
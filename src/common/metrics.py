@@ -0,0 +1,133 @@
+"""
+Prometheus metrics shared by the model API and the profile service.
+
+ServiceMetrics(prefix) creates one service's request, stage, cache and
+log-queue metrics under its own prefix, so both services can be served from
+one process without name clashes, together with the helpers handlers use
+(observe_stages, record_cache) and an ASGI middleware timing every request.
+The services' metrics.py build theirs ("solar_model", "solar_profile") and
+add their own metrics next to them.
+
+Under the pre-fork launcher set PROMETHEUS_MULTIPROC_DIR so /metrics
+aggregates every worker, not just the one that happened to accept the
+scrape.
+"""
+import os
+import time
+
+from fastapi import Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+
+from . import logs
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _route_path(scope):
+    """Use the route template (not the raw path) to keep label cardinality bounded"""
+    route = scope.get("route")
+    return getattr(route, "path", "unmatched")
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware timing every HTTP request (no per-request allocations beyond the timer)"""
+
+    metrics = None  # The ServiceMetrics recorded into; see ServiceMetrics.middleware
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = self.metrics
+        status_code = 500
+        start = time.perf_counter()
+        metrics.requests_in_progress.inc()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.requests_in_progress.dec()
+            endpoint = _route_path(scope)
+            metrics.request_latency.labels(endpoint, scope["method"], str(status_code)).observe(
+                time.perf_counter() - start)
+            if status_code >= 500:
+                metrics.request_errors.labels(endpoint).inc()
+
+
+class ServiceMetrics:
+    """The metrics every service exports, named `<prefix>_...`"""
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.request_latency = Histogram(
+            f"{prefix}_request_duration_seconds",
+            "End-to-end request latency, including response serialization",
+            ["endpoint", "method", "status"],
+            buckets=LATENCY_BUCKETS,
+        )
+        self.stage_latency = Histogram(
+            f"{prefix}_stage_duration_seconds",
+            "Latency of the individual stages inside a request",
+            ["endpoint", "stage"],
+            buckets=LATENCY_BUCKETS,
+        )
+        self.request_errors = Counter(
+            f"{prefix}_request_errors_total",
+            "Requests that raised or returned a 5xx status",
+            ["endpoint"],
+        )
+        self.cache_requests = Counter(
+            f"{prefix}_cache_requests_total",
+            "Cache lookups by cache name and result (hit/miss)",
+            ["cache", "result"],
+        )
+        self.requests_in_progress = Gauge(
+            f"{prefix}_requests_in_progress",
+            "Requests currently being handled",
+            multiprocess_mode="livesum",
+        )
+        self.log_queue_depth = Gauge(
+            f"{prefix}_log_queue_depth",
+            "Log records waiting for the background log writer",
+            multiprocess_mode="livemax",
+        )
+        logs.watch_queue_depth(self.log_queue_depth.set)
+        # For app.add_middleware(): MetricsMiddleware recording into these metrics
+        self.middleware = type("MetricsMiddleware", (MetricsMiddleware,), {"metrics": self})
+
+    def observe_stages(self, endpoint, timer):
+        """Record every stage of a StageTimer under the given endpoint"""
+        for stage, seconds in timer.stages.items():
+            self.stage_latency.labels(endpoint, stage).observe(seconds)
+
+    def record_cache(self, cache, hit, count=1):
+        self.cache_requests.labels(cache, "hit" if hit else "miss").inc(count)
+
+
+def metrics_response():
+    """Render the registry (or the multi-process aggregate) in Prometheus text format"""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,124 @@
+"""
+Bulk persistence with COPY FROM STDIN, for jobs that store thousands of rows.
+
+An INSERT per row (as /api/save-user does for its one row) costs a round
+trip, a parse/plan and a commit per row. BulkWriter buffers records and
+sends each batch of `batch_size` with asyncpg's copy_records_to_table()
+(binary COPY ... FROM STDIN) on one connection, inside one transaction per
+job: leaving the `async with` block commits everything, an exception rolls
+everything back, so a job's rows are stored all-or-nothing.
+
+    async with BulkWriter(reports.TABLES["predictions"], reports.REPORT_COLUMNS) as writer:
+        for report in results:
+            await writer.write(reports.report_record(user_id, *report))
+    writer.stats  # rows, batches, seconds, rows_per_second
+
+Committed rows and per-batch COPY time are exported through metrics.py.
+"""
+import contextlib
+import os
+import sys
+import time
+
+try:
+    from .logger import get_logger
+    from .metrics import BULK_COPY_LATENCY, BULK_ROWS
+    from . import database
+except ImportError:
+    from logger import get_logger
+    from metrics import BULK_COPY_LATENCY, BULK_ROWS
+    import database
+
+logger = get_logger("bulk_writer")
+
+BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "5000"))
+COPY_TIMEOUT = float(os.getenv("BULK_COPY_TIMEOUT", "60"))  # Seconds per batch
+
+
+class BulkWriter:
+    def __init__(self, table, columns, batch_size=BATCH_SIZE, schema_name=None, conn=None):
+        """
+        conn: write on this connection (in a savepoint of its transaction)
+        instead of checking one out of the pool for the job.
+        """
+        self.table = table
+        self.columns = tuple(columns)
+        self.batch_size = batch_size
+        self.schema_name = schema_name
+        self._conn = conn
+        self._buffer = []
+        self._stack = None
+        self.rows = 0
+        self.batches = 0
+        self.started = None
+        self.finished = None
+
+    async def __aenter__(self):
+        self._stack = contextlib.AsyncExitStack()
+        if self._conn is None:
+            self._conn = await self._stack.enter_async_context(database.connection())
+        await self._stack.enter_async_context(self._conn.transaction())
+        self.started = time.perf_counter()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                await self.flush()
+        except BaseException:
+            await self._finish(*sys.exc_info())
+            raise
+        await self._finish(exc_type, exc, tb)
+        return False
+
+    async def _finish(self, exc_type, exc, tb):
+        # Leaving the transaction commits, or rolls back when there is an exception
+        await self._stack.__aexit__(exc_type, exc, tb)
+        self.finished = time.perf_counter()
+        if exc_type is None:
+            BULK_ROWS.labels(self.table).inc(self.rows)
+            logger.info("Bulk write committed", extra={"fields": {"table": self.table, **self.stats}})
+        else:
+            logger.warning("Bulk write rolled back", extra={"fields": {
+                "table": self.table,
+                "error": str(exc),
+                **self.stats,
+            }})
+
+    async def write(self, record):
+        """Queue one record (a tuple in `columns` order); COPYs a full batch"""
+        self._buffer.append(record)
+        if len(self._buffer) >= self.batch_size:
+            await self.flush()
+
+    async def write_many(self, records):
+        for record in records:
+            await self.write(record)
+
+    async def flush(self):
+        """COPY the buffered records now (still uncommitted until the job ends)"""
+        if not self._buffer:
+            return
+        batch, self._buffer = self._buffer, []
+        start = time.perf_counter()
+        await self._conn.copy_records_to_table(
+            self.table,
+            records=batch,
+            columns=self.columns,
+            schema_name=self.schema_name,
+            timeout=COPY_TIMEOUT,
+        )
+        BULK_COPY_LATENCY.observe(time.perf_counter() - start)
+        self.rows += len(batch)
+        self.batches += 1
+
+    @property
+    def stats(self):
+        end = self.finished if self.finished is not None else time.perf_counter()
+        seconds = end - self.started if self.started is not None else 0.0
+        return {
+            "rows": self.rows,
+            "batches": self.batches,
+            "seconds": round(seconds, 3),
+            "rows_per_second": round(self.rows / seconds) if seconds > 0 else 0,
+        }
@@ -0,0 +1,167 @@
+"""
+Async PostgreSQL access for the profile service (asyncpg).
+
+One pool per process, opened in the app's lifespan (see main.py). The
+profile queries are module constants run through asyncpg, which prepares
+each statement once per connection and reuses it from the connection's
+statement cache, so queries are parsed and planned once rather than on
+every request. save_user is a single INSERT ... ON CONFLICT statement.
+
+Pool behaviour, from the environment:
+
+- DB_POOL_MIN/DB_POOL_MAX connections; callers wait up to DB_POOL_TIMEOUT
+  seconds for a free one (PoolTimeout afterwards). DB_POOL_MIN is only what
+  is opened up front: released connections stay open up to DB_POOL_MAX, so
+  a burst does not reconnect for every request above the minimum,
+- connections idle for DB_POOL_IDLE_TIMEOUT seconds are closed, so a server
+  or proxy that drops idle sockets never hands out a dead one; asyncpg also
+  replaces connections found closed on acquire,
+- connections are recycled after DB_POOL_MAX_QUERIES queries.
+
+Pool state and events are exported through metrics.py.
+"""
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+
+import asyncpg  # type: ignore
+
+try:
+    from .logger import get_logger
+    from .metrics import DB_POOL_CONNECTIONS, DB_POOL_EVENTS, DB_POOL_WAIT
+except ImportError:
+    from logger import get_logger
+    from metrics import DB_POOL_CONNECTIONS, DB_POOL_EVENTS, DB_POOL_WAIT
+
+logger = get_logger("database")
+
+MIN_SIZE = int(os.getenv("DB_POOL_MIN", "1"))
+MAX_SIZE = int(os.getenv("DB_POOL_MAX", "10"))
+ACQUIRE_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))  # Seconds
+IDLE_TIMEOUT = float(os.getenv("DB_POOL_IDLE_TIMEOUT", "300"))  # Seconds before an idle connection is closed
+MAX_QUERIES = int(os.getenv("DB_POOL_MAX_QUERIES", "50000"))  # Queries before a connection is recycled
+COMMAND_TIMEOUT = float(os.getenv("DB_COMMAND_TIMEOUT", "10"))  # Seconds per statement
+
+FETCH_PROFILE = """
+    SELECT first_name, last_name, number, is_social_login
+    FROM profiles WHERE id = $1
+"""
+# Existing users only get their name and number updated, as before;
+# xmax is 0 exactly for rows this statement inserted
+UPSERT_PROFILE = """
+    INSERT INTO profiles (id, first_name, last_name, number, password, is_social_login)
+    VALUES ($1, $2, $3, $4, $5, $6)
+    ON CONFLICT (id) DO UPDATE
+    SET first_name = EXCLUDED.first_name, last_name = EXCLUDED.last_name, number = EXCLUDED.number
+    RETURNING (xmax = 0) AS created
+"""
+
+
+class PoolTimeout(Exception):
+    """No connection became free within the acquire timeout"""
+
+
+_pool = None
+_pool_args = None
+_open_lock = asyncio.Lock()
+
+
+async def _on_connect(conn):
+    DB_POOL_EVENTS.labels("opened").inc()
+
+
+def _report(pool):
+    """
+    Set the connection gauges from the pool (after it opens and on every
+    checkout and return; set_function() gauges are not exported in
+    multiprocess mode)
+    """
+    idle = pool.get_idle_size()
+    DB_POOL_CONNECTIONS.labels("idle").set(idle)
+    DB_POOL_CONNECTIONS.labels("in_use").set(pool.get_size() - idle)
+
+
+async def open_pool(dsn, **kwargs):
+    """
+    Create the process-wide pool (called from the lifespan).
+
+    If the database is unreachable at startup the service still starts;
+    get_pool() retries on the next request.
+    """
+    global _pool_args
+    _pool_args = (dsn, kwargs)
+    try:
+        return await get_pool()
+    except (OSError, asyncpg.PostgresError) as e:
+        logger.error("Database pool could not be opened, retrying on first use",
+                     extra={"fields": {"error": str(e)}})
+
+
+async def close_pool():
+    global _pool, _pool_args
+    _pool_args = None
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+        DB_POOL_CONNECTIONS.labels("idle").set(0)
+        DB_POOL_CONNECTIONS.labels("in_use").set(0)
+        logger.info("Database pool closed")
+
+
+async def get_pool():
+    global _pool
+    if _pool is not None:
+        return _pool
+    if _pool_args is None:
+        raise RuntimeError("Database pool is not open")
+    async with _open_lock:
+        if _pool is None:
+            dsn, kwargs = _pool_args
+            options = {
+                "min_size": MIN_SIZE,
+                "max_size": MAX_SIZE,
+                "max_inactive_connection_lifetime": IDLE_TIMEOUT,
+                "max_queries": MAX_QUERIES,
+                "command_timeout": COMMAND_TIMEOUT,
+                **kwargs,
+            }
+            _pool = await asyncpg.create_pool(dsn, init=_on_connect, **options)
+            _report(_pool)
+            logger.info("Database pool opened", extra={"fields": {
+                "min_size": options["min_size"],
+                "max_size": options["max_size"],
+            }})
+    return _pool
+
+
+@asynccontextmanager
+async def connection(timeout=ACQUIRE_TIMEOUT):
+    """Check a connection out of the pool, recording the wait"""
+    pool = await get_pool()
+    start = time.perf_counter()
+    try:
+        conn = await pool.acquire(timeout=timeout)
+    except asyncio.TimeoutError:
+        DB_POOL_EVENTS.labels("timeout").inc()
+        raise PoolTimeout(f"No database connection free within {timeout} s")
+    DB_POOL_WAIT.observe(time.perf_counter() - start)
+    _report(pool)
+    try:
+        yield conn
+    finally:
+        await pool.release(conn)
+        _report(pool)
+
+
+async def fetch_profile(user_id):
+    """The user's profile row (first_name, last_name, number, is_social_login), or None"""
+    async with connection() as conn:
+        return await conn.fetchrow(FETCH_PROFILE, user_id)
+
+
+async def upsert_profile(user_id, first_name, last_name, number, password, is_social_login):
+    """Insert the profile, or update name and number if it exists; True when it was created"""
+    async with connection() as conn:
+        return await conn.fetchval(UPSERT_PROFILE, user_id, first_name, last_name, number,
+                                   password, is_social_login)
@@ -0,0 +1,118 @@
+"""
+JWKS key cache for Supabase projects that sign tokens with asymmetric keys.
+
+The project's public keys (GET {SUPABASE_PROJECT_URL}/auth/v1/.well-known/jwks.json)
+are fetched in the background and kept as constructed jose key objects,
+indexed by kid. Verifying a token is then a dictionary lookup and a signature
+check, with no network on the request path:
+
+- JWKSCache.run() (started from the lifespan) refreshes the set every `ttl`
+  seconds; a failed refresh keeps serving the last good keys.
+- A token whose kid is unknown (e.g. right after a key rotation) is
+  rejected, and schedules one refresh, at most every `min_refresh_interval`
+  seconds, so the new key is there for the client's retry.
+"""
+import asyncio
+import threading
+import time
+
+import requests
+from jose import jwk, jwt as jose_jwt  # type: ignore
+from jose.exceptions import JOSEError  # type: ignore
+
+try:
+    from .logger import get_logger
+    from .metrics import record_cache
+except ImportError:
+    from logger import get_logger
+    from metrics import record_cache
+
+logger = get_logger("jwks")
+
+JWKS_PATH = "/auth/v1/.well-known/jwks.json"
+ASYMMETRIC_ALGORITHMS = ("RS256", "ES256")
+DEFAULT_TTL = 600  # Seconds between background refreshes
+MIN_REFRESH_INTERVAL = 30  # Seconds between refreshes triggered by unknown kids
+REQUEST_TIMEOUT = 5  # Seconds
+
+
+class UnknownKeyError(JOSEError):
+    """The token's kid is not in the cached key set"""
+
+
+class JWKSCache:
+    def __init__(self, url, ttl=DEFAULT_TTL, min_refresh_interval=MIN_REFRESH_INTERVAL, clock=time.monotonic,
+                 session=None):
+        self.url = url
+        self.session = session or requests.Session()
+        self.ttl = ttl
+        self.min_refresh_interval = min_refresh_interval
+        self._clock = clock
+        self._keys = {}  # kid -> (alg, jose key object); replaced as a whole on refresh
+        self.fetched_at = None
+        self._last_triggered = None
+        self._refreshing = threading.Lock()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def refresh(self):
+        """Fetch the key set now (blocking); True when it was replaced"""
+        if not self._refreshing.acquire(blocking=False):
+            return False  # Another refresh is already running
+        try:
+            response = self.session.get(self.url, timeout=REQUEST_TIMEOUT)
+            response.raise_for_status()
+            keys = {}
+            for key in response.json().get("keys", []):
+                alg = key.get("alg")
+                if key.get("use", "sig") != "sig" or alg not in ASYMMETRIC_ALGORITHMS:
+                    continue
+                keys[key.get("kid")] = (alg, jwk.construct(key, alg))
+            self._keys = keys
+            self.fetched_at = self._clock()
+            logger.info("JWKS refreshed", extra={"fields": {"keys": len(keys)}})
+            return True
+        except (requests.RequestException, ValueError, JOSEError) as e:
+            logger.warning("JWKS refresh failed, keeping cached keys", extra={"fields": {
+                "error": str(e),
+                "keys": len(self._keys),
+            }})
+            return False
+        finally:
+            self._refreshing.release()
+
+    def _refresh_soon(self):
+        """Refresh in a background thread, unless one ran recently"""
+        if self._last_triggered is not None and self._clock() - self._last_triggered < self.min_refresh_interval:
+            return
+        self._last_triggered = self._clock()
+        threading.Thread(target=self.refresh, name="jwks-refresh", daemon=True).start()
+
+    def get(self, kid):
+        """Cached (alg, key object) for kid, or None (scheduling a refresh)"""
+        key = self._keys.get(kid)
+        record_cache("jwks", key is not None)
+        if key is None:
+            self._refresh_soon()
+        return key
+
+    async def run(self):
+        """Refresh now and then every ttl seconds, until cancelled"""
+        while True:
+            await asyncio.to_thread(self.refresh)
+            await asyncio.sleep(self.ttl)
+
+    def verify(self, token, audience):
+        """
+        Claims of a token signed with one of the cached keys.
+
+        Raises JOSEError (or UnknownKeyError) if the token is not valid.
+        """
+        header = jose_jwt.get_unverified_header(token)
+        cached = self.get(header.get("kid"))
+        if cached is None:
+            raise UnknownKeyError(f"Unknown signing key {header.get('kid')}")
+        # The key decides the algorithm, never the token header
+        alg, key = cached
+        return jose_jwt.decode(token, key, algorithms=[alg], audience=audience)
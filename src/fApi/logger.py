@@ -0,0 +1,31 @@
+"""
+Structured logging for the profile service: the JSON lines and background
+writer of src/common/logs.py (shared with the model API, so both services'
+output can be parsed by the same tooling), under the "solar.fapi" tree.
+
+Usage:
+    logger = get_logger("main")
+    logger.info("save-user completed", extra={"fields": {"user_id": user_id}})
+"""
+import os
+import sys
+
+try:
+    from ..common import logs
+except ImportError:
+    # Run from this directory (uvicorn main:app): make src/common importable
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from common import logs
+
+ROOT_LOGGER_NAME = "solar.fapi"
+
+StageTimer = logs.StageTimer
+queue_depth = logs.queue_depth
+
+
+def setup_logging(level=None):
+    return logs.setup_logging(ROOT_LOGGER_NAME, level)
+
+
+def get_logger(name):
+    return logs.get_logger(ROOT_LOGGER_NAME, name)
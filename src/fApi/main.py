@@ -1,15 +1,47 @@
-from fastapi import FastAPI, Header, HTTPException, Depends # type: ignore
+from fastapi import FastAPI, Header, HTTPException, Depends, Query # type: ignore
 from pydantic import BaseModel # type: ignore
-from typing import Optional
+from typing import Literal, Optional
+from contextlib import asynccontextmanager
+import asyncio
 import os
 from dotenv import load_dotenv # type: ignore
 import jwt  # type: ignore # PyJWT
-import psycopg2 # type: ignore
 from fastapi.middleware.cors import CORSMiddleware # type: ignore
-from jose import jwt as jose_jwt, jwk # type: ignore
-from jose.utils import base64url_decode # type: ignore
+try:
+    from .logger import get_logger, StageTimer
+    from .metrics import MetricsMiddleware, observe_stages, metrics_response
+    from .token_cache import VerifiedTokenCache
+    from .jwks import JWKS_PATH, JWKSCache
+    from .profile_cache import ProfileCache, make_backend
+    from . import database, reports
+except ImportError:
+    from logger import get_logger, StageTimer
+    from metrics import MetricsMiddleware, observe_stages, metrics_response
+    from token_cache import VerifiedTokenCache
+    from jwks import JWKS_PATH, JWKSCache
+    from profile_cache import ProfileCache, make_backend
+    import database
+    import reports
 
-app = FastAPI()
+logger = get_logger("main")
+
+@asynccontextmanager
+async def lifespan(app):
+    # One connection pool per process instead of a connection per request
+    if DATABASE_URL:
+        await database.open_pool(DATABASE_URL)
+    else:
+        logger.warning("DATABASE_URL not set, profile endpoints will fail")
+    # Asymmetric signing keys, kept fresh in the background
+    if jwks_cache is not None:
+        app.state.jwks_task = asyncio.create_task(jwks_cache.run())
+    yield
+    if jwks_cache is not None:
+        app.state.jwks_task.cancel()
+    await database.close_pool()
+    await profile_cache.close()
+
+app = FastAPI(lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -19,15 +51,26 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 
 load_dotenv()
 SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET")
 DATABASE_URL = os.getenv("DATABASE_URL")
 SUPABASE_ANON_KEY = os.getenv("SUPABASE_ANON_KEY")
+SUPABASE_PROJECT_URL = os.getenv("SUPABASE_PROJECT_URL")
+PROFILE_CACHE_URL = os.getenv("PROFILE_CACHE_URL")
+SUPABASE_JWKS_URL = os.getenv("SUPABASE_JWKS_URL") or (
+    SUPABASE_PROJECT_URL.rstrip("/") + JWKS_PATH if SUPABASE_PROJECT_URL else None
+)
 
-print("SUPABASE_JWT_SECRET:", SUPABASE_JWT_SECRET)
-print("DATABASE_URL:", DATABASE_URL)
-print("SUPABASE_ANON_KEY:", SUPABASE_ANON_KEY)
+# Never log the values themselves, only whether they are configured
+logger.info("Configuration loaded", extra={"fields": {
+    "jwt_secret_set": bool(SUPABASE_JWT_SECRET),
+    "database_url_set": bool(DATABASE_URL),
+    "anon_key_set": bool(SUPABASE_ANON_KEY),
+    "jwks_url_set": bool(SUPABASE_JWKS_URL),
+    "profile_cache_url_set": bool(PROFILE_CACHE_URL),
+}})
 
 class UserProfile(BaseModel):
     firstName: str
@@ -35,97 +78,202 @@ class UserProfile(BaseModel):
     mobileNumber: str
     password: Optional[str] = ""  # Making password optional for social logins
 
+class SavedReport(BaseModel):
+    input_data: dict
+    result_data: dict
+
+
+# Claims of already verified tokens, until each token's own expiry
+token_cache = VerifiedTokenCache()
+# Public keys for asymmetrically signed (RS256/ES256) tokens
+jwks_cache = JWKSCache(SUPABASE_JWKS_URL) if SUPABASE_JWKS_URL else None
+# Profiles by user id, dropped on every save; shared across workers with PROFILE_CACHE_URL
+profile_cache = ProfileCache(make_backend(PROFILE_CACHE_URL))
 
-def get_current_user(authorization: Optional[str] = Header(None)):
+
+async def get_current_user(authorization: Optional[str] = Header(None)):
     if authorization is None or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Missing or invalid token")
 
     token = authorization.split(" ")[1]
 
-    try:
-        payload = jwt.decode(
-            token,
-            SUPABASE_JWT_SECRET,
-            algorithms=["HS256"],
-            audience="authenticated",
-        )
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload["sub"]
 
-        print("Decoded token payload:", payload)
+    timer = StageTimer()
+    try:
+        with timer.stage("token_verify"):
+            if jwt.get_unverified_header(token).get("alg") == "HS256":
+                payload = jwt.decode(
+                    token,
+                    SUPABASE_JWT_SECRET,
+                    algorithms=["HS256"],
+                    audience="authenticated",
+                )
+            elif jwks_cache is not None:
+                payload = jwks_cache.verify(token, audience="authenticated")
+            else:
+                raise HTTPException(status_code=401, detail="Asymmetric tokens are not configured")
+        observe_stages("auth", timer)
 
         user_id = payload.get("sub")
         if not user_id:
             raise HTTPException(status_code=401, detail="Invalid token payload")
 
+        token_cache.put(token, payload)
+        logger.debug("Token verified", extra={"fields": {"user_id": user_id, "exp": payload.get("exp")}})
+
         return user_id
 
     except Exception as e:
+        logger.info("Token verification failed", extra={"fields": {"error": str(e)}})
         raise HTTPException(status_code=401, detail=f"Token verification failed: {str(e)}")
 
 
 @app.post("/api/save-user")
-def save_user(profile: UserProfile, user_id: str = Depends(get_current_user)):
+async def save_user(profile: UserProfile, user_id: str = Depends(get_current_user)):
+    timer = StageTimer()
     try:
-        conn = psycopg2.connect(DATABASE_URL)
-        cursor = conn.cursor()
-
-        # Check if user already exists
-        cursor.execute("SELECT id FROM profiles WHERE id = %s", (user_id,))
-        user_exists = cursor.fetchone() is not None
-
-        if user_exists:
-            # Update existing user
-            cursor.execute("""
-                UPDATE profiles 
-                SET first_name = %s, last_name = %s, number = %s
-                WHERE id = %s    
-            """, (profile.firstName, profile.lastName, profile.mobileNumber, user_id))
-        else:
-            # Insert new user
-            cursor.execute("""
-                INSERT INTO profiles (id, first_name, last_name, number, password, is_social_login)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """, (
-                user_id, 
-                profile.firstName, 
-                profile.lastName, 
+        # Insert, or update name and number of an existing user, in one statement
+        with timer.stage("db"):
+            created = await database.upsert_profile(
+                user_id,
+                profile.firstName,
+                profile.lastName,
                 profile.mobileNumber,
                 profile.password if profile.password else None,
                 profile.password == ""  # True if password is empty (social login)
-            ))
-
-        conn.commit()
-        cursor.close()
-        conn.close()
+            )
+        with timer.stage("cache"):
+            await profile_cache.invalidate(user_id)
 
+        logger.info("save-user completed", extra={"fields": {
+            "user_id": user_id,
+            "created": created,
+            **timer.summary_ms(),
+        }})
+        observe_stages("/api/save-user", timer)
         return {"message": "User saved successfully"}
     except Exception as e:
+        logger.exception("save-user failed", extra={"fields": {"user_id": user_id, **timer.summary_ms()}})
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
 # Endpoint to check if user exists and get profile info
 @app.get("/api/user-profile")
-def get_user_profile(user_id: str = Depends(get_current_user)):
+async def get_user_profile(user_id: str = Depends(get_current_user)):
+    timer = StageTimer()
+    with timer.stage("cache"):
+        cached = await profile_cache.get(user_id)
+    if cached is not None:
+        observe_stages("/api/user-profile", timer)
+        return cached
+
+    try:
+        with timer.stage("db"):
+            user = await database.fetch_profile(user_id)
+    except Exception as e:
+        logger.exception("user-profile failed", extra={"fields": {"user_id": user_id, **timer.summary_ms()}})
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    logger.info("user-profile completed", extra={"fields": {
+        "user_id": user_id,
+        "found": user is not None,
+        **timer.summary_ms(),
+    }})
+    observe_stages("/api/user-profile", timer)
+
+    # Unknown users are not cached: the next save creates them
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    profile = {
+        "firstName": user["first_name"],
+        "lastName": user["last_name"],
+        "mobileNumber": user["number"],
+        "isSocialLogin": user["is_social_login"]
+    }
+    await profile_cache.set(user_id, profile)
+    return profile
+
+
+# Saved reports: summary pages for the profile page, full payloads on demand
+ReportKind = Literal["predictions", "financial-analyses"]
+
+
+@app.get("/api/reports/{kind}")
+async def list_reports(
+    kind: ReportKind,
+    limit: int = Query(reports.DEFAULT_PAGE_SIZE, ge=1, le=reports.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    user_id: str = Depends(get_current_user),
+):
+    timer = StageTimer()
+    try:
+        with timer.stage("db"):
+            items, next_cursor = await reports.list_reports(kind, user_id, limit, cursor)
+    except reports.InvalidCursor as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.exception("list-reports failed", extra={"fields": {"user_id": user_id, "kind": kind, **timer.summary_ms()}})
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    logger.info("list-reports completed", extra={"fields": {
+        "user_id": user_id,
+        "kind": kind,
+        "items": len(items),
+        "paged": cursor is not None,
+        **timer.summary_ms(),
+    }})
+    observe_stages("/api/reports/{kind}", timer)
+    return {"items": items, "nextCursor": next_cursor}
+
+
+@app.post("/api/reports/{kind}")
+async def save_report(kind: ReportKind, report: SavedReport, user_id: str = Depends(get_current_user)):
+    timer = StageTimer()
     try:
-        conn = psycopg2.connect(DATABASE_URL)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            SELECT first_name, last_name, number, is_social_login
-            FROM profiles WHERE id = %s
-        """, (user_id,))
-        
-        user = cursor.fetchone()
-        cursor.close()
-        conn.close()
-
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-            
-        return {
-            "firstName": user[0],
-            "lastName": user[1],
-            "mobileNumber": user[2],
-            "isSocialLogin": user[3] if len(user) > 3 else False
-        }
+        with timer.stage("db"):
+            saved = await reports.save_report(kind, user_id, report.input_data, report.result_data)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
\ No newline at end of file
+        logger.exception("save-report failed", extra={"fields": {"user_id": user_id, "kind": kind, **timer.summary_ms()}})
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    logger.info("save-report completed", extra={"fields": {
+        "user_id": user_id,
+        "kind": kind,
+        "report_id": saved["id"],
+        **timer.summary_ms(),
+    }})
+    observe_stages("POST /api/reports/{kind}", timer)
+    return saved
+
+
+@app.get("/api/reports/{kind}/{report_id}")
+async def get_report(kind: ReportKind, report_id: str, user_id: str = Depends(get_current_user)):
+    timer = StageTimer()
+    try:
+        with timer.stage("db"):
+            report = await reports.fetch_report(kind, user_id, report_id)
+    except Exception as e:
+        logger.exception("get-report failed", extra={"fields": {"user_id": user_id, "kind": kind, **timer.summary_ms()}})
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    logger.info("get-report completed", extra={"fields": {
+        "user_id": user_id,
+        "kind": kind,
+        "found": report is not None,
+        **timer.summary_ms(),
+    }})
+    observe_stages("/api/reports/{kind}/{report_id}", timer)
+
+    if report is None:
+        raise HTTPException(status_code=404, detail="Report not found")
+    return report
+
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus scrape endpoint"""
+    return metrics_response()
@@ -0,0 +1,56 @@
+"""
+Prometheus metrics for the profile service, exposed on /metrics.
+
+The request, stage, cache and log-queue metrics are src/common/metrics.py's
+under the "solar_profile" prefix, so this service and the model API can also
+be served from one process without name clashes. Handlers add per-stage
+latency (token verification, database) from their StageTimer with
+observe_stages(); database.py reports its connection pool and
+bulk_writer.py its COPY batches.
+"""
+import os
+import sys
+
+from prometheus_client import Counter, Gauge, Histogram
+
+try:
+    from ..common import metrics as common_metrics
+except ImportError:
+    # Run from this directory (uvicorn main:app): make src/common importable
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from common import metrics as common_metrics
+
+LATENCY_BUCKETS = common_metrics.LATENCY_BUCKETS
+
+service_metrics = common_metrics.ServiceMetrics("solar_profile")
+MetricsMiddleware = service_metrics.middleware
+observe_stages = service_metrics.observe_stages
+record_cache = service_metrics.record_cache
+metrics_response = common_metrics.metrics_response
+
+DB_POOL_CONNECTIONS = Gauge(
+    "solar_profile_db_pool_connections",
+    "Database pool connections by state (in_use/idle)",
+    ["state"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_WAIT = Histogram(
+    "solar_profile_db_pool_wait_seconds",
+    "Time spent waiting to check a connection out of the pool",
+    buckets=LATENCY_BUCKETS,
+)
+DB_POOL_EVENTS = Counter(
+    "solar_profile_db_pool_events_total",
+    "Pool connection lifecycle events (opened, recycled, health_check_failed, timeout)",
+    ["event"],
+)
+BULK_ROWS = Counter(
+    "solar_profile_bulk_rows_total",
+    "Rows committed by bulk (COPY) writes, by table",
+    ["table"],
+)
+BULK_COPY_LATENCY = Histogram(
+    "solar_profile_bulk_copy_duration_seconds",
+    "Time to COPY one batch of a bulk write",
+    buckets=LATENCY_BUCKETS + (30.0, 60.0),
+)
@@ -0,0 +1,116 @@
+"""
+Move saved reports to compact storage (see report_codec.py).
+
+Adds the `series` bytea column and the listing indexes if they are missing,
+then rewrites every row that has no blob yet: its series move into `series`
+and the JSON columns keep the scalars. Each row is checked to decode back
+to its original JSON before it is written;
+rows that would not are left as they are and counted. Rows are walked in id
+order in batches, one transaction per batch, so the migration can be
+stopped and re-run at any point.
+
+Usage (from the repository root, DATABASE_URL from the environment or .env):
+    python src/fApi/migrate_reports.py --dry-run   # measure only
+    python src/fApi/migrate_reports.py
+Run VACUUM on both tables afterwards to return the freed space.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from dotenv import load_dotenv  # type: ignore
+
+try:
+    from . import database, report_codec, reports
+except ImportError:
+    import database
+    import report_codec
+    import reports
+
+BATCH_SIZE = 500
+
+ADD_SERIES_COLUMN = "ALTER TABLE {table} ADD COLUMN IF NOT EXISTS series bytea"
+HAS_SERIES_COLUMN = """
+    SELECT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = $1 AND column_name = 'series')
+"""
+# {pending} selects the rows without a blob (every row before the column exists)
+FIRST_BATCH = "SELECT id, input_data, result_data FROM {table} WHERE {pending} ORDER BY id LIMIT $1"
+NEXT_BATCH = "SELECT id, input_data, result_data FROM {table} WHERE {pending} AND id > $2 ORDER BY id LIMIT $1"
+UPDATE_ROW = "UPDATE {table} SET input_data = $2, result_data = $3, series = $4 WHERE id = $1"
+
+
+def compact_row(input_text, result_text):
+    """(input JSON, result JSON, blob, bytes before, bytes after), or None if it would not round-trip"""
+    input_data = json.loads(input_text) if input_text else {}
+    result_data = json.loads(result_text) if result_text else {}
+    new_input, new_result, blob = report_codec.compact(input_data, result_data)
+    if report_codec.expand(new_input, new_result, blob) != (input_data, result_data):
+        return None
+    new_input_text = json.dumps(new_input, separators=(",", ":"))
+    new_result_text = json.dumps(new_result, separators=(",", ":"))
+    before = len((input_text or "").encode()) + len((result_text or "").encode())
+    after = len(new_input_text.encode()) + len(new_result_text.encode()) + len(blob)
+    return new_input_text, new_result_text, blob, before, after
+
+
+async def migrate_table(table, batch_size=BATCH_SIZE, dry_run=False):
+    stats = {"rows": 0, "skipped": 0, "bytes_before": 0, "bytes_after": 0}
+    last_id = None
+    start = time.perf_counter()
+    async with database.connection() as conn:
+        pending = "series IS NULL" if await conn.fetchval(HAS_SERIES_COLUMN, table) else "TRUE"
+    while True:
+        async with database.connection() as conn:
+            if last_id is None:
+                rows = await conn.fetch(FIRST_BATCH.format(table=table, pending=pending), batch_size)
+            else:
+                rows = await conn.fetch(NEXT_BATCH.format(table=table, pending=pending), batch_size, last_id)
+            if not rows:
+                break
+            last_id = rows[-1]["id"]
+            updates = []
+            for row in rows:
+                compacted = compact_row(row["input_data"], row["result_data"])
+                if compacted is None:
+                    stats["skipped"] += 1
+                    continue
+                new_input, new_result, blob, before, after = compacted
+                stats["bytes_before"] += before
+                stats["bytes_after"] += after
+                updates.append((row["id"], new_input, new_result, blob))
+            if updates and not dry_run:
+                async with conn.transaction():
+                    await conn.executemany(UPDATE_ROW.format(table=table), updates)
+            stats["rows"] += len(updates)
+    stats["seconds"] = time.perf_counter() - start
+    return stats
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Move saved reports to compact series storage")
+    parser.add_argument("--dry-run", action="store_true", help="Measure the size reduction without writing")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    load_dotenv()
+    await database.open_pool(os.environ["DATABASE_URL"], min_size=1, max_size=1)
+    try:
+        if not args.dry_run:
+            async with database.connection() as conn:
+                for table in reports.TABLES.values():
+                    await conn.execute(ADD_SERIES_COLUMN.format(table=table))
+            await reports.create_indexes()
+        for table in reports.TABLES.values():
+            stats = await migrate_table(table, args.batch_size, args.dry_run)
+            ratio = stats["bytes_before"] / stats["bytes_after"] if stats["bytes_after"] else 0
+            print(f"{table:<20} {stats['rows']:>8} rows {'measured' if args.dry_run else 'compacted'}, "
+                  f"{stats['skipped']} skipped, {stats['bytes_before']:,} -> {stats['bytes_after']:,} bytes "
+                  f"({ratio:.1f}x smaller) in {stats['seconds']:.1f} s")
+    finally:
+        await database.close_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
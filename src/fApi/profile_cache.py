@@ -0,0 +1,130 @@
+"""
+Read-through cache of user profiles for /api/user-profile.
+
+Profiles are cached by user id for PROFILE_CACHE_TTL seconds and dropped
+whenever /api/save-user writes one. The store is pluggable:
+
+- MemoryBackend (default): a bounded dict in this process. Each worker has
+  its own, so another worker's write is only seen after the TTL.
+- RedisBackend (PROFILE_CACHE_URL=redis://...): one store shared by all
+  workers, so an invalidation is seen everywhere at once. Needs the `redis`
+  package, imported only when this backend is used.
+
+Backends implement async get/set/delete/close on JSON-encodable values.
+A failing backend never fails a request: errors are logged and treated as
+misses. Hits and misses are counted in the "profile" cache metric.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    from .logger import get_logger
+    from .metrics import record_cache
+except ImportError:
+    from logger import get_logger
+    from metrics import record_cache
+
+logger = get_logger("profile_cache")
+
+TTL = float(os.getenv("PROFILE_CACHE_TTL", "300"))  # Seconds
+MEMORY_MAX_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", "10000"))
+KEY_PREFIX = "profile:"
+
+
+class MemoryBackend:
+    """Per-process LRU with per-entry expiry"""
+
+    def __init__(self, max_size=MEMORY_MAX_SIZE, clock=time.monotonic):
+        self.max_size = max_size
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+
+    async def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if self._clock() >= entry[1]:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    async def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, self._clock() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    async def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    async def close(self):
+        pass
+
+
+class RedisBackend:
+    """Shared store in Redis; values are JSON strings with a Redis-side expiry"""
+
+    def __init__(self, url=None, client=None):
+        if client is None:
+            import redis.asyncio as redis  # type: ignore
+            client = redis.from_url(url)
+        self._client = client
+
+    async def get(self, key):
+        raw = await self._client.get(key)
+        return None if raw is None else json.loads(raw)
+
+    async def set(self, key, value, ttl):
+        await self._client.set(key, json.dumps(value), ex=max(1, int(ttl)))
+
+    async def delete(self, key):
+        await self._client.delete(key)
+
+    async def close(self):
+        await self._client.aclose()
+
+
+def make_backend(url=None):
+    """RedisBackend for a redis:// URL, otherwise MemoryBackend"""
+    if url and url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url)
+    return MemoryBackend()
+
+
+class ProfileCache:
+    def __init__(self, backend, ttl=TTL):
+        self.backend = backend
+        self.ttl = ttl
+
+    async def get(self, user_id):
+        """Cached profile, or None on a miss (or a backend error)"""
+        try:
+            profile = await self.backend.get(KEY_PREFIX + user_id)
+        except Exception as e:
+            logger.warning("Profile cache read failed", extra={"fields": {"error": str(e)}})
+            profile = None
+        record_cache("profile", profile is not None)
+        return profile
+
+    async def set(self, user_id, profile):
+        try:
+            await self.backend.set(KEY_PREFIX + user_id, profile, self.ttl)
+        except Exception as e:
+            logger.warning("Profile cache write failed", extra={"fields": {"error": str(e)}})
+
+    async def invalidate(self, user_id):
+        try:
+            await self.backend.delete(KEY_PREFIX + user_id)
+        except Exception as e:
+            logger.warning("Profile cache invalidation failed", extra={"fields": {"error": str(e)}})
+
+    async def close(self):
+        await self.backend.close()
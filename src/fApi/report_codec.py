@@ -0,0 +1,166 @@
+"""
+Compact storage of saved reports: numeric series as packed floats.
+
+A saved prediction carries 12 monthly or 30 daily values per series and
+their labels, and a saved financial analysis repeats the generation series
+in its input, all as JSON text (~8-18 bytes per value). compact() moves
+every known series out of input_data/result_data into one bytea blob at 4
+(float32) or 8 (float64) bytes per value, and drops labels that can be
+rebuilt: the month names are static, and daily labels are consecutive
+dates, stored as their first date. expand() restores the original JSON
+shape on read.
+
+Blob layout (little-endian):
+    u8 version, u8 label flags,
+    [i32 first daily label (date ordinal), u16 number of daily labels],
+    u8 series count, then per series: u8 code (| FLOAT64 for float64
+    values), u16 length, float32 or float64 values
+
+Series values are rounded to DECIMALS on decode. A series is stored as
+float32 only if that decodes back to exactly the saved values (float32
+steps exceed 0.01 above 2^17 = 131072), else as float64, else (more than
+DECIMALS decimals) it stays in the JSON, as do lists that are not all
+numbers (e.g. nulls).
+"""
+import datetime
+import functools
+import struct
+
+import numpy as np
+
+VERSION = 1
+DECIMALS = 2
+
+# Series code -> (JSON section, key); codes are stored, so only ever append
+SERIES = (
+    ("result_data", "monthly_ghi"),
+    ("result_data", "monthly_generation"),
+    ("result_data", "daily_ghi"),
+    ("result_data", "daily_generation"),
+    ("input_data", "monthly_generation"),
+    ("input_data", "daily_generation"),
+)
+
+MONTH_LABELS = [
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December"
+]
+MONTHLY_LABELS = 1  # result_data.monthly_labels were MONTH_LABELS
+DAILY_LABELS = 2  # result_data.daily_labels were consecutive dates
+FLOAT64 = 0x80  # Set in a series code whose values are float64
+
+_HEADER = struct.Struct("<BB")
+_DATES = struct.Struct("<iH")
+_COUNT = struct.Struct("<B")
+_SERIES = struct.Struct("<BH")
+
+
+class CodecError(ValueError):
+    """The blob is not a report series blob this version can read"""
+
+
+def _is_series(values):
+    return (
+        isinstance(values, list)
+        and 0 < len(values) <= 0xFFFF
+        and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values)
+    )
+
+
+def _decode(values):
+    return np.round(values.astype(np.float64), DECIMALS).tolist()
+
+
+def _pack_values(values):
+    """(dtype, bytes) of the narrowest float that decodes back to values exactly, or None"""
+    for dtype in ("<f4", "<f8"):
+        array = np.asarray(values, dtype=dtype)
+        if _decode(array) == values:
+            return dtype, array.tobytes()
+    return None
+
+
+@functools.lru_cache(maxsize=1024)
+def _date_labels(ordinal, days):
+    """`days` consecutive YYYY-MM-DD labels from a date ordinal (reports share a few start dates)"""
+    start = np.datetime64(datetime.date.fromordinal(ordinal), "D")
+    return tuple(np.datetime_as_string(np.arange(start, start + days)).tolist())
+
+
+def _daily_start(labels):
+    """Ordinal of the first of labels that are consecutive YYYY-MM-DD days, else None"""
+    if not isinstance(labels, list) or not 0 < len(labels) <= 0xFFFF:
+        return None
+    try:
+        ordinal = datetime.date.fromisoformat(labels[0]).toordinal()
+    except (TypeError, ValueError):
+        return None
+    return ordinal if tuple(labels) == _date_labels(ordinal, len(labels)) else None
+
+
+def compact(input_data, result_data):
+    """(input_data, result_data, blob) with series and derivable labels moved into the blob"""
+    sections = {"input_data": dict(input_data or {}), "result_data": dict(result_data or {})}
+    result = sections["result_data"]
+    flags = 0
+    parts = []
+
+    if result.get("monthly_labels") == MONTH_LABELS:
+        del result["monthly_labels"]
+        flags |= MONTHLY_LABELS
+    daily_start = _daily_start(result.get("daily_labels"))
+    if daily_start is not None:
+        flags |= DAILY_LABELS
+        parts.append(_DATES.pack(daily_start, len(result.pop("daily_labels"))))
+
+    packed = []
+    for code, (section, key) in enumerate(SERIES):
+        values = sections[section].get(key)
+        if not _is_series(values):
+            continue
+        encoded = _pack_values(values)
+        if encoded is not None:
+            dtype, data = encoded
+            del sections[section][key]
+            packed.append(_SERIES.pack(code | (FLOAT64 if dtype == "<f8" else 0), len(values)) + data)
+    parts.append(_COUNT.pack(len(packed)))
+    parts.extend(packed)
+
+    blob = _HEADER.pack(VERSION, flags) + b"".join(parts)
+    return sections["input_data"], sections["result_data"], blob
+
+
+def expand(input_data, result_data, blob):
+    """Inverse of compact(): the report's input_data and result_data as saved"""
+    sections = {"input_data": dict(input_data or {}), "result_data": dict(result_data or {})}
+    if not blob:
+        return sections["input_data"], sections["result_data"]
+    blob = bytes(blob)
+    try:
+        version, flags = _HEADER.unpack_from(blob)
+        if version != VERSION:
+            raise CodecError(f"Unsupported report blob version {version}")
+        offset = _HEADER.size
+        daily_start = None
+        if flags & DAILY_LABELS:
+            daily_start, days = _DATES.unpack_from(blob, offset)
+            offset += _DATES.size
+        (count,) = _COUNT.unpack_from(blob, offset)
+        offset += _COUNT.size
+        for _ in range(count):
+            code, length = _SERIES.unpack_from(blob, offset)
+            offset += _SERIES.size
+            dtype = "<f8" if code & FLOAT64 else "<f4"
+            values = np.frombuffer(blob, dtype=dtype, count=length, offset=offset)
+            offset += values.nbytes
+            section, key = SERIES[code & ~FLOAT64]
+            sections[section][key] = _decode(values)
+        if flags & MONTHLY_LABELS:
+            sections["result_data"]["monthly_labels"] = list(MONTH_LABELS)
+        if daily_start is not None:
+            sections["result_data"]["daily_labels"] = list(_date_labels(daily_start, days))
+    except CodecError:
+        raise
+    except (struct.error, ValueError, IndexError, OverflowError) as e:
+        raise CodecError(f"Corrupt report blob: {e}") from e
+    return sections["input_data"], sections["result_data"]
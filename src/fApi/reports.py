@@ -0,0 +1,191 @@
+"""
+Saved prediction and financial reports, listed as summaries.
+
+The profile page used to select('*') every saved report, monthly/daily
+arrays included, on each view. Here a list is one page of summary rows
+(id, created_at and a few scalar fields projected out of the JSON columns),
+and the full input/result payload is fetched by id when a report is opened.
+
+Reports are saved through save_report(), which stores their series as
+packed floats in the `series` column (see report_codec.py); the JSON
+columns keep the scalars. Rows saved before that have no blob and are
+returned as stored.
+
+Pages are keyset-paginated on (created_at, id), newest first: the cursor is
+the last row's key, so every page is an index range scan on
+(user_id, created_at DESC, id DESC) however deep the client pages, unlike
+OFFSET. The indexes and the `series` column are created, and existing rows
+compacted, by migrate_reports.py.
+"""
+import base64
+import datetime
+import json
+
+try:
+    from . import database, report_codec
+except ImportError:
+    import database
+    import report_codec
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# URL name -> table
+TABLES = {
+    "predictions": "predictions",
+    "financial-analyses": "financial_analyses",
+}
+
+# Scalar fields of each summary row: (response key, SQL text expression, numeric)
+SUMMARY_FIELDS = {
+    "predictions": (
+        ("state", "result_data->>'state'", False),
+        ("mode", "input_data->>'predictionMode'", False),
+        ("latitude", "input_data->>'latitude'", False),
+        ("longitude", "input_data->>'longitude'", False),
+        ("area", "input_data->>'area'", False),
+        ("areaUnit", "input_data->>'areaUnit'", False),
+        # Yearly totals for historical predictions, the 30-day totals for realtime ones
+        ("generation", "COALESCE(result_data->>'yearly_generation', result_data->>'total_generation')", True),
+        ("ghi", "COALESCE(result_data->>'yearly_ghi', result_data->>'total_ghi')", True),
+    ),
+    "financial-analyses": (
+        ("state", "result_data->>'state'", False),
+        ("month", "result_data->>'month'", False),
+        ("unitsConsumed", "input_data->>'unitsConsumed'", False),
+        ("billSavings", "result_data->>'billSavings'", True),
+        ("originalBill", "result_data->>'originalBill'", True),
+        ("newBill", "result_data->>'newBill'", True),
+        ("yearlyGeneration", "input_data->>'yearly_generation'", True),
+    ),
+}
+
+REPORT_INDEXES = tuple(
+    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {table}_user_created_idx "
+    f"ON {table} (user_id, created_at DESC, id DESC)"
+    for table in TABLES.values()
+)
+
+
+def _summary_sql(kind):
+    table = TABLES[kind]
+    columns = ", ".join(f"{expr} AS \"{key}\"" for key, expr, _ in SUMMARY_FIELDS[kind])
+    select = f"SELECT id, created_at, {columns} FROM {table} WHERE user_id = $1"
+    order = "ORDER BY created_at DESC, id DESC LIMIT $2"
+    return (
+        f"{select} {order}",
+        f"{select} AND (created_at, id) < ($3, $4) {order}",
+    )
+
+
+# kind -> (first page, page after a cursor)
+LIST_SQL = {kind: _summary_sql(kind) for kind in TABLES}
+FETCH_SQL = {
+    kind: f"SELECT id, created_at, input_data, result_data, series FROM {table} WHERE id = $1 AND user_id = $2"
+    for kind, table in TABLES.items()
+}
+# Columns written for a new report, in report_record() order (also used for COPY)
+REPORT_COLUMNS = ("user_id", "input_data", "result_data", "series")
+INSERT_SQL = {
+    kind: f"INSERT INTO {table} ({', '.join(REPORT_COLUMNS)}) VALUES ($1, $2, $3, $4) "
+          f"RETURNING id, created_at"
+    for kind, table in TABLES.items()
+}
+
+
+class InvalidCursor(ValueError):
+    """The cursor was not produced by list_reports"""
+
+
+def _report_id(value):
+    # Ids are passed to asyncpg in the column's own type: bigint ids as int, uuids as str
+    return int(value) if isinstance(value, str) and value.isdigit() else value
+
+
+def encode_cursor(created_at, report_id):
+    key = json.dumps([created_at.isoformat(), str(report_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(key.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """(created_at, id) of the last row of the previous page"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, report_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.datetime.fromisoformat(created_at), _report_id(report_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+
+
+def _number(text):
+    try:
+        return float(text) if text is not None else None
+    except ValueError:
+        return None
+
+
+def _summary(kind, row):
+    summary = {"id": str(row["id"]), "createdAt": row["created_at"].isoformat()}
+    for key, _, numeric in SUMMARY_FIELDS[kind]:
+        summary[key] = _number(row[key]) if numeric else row[key]
+    return summary
+
+
+async def list_reports(kind, user_id, limit=DEFAULT_PAGE_SIZE, cursor=None):
+    """One page of the user's report summaries, newest first: (items, next cursor or None)"""
+    first_page, next_page = LIST_SQL[kind]
+    # One extra row tells whether there is a next page
+    async with database.connection() as conn:
+        if cursor is None:
+            rows = await conn.fetch(first_page, user_id, limit + 1)
+        else:
+            rows = await conn.fetch(next_page, user_id, limit + 1, *decode_cursor(cursor))
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+    return [_summary(kind, row) for row in rows], next_cursor
+
+
+async def fetch_report(kind, user_id, report_id):
+    """The full saved report, or None if it does not exist or belongs to someone else"""
+    async with database.connection() as conn:
+        row = await conn.fetchrow(FETCH_SQL[kind], _report_id(report_id), user_id)
+    if row is None:
+        return None
+    # asyncpg hands json/jsonb columns over as text
+    input_data, result_data = report_codec.expand(
+        json.loads(row["input_data"]) if row["input_data"] else {},
+        json.loads(row["result_data"]) if row["result_data"] else {},
+        row["series"],
+    )
+    return {
+        "id": str(row["id"]),
+        "createdAt": row["created_at"].isoformat(),
+        "input_data": input_data,
+        "result_data": result_data,
+    }
+
+
+def _json(value):
+    return json.dumps(value, separators=(",", ":"))
+
+
+def report_record(user_id, input_data, result_data):
+    """A new report as a REPORT_COLUMNS row, series packed"""
+    input_data, result_data, series = report_codec.compact(input_data, result_data)
+    return user_id, _json(input_data), _json(result_data), series
+
+
+async def save_report(kind, user_id, input_data, result_data):
+    """Store a report with its series packed; the new row's summary fields (id, createdAt)"""
+    async with database.connection() as conn:
+        row = await conn.fetchrow(INSERT_SQL[kind], *report_record(user_id, input_data, result_data))
+    return {"id": str(row["id"]), "createdAt": row["created_at"].isoformat()}
+
+
+async def create_indexes():
+    """Build the listing indexes without blocking writes (no-op once they exist)"""
+    async with database.connection() as conn:
+        for statement in REPORT_INDEXES:
+            await conn.execute(statement)
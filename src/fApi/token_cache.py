@@ -0,0 +1,66 @@
+"""
+Cache of verified JWT claims, so a polling client's token is verified once.
+
+Entries are keyed by the SHA-256 of the whole token (signature included, so
+a modified token never matches) and kept until the token's own `exp`: a
+lookup at or after `exp` is a miss and drops the entry, and tokens without
+`exp` are never cached. Least recently used entries are evicted beyond
+max_size. Lookups and inserts are O(1) and thread-safe; hits and misses are
+counted in the "jwt" cache metric.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    from .metrics import record_cache
+except ImportError:
+    from metrics import record_cache
+
+MAX_SIZE = int(os.getenv("JWT_CACHE_SIZE", "10000"))
+
+
+class VerifiedTokenCache:
+    def __init__(self, max_size=MAX_SIZE, clock=time.time):
+        self.max_size = max_size
+        self._clock = clock
+        self._entries = OrderedDict()  # token hash -> (claims, exp)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _key(token):
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token):
+        """Verified claims of the token, or None if not cached or expired"""
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._clock() >= entry[1]:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        record_cache("jwt", entry is not None)
+        return None if entry is None else entry[0]
+
+    def put(self, token, claims):
+        """Remember claims that were just verified for this token"""
+        exp = claims.get("exp")
+        if not isinstance(exp, (int, float)) or self._clock() >= exp:
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (claims, exp)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -1,25 +1,138 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import FileResponse, JSONResponse
+from pydantic import BaseModel, Field
+from typing import Annotated, Literal, Optional, Union
 import os
 try:
     from .solar_model import SolarGHIModel
-    from .realtime_model.realtime_solar_model import predict_realtime_ghi
+    from .realtime_model.realtime_solar_model import predict_realtime_ghi, load_realtime_artifacts, REALTIME_DAYS
     from .state_lookup import StateLookup
+    from .logger import get_logger, StageTimer
+    from .metrics import MetricsMiddleware, observe_stages, metrics_response
+    from .responses import ORJSONResponse, round_array, add_compression
+    from .tariffs import get_tariff
+    from . import battery, hourly, jobs, lifetime, pv_performance, sizing, weather
 except ImportError:
     from solar_model import SolarGHIModel
-    from realtime_model.realtime_solar_model import predict_realtime_ghi
+    from realtime_model.realtime_solar_model import predict_realtime_ghi, load_realtime_artifacts, REALTIME_DAYS
     from state_lookup import StateLookup
+    from logger import get_logger, StageTimer
+    from metrics import MetricsMiddleware, observe_stages, metrics_response
+    from responses import ORJSONResponse, round_array, add_compression
+    from tariffs import get_tariff
+    import battery
+    import hourly
+    import jobs
+    import lifetime
+    import pv_performance
+    import sizing
+    import weather
+import asyncio
+import logging
+import shutil
+import time
+import uuid
+from contextlib import asynccontextmanager
 import numpy as np
+import pandas as pd
 import joblib
 import requests
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-app = FastAPI()
+logger = get_logger("api")
+
+# Read-only artifacts, populated by load_models() (see lifespan below)
+model_path = os.path.join("src", "model", "data", "xgboost_model_ghi_predictor.pkl")
+model = None
+state_lookup = None
+
+# Bulk jobs (see jobs.py), set up by the lifespan of each worker
+job_store = None
+job_runner = None
+
+# Synthetic inputs for warm-up: one point per region, outside India included
+# so the "not found" branch of the state lookup is exercised too
+WARMUP_POINTS = [
+    (28.6139, 77.2090),   # Delhi
+    (19.0760, 72.8777),   # Mumbai
+    (12.9716, 77.5946),   # Bangalore
+    (22.5726, 88.3639),   # Kolkata
+    (25.2048, 55.2708),   # Dubai
+]
+
+def load_models():
+    """
+    Load the GHI model, realtime model/climatology, hourly TMY and state boundaries.
+
+    No-op when already loaded, so serve.py can call it in the master process
+    before forking and the workers' lifespan then reuses the shared copies.
+    """
+    global model, state_lookup
+    if model is not None:
+        return
+    start = time.perf_counter()
+    
+    # Initialize models
+    ghi_model = SolarGHIModel()
+    ghi_model.load_model(model_path)
+    
+    # Load realtime model, scaler and memory-mapped daily climatology
+    load_realtime_artifacts()
+    
+    # Memory-mapped hourly GHI/temperature/wind for the 8760 simulation
+    hourly.load_hourly_tmy()
+    
+    # Initialize state lookup
+    state_lookup = StateLookup()
+    model = ghi_model
+    logger.info("Models loaded", extra={"fields": {"load_ms": round((time.perf_counter() - start) * 1000, 3)}})
+
+def warm_up():
+    """
+    Run synthetic predictions through every engine.
+
+    XGBoost (and its OpenMP thread pool) initializes lazily on the first
+    predict, so without this the first real request pays for it. This runs in
+    each worker after fork, never in the pre-fork master.
+    """
+    start = time.perf_counter()
+    start_date = datetime.now().strftime('%Y-%m-%d')
+    for lat, lon in WARMUP_POINTS:
+        state_lookup.get_state_from_coords(lat, lon)
+        model.predict(lat, lon)
+        predict_realtime_ghi(lat, lon, start_date, 30.0, 3.0)
+    logger.info("Warm-up complete", extra={"fields": {
+        "points": len(WARMUP_POINTS),
+        "warmup_ms": round((time.perf_counter() - start) * 1000, 3),
+    }})
+
+async def _warm_up_and_mark_ready(app):
+    try:
+        await asyncio.to_thread(warm_up)
+        app.state.ready = True
+    except Exception:
+        logger.exception("Warm-up failed, staying not ready")
+
+@asynccontextmanager
+async def lifespan(app):
+    global job_store, job_runner
+    app.state.ready = False
+    load_models()
+    # Warm up in the background so /health answers while /ready holds traffic back
+    app.state.warmup_task = asyncio.create_task(_warm_up_and_mark_ready(app))
+    job_store = jobs.JobStore()
+    job_runner = jobs.JobRunner(job_store, score_sites)
+    job_runner.start()
+    yield
+    app.state.warmup_task.cancel()
+    await job_runner.stop()
+
+app = FastAPI(lifespan=lifespan)
 
 # Enable CORS
 app.add_middleware(
@@ -29,22 +142,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-
-# Initialize models
-model = SolarGHIModel()
-model_path = os.path.join("src", "model", "data", "xgboost_model_ghi_predictor.pkl")
-model.load_model(model_path)
-
-# Load realtime model
-realtime_model_path = os.path.join("src", "model", "realtime_model", "xgboost_model_realtime.pkl")
-realtime_scaler_path = os.path.join("src", "model", "realtime_model", "scaler_realtime.pkl")
-
-# Initialize state lookup
-state_lookup = StateLookup()
-
-# OpenWeather API configuration
-OPENWEATHER_API_KEY = os.getenv('OPENWEATHER_API_KEY')
-OPENWEATHER_BASE_URL = "http://api.openweathermap.org/data/2.5/forecast"
+add_compression(app)
+app.add_middleware(MetricsMiddleware)
 
 # State max allowed capacity mapping (kW)
 STATE_CAPACITY_LIMITS = {
@@ -103,30 +202,192 @@ def get_state_capacity_limit(state_name):
             return STATE_CAPACITY_LIMITS[k]
     return 500
 
+# System parameters used to turn GHI into generation
+SYSTEM_EFFICIENCY = 0.15  # Typical solar panel efficiency
+PERFORMANCE_RATIO = 0.75  # Standard performance ratio
+PANEL_AREA_PER_KW = 10  # m² of roof per kW installed
+SQFT_TO_SQM = 0.092903
+
+# Environmental factors per kWh generated
+CO2_PER_KWH = 0.82  # kg CO2 per kWh (India's grid emission factor)
+WATER_PER_KWH = 3.79  # Liters of water saved per kWh
+COAL_PER_KWH = 0.4  # kg of coal saved per kWh
+CO2_PER_TREE = 20  # One tree absorbs ~20kg CO2 per year
+
+MONTH_LABELS = [
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December"
+]
+
+def area_in_square_meters(roof_area, area_unit):
+    """Convert roof area to square meters if needed"""
+    if area_unit == "sqft":
+        return roof_area * SQFT_TO_SQM  # Convert sqft to sqm
+    return roof_area
+
+def resolve_capacity(state, area_in_sqm):
+    """Allowed system size: the smaller of what fits on the roof and the state's cap"""
+    max_possible_capacity = area_in_sqm / PANEL_AREA_PER_KW  # kW
+    state_cap = get_state_capacity_limit(state)
+    return {
+        "max_possible_capacity": max_possible_capacity,
+        "state_cap": state_cap,
+        "final_allowed_capacity": min(state_cap, max_possible_capacity),
+        "limited_by": "state" if state_cap < max_possible_capacity else "area",
+    }
+
+def generation_from_ghi(ghi, capacity_kw):
+    """Generation (kWh) for an array of GHI values (kWh/m²) on a system of capacity_kw"""
+    efficiency = SYSTEM_EFFICIENCY * PERFORMANCE_RATIO
+    return np.asarray(ghi, dtype=np.float64) * (capacity_kw * PANEL_AREA_PER_KW * efficiency)
+
+def site_hourly_generation(request, capacity_kw, monthly_ghi=None):
+    """
+    8760-hour generation (kWh) at the request's site, with the request's PV model.
+
+    monthly_ghi is spread over the hours when there is no hourly TMY data, and
+    otherwise rescales the TMY months to it (see hourly.site_weather).
+    """
+    weather = hourly.site_weather(request.latitude, request.longitude, monthly_ghi)
+    if request.pv_model == "poa":
+        return pv_performance.pv_generation(
+            request.latitude,
+            request.longitude,
+            weather["ghi"],
+            weather["air_temperature"],
+            weather["wind_speed"],
+            capacity_kw * PANEL_AREA_PER_KW * SYSTEM_EFFICIENCY,
+            tilt=request.tilt,
+            azimuth=request.azimuth,
+            diffuse=weather["diffuse"],
+        )
+    return generation_from_ghi(weather["ghi"], capacity_kw)
+
+def site_monthly_generation(request, monthly_ghi, capacity_kw):
+    """Monthly generation (kWh) from the model's monthly GHI, through the hourly model for 'poa'"""
+    if request.pv_model == "poa":
+        return hourly.monthly_totals(site_hourly_generation(request, capacity_kw, monthly_ghi))
+    return generation_from_ghi(monthly_ghi, capacity_kw)
+
+def forecast_generation(request, capacity_kw, hours):
+    """Hourly generation (kWh) over a weather.nowcast() window, with the request's PV model"""
+    if request.pv_model == "poa":
+        return pv_performance.pv_generation(
+            request.latitude,
+            request.longitude,
+            hours["ghi"],
+            hours["temperature"],
+            hours["wind_speed"],
+            capacity_kw * PANEL_AREA_PER_KW * SYSTEM_EFFICIENCY,
+            tilt=request.tilt,
+            azimuth=request.azimuth,
+            sun=hours["sun"],
+        )
+    return generation_from_ghi(hours["ghi"], capacity_kw)
+
+def yearly_environmental_metrics(yearly_generation):
+    """Environmental impact of a year's generation, rounded for display"""
+    co2_saved_yearly = yearly_generation * CO2_PER_KWH  # kg CO2/year
+    return {
+        "co2_saved_yearly": round(co2_saved_yearly, 2),
+        "co2_saved_25_years": round(co2_saved_yearly * 25, 2),  # kg CO2 over 25 years
+        "trees_equivalent": round(co2_saved_yearly / CO2_PER_TREE, 1),
+        "water_saved": round(yearly_generation * WATER_PER_KWH, 2),
+        "coal_saved": round(yearly_generation * COAL_PER_KWH, 2),
+    }
+
+def score_sites(sites):
+    """
+    /predict for a whole DataFrame of sites (lat, lon, roof_area, unit), for bulk jobs.
+
+    One spatial-index query finds every state and one model call scores
+    every site-month; generation uses the 'simple' PV model. Rows with an
+    invalid value get an `error` and empty results instead of failing the job.
+    """
+    lat = sites["lat"].to_numpy(dtype=np.float64)
+    lon = sites["lon"].to_numpy(dtype=np.float64)
+    roof_area = sites["roof_area"].to_numpy(dtype=np.float64)
+    unit = sites["unit"].to_numpy(dtype=object)
+
+    errors = np.full(len(sites), None, dtype=object)
+    errors[~np.isin(unit, ("sqm", "sqft"))] = "unit must be 'sqm' or 'sqft'"
+    errors[~(roof_area > 0)] = "roof_area must be a positive number"
+    errors[~(np.isfinite(lat) & np.isfinite(lon))] = "lat and lon must be numbers"
+    valid = pd.isna(errors)
+
+    states = np.full(len(sites), None, dtype=object)
+    states[valid] = state_lookup.get_states(lat[valid], lon[valid])
+    states[valid & pd.isna(states)] = "Unknown Location"
+
+    area_in_sqm = np.where(unit == "sqft", roof_area * SQFT_TO_SQM, roof_area)
+    max_possible_capacity = area_in_sqm / PANEL_AREA_PER_KW
+    state_caps = {state: get_state_capacity_limit(state) for state in set(states[valid])}
+    state_cap = pd.Series(states).map(state_caps).to_numpy(dtype=np.float64)
+    capacity = np.where(valid, np.minimum(state_cap, max_possible_capacity), np.nan)
+
+    monthly_ghi = np.full((len(sites), 12), np.nan)
+    yearly_ghi = np.full(len(sites), np.nan)
+    if valid.any():
+        monthly_ghi[valid], yearly_ghi[valid] = model.predict_batch(lat[valid], lon[valid])
+    monthly_generation = generation_from_ghi(monthly_ghi, capacity[:, None])
+    yearly_generation = monthly_generation.sum(axis=1)
+    co2_saved_yearly = yearly_generation * CO2_PER_KWH
+
+    def series(values):
+        return [row if ok else None for row, ok in zip(round_array(values), valid)]
+
+    return pd.DataFrame({
+        "state": states,
+        "capacity_kw": np.round(capacity, 3),
+        "limited_by": np.where(valid, np.where(state_cap < max_possible_capacity, "state", "area"), None),
+        "yearly_ghi": round_array(yearly_ghi),
+        "yearly_generation": round_array(yearly_generation),
+        # As yearly_environmental_metrics(), per site
+        "co2_saved_yearly": round_array(co2_saved_yearly),
+        "co2_saved_25_years": round_array(co2_saved_yearly * 25),
+        "trees_equivalent": round_array(co2_saved_yearly / CO2_PER_TREE, 1),
+        "water_saved": round_array(yearly_generation * WATER_PER_KWH),
+        "coal_saved": round_array(yearly_generation * COAL_PER_KWH),
+        "monthly_ghi": series(monthly_ghi),
+        "monthly_generation": series(monthly_generation),
+        "error": errors,
+    })
+
 class PredictionRequest(BaseModel):
     latitude: float
     longitude: float
     roof_area: float
     area_unit: str  # 'sqm' or 'sqft'
+    # 'simple': constant efficiency factor on GHI; 'poa': hourly plane-of-array
+    # irradiance with temperature derating (pv_performance.py)
+    pv_model: Literal["simple", "poa"] = "simple"
+    tilt: Optional[float] = None  # Degrees from horizontal, 'poa' only; defaults to the latitude
+    azimuth: float = pv_performance.DEFAULT_AZIMUTH  # Degrees clockwise from north (180 = south), 'poa' only
+
+class DailyWeather(BaseModel):
+    date: date  # YYYY-MM-DD
+    temperature: float  # °C
+    wind_speed: float  # m/s
 
 class RealtimePredictionRequest(BaseModel):
     latitude: float
     longitude: float
     roof_area: float
     area_unit: str  # 'sqm' or 'sqft'
-    temperature: float  # °C
-    wind_speed: float  # m/s
     start_date: str  # YYYY-MM-DD
+    # Per-day weather (forecast_data from /fetch-weather). Without it, a given
+    # temperature/wind_speed is taken as today's; with neither, the 5-day
+    # forecast is fetched here
+    forecast: Optional[list[DailyWeather]] = None
+    temperature: Optional[float] = None  # °C
+    wind_speed: Optional[float] = None  # m/s
 
 class PredictionResponse(BaseModel):
     monthly_ghi: list[float]
     yearly_ghi: float
     monthly_generation: list[float]
     yearly_generation: float
-    monthly_labels: list[str] = [
-        "January", "February", "March", "April", "May", "June",
-        "July", "August", "September", "October", "November", "December"
-    ]
+    monthly_labels: list[str] = MONTH_LABELS
     # Location information
     state: str
     # Environmental metrics
@@ -136,12 +397,28 @@ class PredictionResponse(BaseModel):
     water_saved: float
     coal_saved: float
 
+class AnalysisRequest(PredictionRequest):
+    monthly_consumption: Optional[list[float]] = None  # kWh; 12 values, or one value for every month
+
+class CapacityDetails(BaseModel):
+    max_possible_capacity: float  # kW that fit on the roof
+    state_cap: float  # kW allowed by the state
+    final_allowed_capacity: float  # kW used for generation
+    limited_by: str  # 'state' or 'area'
+
+class AnalysisResponse(PredictionResponse):
+    capacity: CapacityDetails
+    tariff: dict  # State policy from the tariff engine
+    financial: Optional[dict] = None  # Monthly bills/savings/export income and totals (when consumption given)
+
 class RealtimePredictionResponse(BaseModel):
     daily_ghi: list[float]
     total_ghi: float
     daily_generation: list[float]
     total_generation: float
     daily_labels: list[str]  # Will contain dates
+    weather_source: str  # 'forecast' (given), 'openweather' (fetched), 'current' (one value) or 'climatology'
+    forecast_days: int  # Days driven by actual weather; the rest blend into climatology
     # Location information
     state: str
     # Environmental metrics
@@ -159,6 +436,124 @@ class WeatherForecastResponse(BaseModel):
     forecast_data: list[dict]
     message: str
 
+class NowcastRequest(PredictionRequest):
+    capacity_kw: Optional[float] = None  # Defaults to the allowed capacity
+    include_hourly: bool = True  # Also return the hourly series
+
+class NowcastResponse(BaseModel):
+    state: str
+    capacity_kw: float
+    start: str  # First forecast hour (UTC)
+    hours: int
+    daily: dict  # date (IST), ghi, clear_sky_ghi and generation per day
+    totals: dict  # Sums of the daily series
+    hourly: Optional[dict] = None  # time (UTC), ghi, clear_sky_ghi, cloud_cover, temperature, humidity, wind_speed, generation
+
+class FinancialAnalysisRequest(BaseModel):
+    state: str
+    generation: list[float]  # kWh per period (e.g. monthly_generation from /predict)
+    consumption: list[float]  # kWh per period, same length as generation or a single value for all
+
+class FinancialAnalysisResponse(BaseModel):
+    tariff: dict  # State policy: metering, export rate, whether export is allowed, ...
+    original_bill: list[float]
+    new_bill: list[float]
+    bill_savings: list[float]
+    export_units: list[float]
+    export_income: list[float]
+    total_benefit: list[float]
+    totals: dict  # Sum of each series above
+
+# Financial assumptions that may be swept: a list runs every combination
+SWEEP_PARAMETERS = ("system_cost", "degradation", "tariff_escalation", "export_escalation", "discount_rate")
+MAX_SWEEP_SCENARIOS = 100000
+
+Positive = Annotated[float, Field(gt=0)]
+DiscountRate = Annotated[float, Field(gt=-1)]  # At -1 or below the discount factor (1 + rate)^t is not positive
+
+class LifetimeAnalysisRequest(BaseModel):
+    state: str
+    monthly_generation: list[float]  # First-year kWh per month (monthly_generation from /predict)
+    monthly_consumption: list[float]  # kWh; 12 values, or one value for every month
+    capacity_kw: Optional[Positive] = None  # Prices the system when system_cost is not given
+    system_cost: Optional[Union[Positive, list[Positive]]] = None  # ₹
+    years: int = lifetime.DEFAULT_YEARS
+    degradation: Union[float, list[float]] = lifetime.DEFAULT_DEGRADATION  # Fraction of output lost per year
+    tariff_escalation: Union[float, list[float]] = lifetime.DEFAULT_TARIFF_ESCALATION  # Yearly tariff increase
+    export_escalation: Union[float, list[float]] = lifetime.DEFAULT_EXPORT_ESCALATION  # Yearly export rate increase
+    discount_rate: Union[DiscountRate, list[DiscountRate]] = lifetime.DEFAULT_DISCOUNT_RATE
+
+class LifetimeAnalysisResponse(BaseModel):
+    state: str
+    years: int
+    scenarios: int
+    parameters: dict  # One column per financial assumption, one row per scenario
+    npv: list[float]  # ₹
+    irr: list[Optional[float]]  # null when the system never pays back
+    payback_years: list[Optional[float]]
+    lcoe: list[float]  # ₹/kWh
+    lifetime_generation: list[float]  # kWh, with degradation
+    lifetime_savings: list[float]  # ₹, with tariff escalation
+    co2_saved_lifetime: list[float]  # kg CO2
+    yearly: Optional[dict] = None  # Year-by-year series, for a single scenario only
+
+MAX_SIZE_CANDIDATES = 10000
+
+class OptimizeSizeRequest(PredictionRequest):
+    monthly_consumption: list[float]  # kWh; 12 values, or one value for every month
+    objective: str = "npv"  # 'npv' (maximize) or 'payback' (minimize)
+    candidates: int = sizing.DEFAULT_CANDIDATES  # Grid size before refinement
+    cost_per_kw: float = lifetime.COST_PER_KW  # ₹ per kW installed
+    years: int = lifetime.DEFAULT_YEARS
+    degradation: float = lifetime.DEFAULT_DEGRADATION
+    tariff_escalation: float = lifetime.DEFAULT_TARIFF_ESCALATION
+    export_escalation: float = lifetime.DEFAULT_EXPORT_ESCALATION
+    discount_rate: float = lifetime.DEFAULT_DISCOUNT_RATE
+
+class OptimizeSizeResponse(BaseModel):
+    state: str
+    objective: str
+    capacity: CapacityDetails  # Caps the search; final_allowed_capacity is today's default size
+    tariff: dict
+    optimal: dict  # capacity_kw, system_cost, yearly_generation, npv, irr, payback_years, lcoe, ...
+    grid: dict  # capacity_kw, npv and payback_years of every grid candidate
+
+class HourlyProfileRequest(PredictionRequest):
+    monthly_consumption: Optional[list[float]] = None  # kWh; 12 or 1 values, spread with a residential profile
+    hourly_load: Optional[list[float]] = None  # kWh; 8760 hourly values, or 24 for a typical day
+    capacity_kw: Optional[float] = None  # Defaults to the allowed capacity
+
+class HourlySimulationRequest(HourlyProfileRequest):
+    include_hourly: bool = False  # Also return the 8760-hour series
+
+class HourlySimulationResponse(BaseModel):
+    state: str
+    capacity_kw: float
+    irradiance_source: str  # 'tmy' (hourly data of the nearest location) or 'monthly_model'
+    monthly: dict  # generation, load, self_consumption, import, export per month (kWh)
+    totals: dict  # Yearly sums of the monthly series
+    self_consumption_ratio: float  # Share of generation used on site
+    self_sufficiency: float  # Share of load met by solar
+    tariff: dict
+    metering: dict  # Yearly benefit (₹) under net metering, net billing and gross metering
+    typical_day: dict  # Average generation and load per month and hour (12 x 24)
+    hourly: Optional[dict] = None  # generation, load, import, export (8760 values each)
+
+MAX_BATTERY_CANDIDATES = 100  # dispatch() holds several (candidates, 8760) arrays, ~70 kB per candidate each
+
+class BatteryAnalysisRequest(HourlyProfileRequest):
+    battery_capacities_kwh: list[float] = battery.DEFAULT_CAPACITIES_KWH
+    power_ratings_kw: Optional[list[float]] = None  # Every capacity is tried with every rating; default 0.5 kW per kWh
+    round_trip_efficiency: float = battery.ROUND_TRIP_EFFICIENCY
+    battery_cost_per_kwh: float = battery.COST_PER_KWH  # ₹
+
+class BatteryAnalysisResponse(BaseModel):
+    state: str
+    capacity_kw: float  # Solar system size
+    irradiance_source: str
+    tariff: dict  # Includes export_allowed and export_rate, which decide what storage is worth
+    batteries: dict  # One column per metric, one row per candidate battery (capacity_kwh, power_kw, cycles, savings, ...)
+
 class StateLookupRequest(BaseModel):
     latitude: float
     longitude: float
@@ -169,182 +564,291 @@ class StateLookupResponse(BaseModel):
 
 @app.post("/predict", response_model=PredictionResponse)
 async def predict(request: PredictionRequest):
+    timer = StageTimer()
     try:
-        # Convert roof area to square meters if needed
-        area_in_sqm = request.roof_area
-        if request.area_unit == "sqft":
-            area_in_sqm = request.roof_area * 0.092903  # Convert sqft to sqm
+        area_in_sqm = area_in_square_meters(request.roof_area, request.area_unit)
         
         # Get state from coordinates
-        state = state_lookup.get_state_from_coords(request.latitude, request.longitude)
+        with timer.stage("state_lookup"):
+            state = state_lookup.get_state_from_coords(request.latitude, request.longitude)
         if not state:
             state = "Unknown Location"
         
-        # --- New logic for capacity limits ---
-        max_possible_capacity = area_in_sqm / 10  # kW
-        state_cap = get_state_capacity_limit(state)
-        final_allowed_capacity = min(state_cap, max_possible_capacity)
+        with timer.stage("capacity"):
+            capacity = resolve_capacity(state, area_in_sqm)
         
         # Get GHI predictions (in kWh/m²)
-        monthly_ghi, yearly_ghi = model.predict(request.latitude, request.longitude)
+        with timer.stage("model"):
+            monthly_ghi, yearly_ghi = model.predict(request.latitude, request.longitude)
         
-        # Calculate generation based on GHI and system parameters
-        system_efficiency = 0.15  # Typical solar panel efficiency
-        performance_ratio = 0.75  # Standard performance ratio
-        efficiency = system_efficiency * performance_ratio
-        
-        # Calculate generation (in kWh)
-        monthly_generation = [ghi * final_allowed_capacity * 10 * efficiency for ghi in monthly_ghi]
-        yearly_generation = sum(monthly_generation)
-        
-        # Environmental impact calculations based on generation
-        co2_per_kwh = 0.82  # kg CO2 per kWh (India's grid emission factor)
-        co2_saved_yearly = yearly_generation * co2_per_kwh  # kg CO2/year
-        co2_saved_25_years = co2_saved_yearly * 25  # kg CO2 over 25 years
-        trees_equivalent = co2_saved_yearly / 20  # One tree absorbs ~20kg CO2 per year
-        water_saved = yearly_generation * 3.79  # Liters of water saved per kWh
-        coal_saved = yearly_generation * 0.4  # kg of coal saved per kWh
+        # Calculate generation (in kWh) and its environmental impact
+        monthly_generation = site_monthly_generation(request, monthly_ghi, capacity["final_allowed_capacity"])
+        yearly_generation = float(monthly_generation.sum())
+        environment = yearly_environmental_metrics(yearly_generation)
         
         # Round values for cleaner display
-        monthly_ghi = [float(round(ghi, 2)) for ghi in monthly_ghi]
-        monthly_generation = [float(round(gen, 2)) for gen in monthly_generation]
-        yearly_generation = float(round(yearly_generation, 2))
-        co2_saved_yearly = float(round(co2_saved_yearly, 2))
-        co2_saved_25_years = float(round(co2_saved_25_years, 2))
-        trees_equivalent = float(round(trees_equivalent, 1))
-        water_saved = float(round(water_saved, 2))
-        coal_saved = float(round(coal_saved, 2))
+        monthly_ghi = round_array(monthly_ghi)
+        monthly_generation = round_array(monthly_generation)
+        yearly_generation = round(yearly_generation, 2)
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("predict detail", extra={"fields": {
+                "monthly_ghi": monthly_ghi.tolist(),
+                "monthly_generation": monthly_generation.tolist(),
+                **environment,
+            }})
         
-        # Print debug information
-        print("\nDebug Information:")
-        print(f"Location: {request.latitude}, {request.longitude}")
-        print(f"Area: {area_in_sqm} m²")
-        print(f"State: {state}")
-        print(f"Max possible capacity: {max_possible_capacity} kW, State cap: {state_cap} kW, Final allowed: {final_allowed_capacity} kW")
-        print(f"Yearly GHI: {yearly_ghi:.2f} kWh/m²")
-        print(f"Monthly GHI: {monthly_ghi} kWh/m²")
-        print(f"Yearly Generation: {yearly_generation} kWh")
-        print(f"Monthly Generation: {monthly_generation} kWh")
-        print(f"Environmental Impact:")
-        print(f"- CO2 Saved Yearly: {co2_saved_yearly} kg")
-        print(f"- CO2 Saved 25 Years: {co2_saved_25_years} kg")
-        print(f"- Trees Equivalent: {trees_equivalent}")
-        print(f"- Water Saved: {water_saved} L")
-        print(f"- Coal Saved: {coal_saved} kg")
+        # Values are computed here, so skip re-validation and let orjson
+        # serialize the NumPy arrays directly
+        with timer.stage("serialize"):
+            response = ORJSONResponse(dict(PredictionResponse.model_construct(
+                monthly_ghi=monthly_ghi,
+                yearly_ghi=float(yearly_ghi),
+                monthly_generation=monthly_generation,
+                yearly_generation=yearly_generation,
+                state=state,
+                **environment,
+            )))
         
-        return PredictionResponse(
-            monthly_ghi=monthly_ghi,
-            yearly_ghi=yearly_ghi,
-            monthly_generation=monthly_generation,
-            yearly_generation=yearly_generation,
-            monthly_labels=[
-                "January", "February", "March", "April", "May", "June",
-                "July", "August", "September", "October", "November", "December"
-            ],
-            state=state,
-            co2_saved_yearly=co2_saved_yearly,
-            co2_saved_25_years=co2_saved_25_years,
-            trees_equivalent=trees_equivalent,
-            water_saved=water_saved,
-            coal_saved=coal_saved
+        logger.info("predict completed", extra={"fields": {
+            "latitude": request.latitude,
+            "longitude": request.longitude,
+            "area_sqm": round(area_in_sqm, 2),
+            "state": state,
+            "state_cap_kw": capacity["state_cap"],
+            "capacity_kw": round(capacity["final_allowed_capacity"], 3),
+            "yearly_ghi": round(float(yearly_ghi), 2),
+            "yearly_generation": yearly_generation,
+            **timer.summary_ms(),
+        }})
+        observe_stages("/predict", timer)
+        return response
+    
+    except Exception as e:
+        logger.exception("predict failed", extra={"fields": {
+            "latitude": request.latitude,
+            "longitude": request.longitude,
+            **timer.summary_ms(),
+        }})
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error: {str(e)}"
+        )
+
+@app.post("/analyze", response_model=AnalysisResponse)
+async def analyze(request: AnalysisRequest):
+    """State, capacity cap, GHI, generation, environmental impact and tariff savings in one pass"""
+    if request.monthly_consumption is not None and len(request.monthly_consumption) not in (1, 12):
+        raise HTTPException(
+            status_code=422,
+            detail="monthly_consumption must have 1 or 12 values"
         )
     
+    timer = StageTimer()
+    try:
+        area_in_sqm = area_in_square_meters(request.roof_area, request.area_unit)
+        
+        with timer.stage("state_lookup"):
+            state = state_lookup.get_state_from_coords(request.latitude, request.longitude)
+        if not state:
+            state = "Unknown Location"
+        
+        with timer.stage("capacity"):
+            capacity = resolve_capacity(state, area_in_sqm)
+        
+        with timer.stage("model"):
+            monthly_ghi, yearly_ghi = model.predict(request.latitude, request.longitude)
+        
+        # Generation feeds both the environmental metrics and the tariff engine unrounded
+        monthly_generation = site_monthly_generation(request, monthly_ghi, capacity["final_allowed_capacity"])
+        yearly_generation = float(monthly_generation.sum())
+        environment = yearly_environmental_metrics(yearly_generation)
+        
+        tariff = get_tariff(state)
+        financial = None
+        if request.monthly_consumption is not None:
+            with timer.stage("tariff"):
+                results = tariff.analyze(request.monthly_consumption, monthly_generation)
+            financial = {name: round_array(values) for name, values in results.items()}
+            financial["totals"] = {name: round(float(values.sum()), 2) for name, values in results.items()}
+        
+        with timer.stage("serialize"):
+            response = ORJSONResponse(dict(AnalysisResponse.model_construct(
+                monthly_ghi=round_array(monthly_ghi),
+                yearly_ghi=float(yearly_ghi),
+                monthly_generation=round_array(monthly_generation),
+                yearly_generation=round(yearly_generation, 2),
+                state=state,
+                capacity=capacity,
+                tariff=tariff.info(),
+                financial=financial,
+                **environment,
+            )))
+        
+        logger.info("analyze completed", extra={"fields": {
+            "latitude": request.latitude,
+            "longitude": request.longitude,
+            "area_sqm": round(area_in_sqm, 2),
+            "state": state,
+            "state_cap_kw": capacity["state_cap"],
+            "capacity_kw": round(capacity["final_allowed_capacity"], 3),
+            "limited_by": capacity["limited_by"],
+            "yearly_generation": round(yearly_generation, 2),
+            "yearly_savings": financial["totals"]["total_benefit"] if financial else None,
+            **timer.summary_ms(),
+        }})
+        observe_stages("/analyze", timer)
+        return response
+    
     except Exception as e:
-        print(f"Error in prediction: {str(e)}")
-        import traceback
-        traceback.print_exc()  # Print full stack trace
+        logger.exception("analyze failed", extra={"fields": {
+            "latitude": request.latitude,
+            "longitude": request.longitude,
+            **timer.summary_ms(),
+        }})
         raise HTTPException(
             status_code=500,
             detail=f"Internal server error: {str(e)}"
         )
 
+async def realtime_weather(request):
+    """
+    (source, temperature, wind_speed) per day of the realtime horizon, NaN where unknown.
+
+    Uses the request's forecast or single values when given, otherwise fetches
+    the 5-day forecast; a failed fetch leaves everything to climatology.
+    """
+    days = None
+    if request.forecast is not None:
+        source, days = "forecast", [entry.model_dump() for entry in request.forecast]
+    elif request.temperature is not None or request.wind_speed is not None:
+        source = "current"
+    else:
+        try:
+            payload = await asyncio.to_thread(weather.fetch_forecast, request.latitude, request.longitude)
+            source, days = "openweather", weather.daily_means(weather.parse_forecast(payload), request.start_date)
+        except requests.RequestException as e:
+            logger.warning("Weather fetch failed, using climatology", extra={"fields": {"error": str(e)}})
+            source, days = "climatology", []
+
+    temperature = np.full(REALTIME_DAYS, np.nan)
+    wind_speed = np.full(REALTIME_DAYS, np.nan)
+    if days is None:
+        temperature[0] = np.nan if request.temperature is None else request.temperature
+        wind_speed[0] = np.nan if request.wind_speed is None else request.wind_speed
+        return source, temperature, wind_speed
+
+    # Place each day by its date, so gaps and days before start_date are handled
+    start = np.datetime64(request.start_date, "D")
+    for entry in days:
+        index = int((np.datetime64(entry["date"], "D") - start).astype(np.int64))
+        if 0 <= index < REALTIME_DAYS:
+            temperature[index] = entry["temperature"]
+            wind_speed[index] = entry["wind_speed"]
+    return source, temperature, wind_speed
+
 @app.post("/predict-realtime", response_model=RealtimePredictionResponse)
 async def predict_realtime(request: RealtimePredictionRequest):
+    timer = StageTimer()
     try:
-        # Convert roof area to square meters if needed
-        area_in_sqm = request.roof_area
-        if request.area_unit == "sqft":
-            area_in_sqm = request.roof_area * 0.092903  # Convert sqft to sqm
+        area_in_sqm = area_in_square_meters(request.roof_area, request.area_unit)
         
         # Get state from coordinates
-        state = state_lookup.get_state_from_coords(request.latitude, request.longitude)
+        with timer.stage("state_lookup"):
+            state = state_lookup.get_state_from_coords(request.latitude, request.longitude)
         if not state:
             state = "Unknown Location"
         
-        # --- New logic for capacity limits ---
-        max_possible_capacity = area_in_sqm / 10  # kW
-        state_cap = get_state_capacity_limit(state)
-        final_allowed_capacity = min(state_cap, max_possible_capacity)
+        with timer.stage("capacity"):
+            capacity = resolve_capacity(state, area_in_sqm)
         
-        # Get GHI predictions for 30 days (in kWh/m²)
-        daily_ghi, total_ghi = predict_realtime_ghi(
-            request.latitude,
-            request.longitude,
-            request.start_date,
-            request.temperature,
-            request.wind_speed
-        )
+        with timer.stage("weather"):
+            source, temperature, wind_speed = await realtime_weather(request)
+        forecast_days = int(np.count_nonzero(~np.isnan(temperature) | ~np.isnan(wind_speed)))
         
-        # Calculate generation based on GHI and system parameters
-        system_efficiency = 0.15  # Typical solar panel efficiency
-        performance_ratio = 0.75  # Standard performance ratio
-        efficiency = system_efficiency * performance_ratio
+        # Get GHI predictions for 30 days (in kWh/m²), one batched model call
+        with timer.stage("model"):
+            daily_ghi, total_ghi = predict_realtime_ghi(
+                request.latitude,
+                request.longitude,
+                request.start_date,
+                temperature,
+                wind_speed,
+                days=REALTIME_DAYS
+            )
         
         # Calculate generation (in kWh)
-        daily_generation = [ghi * final_allowed_capacity * 10 * efficiency for ghi in daily_ghi]
-        total_generation = sum(daily_generation)
+        daily_generation = generation_from_ghi(daily_ghi, capacity["final_allowed_capacity"])
+        total_generation = float(daily_generation.sum())
         
         # Generate daily labels (dates)
         start_dt = datetime.strptime(request.start_date, '%Y-%m-%d')
-        daily_labels = [(start_dt + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(30)]
+        daily_labels = [(start_dt + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(REALTIME_DAYS)]
         
         # Environmental impact calculations based on generation
-        co2_per_kwh = 0.82  # kg CO2 per kWh (India's grid emission factor)
-        co2_saved_monthly = total_generation * co2_per_kwh  # kg CO2/month
-        trees_equivalent = co2_saved_monthly / 20  # One tree absorbs ~20kg CO2 per year
-        water_saved = total_generation * 3.79  # Liters of water saved per kWh
-        coal_saved = total_generation * 0.4  # kg of coal saved per kWh
+        co2_saved_monthly = total_generation * CO2_PER_KWH  # kg CO2/month
+        trees_equivalent = co2_saved_monthly / CO2_PER_TREE
+        water_saved = total_generation * WATER_PER_KWH
+        coal_saved = total_generation * COAL_PER_KWH
         
         # Round values for cleaner display
-        daily_ghi = [float(round(ghi, 2)) for ghi in daily_ghi]
-        daily_generation = [float(round(gen, 2)) for gen in daily_generation]
+        daily_ghi = round_array(daily_ghi)
+        daily_generation = round_array(daily_generation)
         total_generation = float(round(total_generation, 2))
         co2_saved_monthly = float(round(co2_saved_monthly, 2))
         trees_equivalent = float(round(trees_equivalent, 1))
         water_saved = float(round(water_saved, 2))
         coal_saved = float(round(coal_saved, 2))
         
-        # Print debug information
-        print("\nDebug Information (Realtime):")
-        print(f"Location: {request.latitude}, {request.longitude}")
-        print(f"Area: {area_in_sqm} m²")
-        print(f"State: {state}")
-        print(f"Max possible capacity: {max_possible_capacity} kW, State cap: {state_cap} kW, Final allowed: {final_allowed_capacity} kW")
-        print(f"Total GHI: {total_ghi:.2f} kWh/m²")
-        print(f"Total Generation: {total_generation} kWh")
-        print(f"Environmental Impact:")
-        print(f"- CO2 Saved Monthly: {co2_saved_monthly} kg")
-        print(f"- Trees Equivalent: {trees_equivalent}")
-        print(f"- Water Saved: {water_saved} L")
-        print(f"- Coal Saved: {coal_saved} kg")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("predict-realtime detail", extra={"fields": {
+                "daily_ghi": daily_ghi.tolist(),
+                "daily_generation": daily_generation.tolist(),
+                "trees_equivalent": trees_equivalent,
+                "water_saved": water_saved,
+                "coal_saved": coal_saved,
+            }})
         
-        return RealtimePredictionResponse(
-            daily_ghi=daily_ghi,
-            total_ghi=total_ghi,
-            daily_generation=daily_generation,
-            total_generation=total_generation,
-            daily_labels=daily_labels,
-            state=state,
-            co2_saved_monthly=co2_saved_monthly,
-            trees_equivalent=trees_equivalent,
-            water_saved=water_saved,
-            coal_saved=coal_saved
-        )
+        with timer.stage("serialize"):
+            response = ORJSONResponse(dict(RealtimePredictionResponse.model_construct(
+                daily_ghi=daily_ghi,
+                total_ghi=total_ghi,
+                daily_generation=daily_generation,
+                total_generation=total_generation,
+                daily_labels=daily_labels,
+                weather_source=source,
+                forecast_days=forecast_days,
+                state=state,
+                co2_saved_monthly=co2_saved_monthly,
+                trees_equivalent=trees_equivalent,
+                water_saved=water_saved,
+                coal_saved=coal_saved
+            )))
+        
+        logger.info("predict-realtime completed", extra={"fields": {
+            "latitude": request.latitude,
+            "longitude": request.longitude,
+            "area_sqm": round(area_in_sqm, 2),
+            "state": state,
+            "state_cap_kw": capacity["state_cap"],
+            "capacity_kw": round(capacity["final_allowed_capacity"], 3),
+            "start_date": request.start_date,
+            "weather_source": source,
+            "forecast_days": forecast_days,
+            "total_ghi": round(total_ghi, 2),
+            "total_generation": total_generation,
+            "co2_saved_monthly": co2_saved_monthly,
+            **timer.summary_ms(),
+        }})
+        observe_stages("/predict-realtime", timer)
+        return response
     
     except Exception as e:
-        print(f"Error in realtime prediction: {str(e)}")
-        import traceback
-        traceback.print_exc()  # Print full stack trace
+        logger.exception("predict-realtime failed", extra={"fields": {
+            "latitude": request.latitude,
+            "longitude": request.longitude,
+            **timer.summary_ms(),
+        }})
         raise HTTPException(
             status_code=500,
             detail=f"Internal server error: {str(e)}"
@@ -352,63 +856,522 @@ async def predict_realtime(request: RealtimePredictionRequest):
 
 @app.post("/fetch-weather", response_model=WeatherForecastResponse)
 async def fetch_weather(request: WeatherForecastRequest):
+    timer = StageTimer()
     try:
         # Fetch 5-day forecast from OpenWeather API
-        params = {
-            "lat": request.latitude,
-            "lon": request.longitude,
-            "appid": OPENWEATHER_API_KEY,
-            "units": "metric",  # For Celsius and m/s
-            "cnt": 40  # Get 5 days of data (8 readings per day)
-        }
-        
-        response = requests.get(OPENWEATHER_BASE_URL, params=params)
-        response.raise_for_status()
-        weather_data = response.json()
-        
-        # Process and format the forecast data
-        start_date = datetime.strptime(request.start_date, '%Y-%m-%d')
-        forecast_data = []
-        
-        # Group data by day and calculate daily averages
-        daily_data = {}
-        for item in weather_data['list']:
-            dt = datetime.fromtimestamp(item['dt'])
-            date_key = dt.date()
-            
-            if date_key not in daily_data:
-                daily_data[date_key] = {
-                    'temp_sum': 0,
-                    'wind_sum': 0,
-                    'count': 0
-                }
-            
-            daily_data[date_key]['temp_sum'] += item['main']['temp']
-            daily_data[date_key]['wind_sum'] += item['wind']['speed']
-            daily_data[date_key]['count'] += 1
+        with timer.stage("weather_fetch"):
+            payload = await asyncio.to_thread(weather.fetch_forecast, request.latitude, request.longitude)
         
-        # Calculate daily averages and format response
-        for i in range(5):  # Get 5 days including start date
-            current_date = start_date.date() + timedelta(days=i)
-            if current_date in daily_data:
-                count = daily_data[current_date]['count']
-                forecast_data.append({
-                    'date': current_date.strftime('%Y-%m-%d'),
-                    'temperature': round(daily_data[current_date]['temp_sum'] / count, 2),
-                    'wind_speed': round(daily_data[current_date]['wind_sum'] / count, 2)
-                })
+        # Daily averages for the 5 days from the start date
+        forecast_data = weather.daily_means(weather.parse_forecast(payload), request.start_date)
         
+        observe_stages("/fetch-weather", timer)
         return WeatherForecastResponse(
             forecast_data=forecast_data,
             message="Weather forecast fetched successfully"
         )
     
     except requests.RequestException as e:
+        logger.warning("Weather fetch failed", extra={"fields": {"error": str(e), **timer.summary_ms()}})
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error fetching weather data: {str(e)}"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error: {str(e)}"
+        )
+
+@app.post("/nowcast", response_model=NowcastResponse)
+async def nowcast(request: NowcastRequest):
+    """Cloud-adjusted hourly GHI and generation over the 5-day OpenWeather forecast"""
+    timer = StageTimer()
+    try:
+        area_in_sqm = area_in_square_meters(request.roof_area, request.area_unit)
+
+        with timer.stage("state_lookup"):
+            state = state_lookup.get_state_from_coords(request.latitude, request.longitude)
+        if not state:
+            state = "Unknown Location"
+
+        with timer.stage("capacity"):
+            capacity = resolve_capacity(state, area_in_sqm)
+        capacity_kw = request.capacity_kw if request.capacity_kw is not None else capacity["final_allowed_capacity"]
+
+        with timer.stage("weather_fetch"):
+            payload = await asyncio.to_thread(weather.fetch_forecast, request.latitude, request.longitude)
+
+        with timer.stage("nowcast"):
+            hours = weather.nowcast(request.latitude, request.longitude, weather.parse_forecast(payload))
+            generation = forecast_generation(request, capacity_kw, hours)
+            daily = {"ghi": hours["ghi"], "clear_sky_ghi": hours["clear_sky_ghi"], "generation": generation}
+            dates, totals = weather.daily_totals(hours, np.stack(list(daily.values())))
+            daily = dict(zip(daily, totals))
+
+        series = None
+        if request.include_hourly:
+            series = {
+                "time": np.datetime_as_string(hours["time"], unit="m", timezone="UTC").tolist(),
+                "ghi": np.round(hours["ghi"], 4),
+                "clear_sky_ghi": np.round(hours["clear_sky_ghi"], 4),
+                "cloud_cover": np.round(hours["cloud_cover"], 3),
+                "temperature": np.round(hours["temperature"], 2),
+                "humidity": np.round(hours["humidity"], 1),
+                "wind_speed": np.round(hours["wind_speed"], 2),
+                "generation": np.round(generation, 3),
+            }
+
+        with timer.stage("serialize"):
+            response = ORJSONResponse(dict(NowcastResponse.model_construct(
+                state=state,
+                capacity_kw=round(capacity_kw, 3),
+                start=np.datetime_as_string(hours["time"][0], unit="m", timezone="UTC"),
+                hours=len(hours["time"]),
+                daily={"date": [str(date) for date in dates],
+                       **{name: round_array(values) for name, values in daily.items()}},
+                totals={name: round(float(values.sum()), 2) for name, values in daily.items()},
+                hourly=series,
+            )))
+
+        logger.info("nowcast completed", extra={"fields": {
+            "latitude": request.latitude,
+            "longitude": request.longitude,
+            "state": state,
+            "capacity_kw": round(capacity_kw, 3),
+            "hours": len(hours["time"]),
+            "total_generation": round(float(generation.sum()), 2),
+            **timer.summary_ms(),
+        }})
+        observe_stages("/nowcast", timer)
+        return response
+
+    except requests.RequestException as e:
+        logger.warning("Weather fetch failed", extra={"fields": {"error": str(e), **timer.summary_ms()}})
         raise HTTPException(
             status_code=500,
             detail=f"Error fetching weather data: {str(e)}"
         )
+    except weather.ForecastError as e:
+        logger.warning("Unusable weather forecast", extra={"fields": {"error": str(e), **timer.summary_ms()}})
+        raise HTTPException(
+            status_code=502,
+            detail=f"Unusable weather forecast: {str(e)}"
+        )
+    except Exception as e:
+        logger.exception("nowcast failed", extra={"fields": {
+            "latitude": request.latitude,
+            "longitude": request.longitude,
+            **timer.summary_ms(),
+        }})
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error: {str(e)}"
+        )
+
+@app.post("/financial-analysis", response_model=FinancialAnalysisResponse)
+async def financial_analysis(request: FinancialAnalysisRequest):
+    """Slab-wise bills, savings and export income for any number of generation/consumption pairs"""
+    if len(request.consumption) not in (1, len(request.generation)):
+        raise HTTPException(
+            status_code=422,
+            detail="consumption must have one value or as many values as generation"
+        )
+    
+    timer = StageTimer()
+    with timer.stage("tariff"):
+        tariff = get_tariff(request.state)
+        results = tariff.analyze(request.consumption, request.generation)
+    
+    with timer.stage("serialize"):
+        response = ORJSONResponse(dict(FinancialAnalysisResponse.model_construct(
+            tariff=tariff.info(),
+            totals={name: round(float(values.sum()), 2) for name, values in results.items()},
+            **{name: round_array(values) for name, values in results.items()},
+        )))
+    
+    logger.info("financial-analysis completed", extra={"fields": {
+        "state": request.state,
+        "tariff": tariff.name,
+        "pairs": len(request.generation),
+        **timer.summary_ms(),
+    }})
+    observe_stages("/financial-analysis", timer)
+    return response
+
+@app.post("/lifetime-analysis", response_model=LifetimeAnalysisResponse)
+async def lifetime_analysis(request: LifetimeAnalysisRequest):
+    """NPV, IRR, payback and LCOE over the system lifetime, for one scenario or a sweep of assumptions"""
+    if len(request.monthly_generation) != 12 or len(request.monthly_consumption) not in (1, 12):
+        raise HTTPException(
+            status_code=422,
+            detail="monthly_generation must have 12 values and monthly_consumption 1 or 12"
+        )
+    if request.system_cost is None and request.capacity_kw is None:
+        raise HTTPException(
+            status_code=422,
+            detail="Either system_cost or capacity_kw is required"
+        )
+    if not 1 <= request.years <= 50:
+        raise HTTPException(
+            status_code=422,
+            detail="years must be between 1 and 50"
+        )
+
+    system_cost = request.system_cost
+    if system_cost is None:
+        system_cost = request.capacity_kw * lifetime.COST_PER_KW
+    values = [np.atleast_1d(np.asarray(value, dtype=np.float64)) for value in (
+        system_cost, request.degradation, request.tariff_escalation,
+        request.export_escalation, request.discount_rate,
+    )]
+    scenarios = int(np.prod([len(value) for value in values]))
+    if scenarios > MAX_SWEEP_SCENARIOS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Sweep has {scenarios} scenarios, at most {MAX_SWEEP_SCENARIOS} are allowed"
+        )
+
+    timer = StageTimer()
+    with timer.stage("lifetime"):
+        # Every combination of the given values, flattened to one row per scenario
+        grid = [column.ravel() for column in np.meshgrid(*values, indexing="ij")]
+        parameters = dict(zip(SWEEP_PARAMETERS, grid))
+        results = lifetime.simulate_lifetime(
+            request.monthly_generation,
+            request.monthly_consumption,
+            get_tariff(request.state),
+            years=request.years,
+            **parameters,
+        )
+
+    yearly = None
+    if scenarios == 1:
+        yearly = {
+            "generation": round_array(results["yearly_generation"][0]),
+            "savings": round_array(results["yearly_savings"][0]),
+            "cash_flow": round_array(results["cash_flow"][0]),
+            "cumulative_cash_flow": round_array(results["cumulative_cash_flow"][0]),
+        }
+
+    with timer.stage("serialize"):
+        # NaN (no IRR / never pays back) serializes as null
+        response = ORJSONResponse(dict(LifetimeAnalysisResponse.model_construct(
+            state=request.state,
+            years=request.years,
+            scenarios=scenarios,
+            parameters=parameters,
+            npv=round_array(results["npv"]),
+            irr=np.round(results["irr"], 4),
+            payback_years=round_array(results["payback_years"]),
+            lcoe=round_array(results["lcoe"], 3),
+            lifetime_generation=round_array(results["lifetime_generation"]),
+            lifetime_savings=round_array(results["lifetime_savings"]),
+            co2_saved_lifetime=round_array(results["lifetime_generation"] * CO2_PER_KWH),
+            yearly=yearly,
+        )))
+
+    logger.info("lifetime-analysis completed", extra={"fields": {
+        "state": request.state,
+        "years": request.years,
+        "scenarios": scenarios,
+        **timer.summary_ms(),
+    }})
+    observe_stages("/lifetime-analysis", timer)
+    return response
+
+@app.post("/optimize-size", response_model=OptimizeSizeResponse)
+async def optimize_size(request: OptimizeSizeRequest):
+    """System size (up to the area and state caps) that maximizes NPV or minimizes payback"""
+    if len(request.monthly_consumption) not in (1, 12):
+        raise HTTPException(
+            status_code=422,
+            detail="monthly_consumption must have 1 or 12 values"
+        )
+    if request.objective not in sizing.OBJECTIVES:
+        raise HTTPException(
+            status_code=422,
+            detail=f"objective must be one of {', '.join(sizing.OBJECTIVES)}"
+        )
+    if not 2 <= request.candidates <= MAX_SIZE_CANDIDATES:
+        raise HTTPException(
+            status_code=422,
+            detail=f"candidates must be between 2 and {MAX_SIZE_CANDIDATES}"
+        )
+    if not 1 <= request.years <= 50:
+        raise HTTPException(
+            status_code=422,
+            detail="years must be between 1 and 50"
+        )
+
+    timer = StageTimer()
+    try:
+        area_in_sqm = area_in_square_meters(request.roof_area, request.area_unit)
+
+        with timer.stage("state_lookup"):
+            state = state_lookup.get_state_from_coords(request.latitude, request.longitude)
+        if not state:
+            state = "Unknown Location"
+
+        with timer.stage("capacity"):
+            capacity = resolve_capacity(state, area_in_sqm)
+        if capacity["final_allowed_capacity"] <= 0:
+            raise HTTPException(
+                status_code=422,
+                detail="No capacity fits on the given roof area"
+            )
+
+        with timer.stage("model"):
+            monthly_ghi, _ = model.predict(request.latitude, request.longitude)
+
+        tariff = get_tariff(state)
+        with timer.stage("optimize"):
+            result = sizing.optimize_capacity(
+                site_monthly_generation(request, monthly_ghi, 1.0),
+                request.monthly_consumption,
+                tariff,
+                capacity["final_allowed_capacity"],
+                objective=request.objective,
+                candidates=request.candidates,
+                cost_per_kw=request.cost_per_kw,
+                years=request.years,
+                degradation=request.degradation,
+                tariff_escalation=request.tariff_escalation,
+                export_escalation=request.export_escalation,
+                discount_rate=request.discount_rate,
+            )
+        grid = result.pop("grid")
+
+        with timer.stage("serialize"):
+            response = ORJSONResponse(dict(OptimizeSizeResponse.model_construct(
+                state=state,
+                objective=request.objective,
+                capacity=capacity,
+                tariff=tariff.info(),
+                optimal=result,
+                grid={
+                    "capacity_kw": np.round(grid["capacity_kw"], 3),
+                    "npv": round_array(grid["npv"]),
+                    "payback_years": round_array(grid["payback_years"]),
+                },
+            )))
+
+        logger.info("optimize-size completed", extra={"fields": {
+            "latitude": request.latitude,
+            "longitude": request.longitude,
+            "state": state,
+            "objective": request.objective,
+            "candidates": request.candidates,
+            "max_capacity_kw": round(capacity["final_allowed_capacity"], 3),
+            "optimal_capacity_kw": round(result["capacity_kw"], 3),
+            **timer.summary_ms(),
+        }})
+        observe_stages("/optimize-size", timer)
+        return response
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("optimize-size failed", extra={"fields": {
+            "latitude": request.latitude,
+            "longitude": request.longitude,
+            **timer.summary_ms(),
+        }})
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error: {str(e)}"
+        )
+
+def validate_hourly_request(request):
+    """422 unless exactly one well-formed load (monthly totals or hourly values) is given and capacity_kw is positive"""
+    if (request.monthly_consumption is None) == (request.hourly_load is None):
+        raise HTTPException(
+            status_code=422,
+            detail="Give exactly one of monthly_consumption or hourly_load"
+        )
+    if request.monthly_consumption is not None and len(request.monthly_consumption) not in (1, 12):
+        raise HTTPException(
+            status_code=422,
+            detail="monthly_consumption must have 1 or 12 values"
+        )
+    if request.hourly_load is not None and len(request.hourly_load) not in (24, hourly.HOURS):
+        raise HTTPException(
+            status_code=422,
+            detail=f"hourly_load must have 24 or {hourly.HOURS} values"
+        )
+    if request.capacity_kw is not None and not request.capacity_kw > 0:
+        raise HTTPException(
+            status_code=422,
+            detail="capacity_kw must be positive"
+        )
+
+def hourly_site_profiles(request, timer):
+    """State, system size and the site's 8760-hour generation and load for an HourlyProfileRequest"""
+    area_in_sqm = area_in_square_meters(request.roof_area, request.area_unit)
+
+    with timer.stage("state_lookup"):
+        state = state_lookup.get_state_from_coords(request.latitude, request.longitude)
+    if not state:
+        state = "Unknown Location"
+
+    with timer.stage("capacity"):
+        capacity = resolve_capacity(state, area_in_sqm)
+    capacity_kw = request.capacity_kw if request.capacity_kw is not None else capacity["final_allowed_capacity"]
+
+    # The model's monthly totals, as /predict uses them; the TMY (when loaded)
+    # only supplies the hourly shape and is rescaled to these months
+    with timer.stage("model"):
+        monthly_ghi, _ = model.predict(request.latitude, request.longitude)
+
+    with timer.stage("hourly"):
+        generation = site_hourly_generation(request, capacity_kw, monthly_ghi)
+        if request.hourly_load is not None:
+            load = hourly.expand_load(request.hourly_load)
+        else:
+            load = hourly.synthesize_load(request.monthly_consumption)
+
+    return {
+        "state": state,
+        "capacity_kw": capacity_kw,
+        "irradiance_source": "tmy" if hourly.tmy is not None else "monthly_model",
+        "generation": generation,
+        "load": load,
+    }
+
+@app.post("/simulate-hourly", response_model=HourlySimulationResponse)
+async def simulate_hourly(request: HourlySimulationRequest):
+    """8760-hour import, export and self-consumption, and what each metering arrangement is worth"""
+    validate_hourly_request(request)
+
+    timer = StageTimer()
+    try:
+        site = hourly_site_profiles(request, timer)
+        state, capacity_kw = site["state"], site["capacity_kw"]
+        generation, load = site["generation"], site["load"]
+        with timer.stage("simulate"):
+            results = hourly.simulate_hourly(generation, load)
+
+        tariff = get_tariff(state)
+        with timer.stage("tariff"):
+            metering = hourly.compare_metering(results, tariff)
+
+        monthly = {name: results[f"monthly_{name}"] for name in (
+            "generation", "load", "self_consumption", "import", "export",
+        )}
+        series = None
+        if request.include_hourly:
+            series = {
+                "generation": np.round(generation, 3),
+                "load": np.round(load, 3),
+                "import": np.round(results["import"], 3),
+                "export": np.round(results["export"], 3),
+            }
+
+        with timer.stage("serialize"):
+            response = ORJSONResponse(dict(HourlySimulationResponse.model_construct(
+                state=state,
+                capacity_kw=round(capacity_kw, 3),
+                irradiance_source=site["irradiance_source"],
+                monthly={name: round_array(values) for name, values in monthly.items()},
+                totals={name: round(float(values.sum()), 2) for name, values in monthly.items()},
+                self_consumption_ratio=round(float(results["self_consumption_ratio"]), 4),
+                self_sufficiency=round(float(results["self_sufficiency"]), 4),
+                tariff=tariff.info(),
+                metering={name: None if value is None else round(float(value), 2)
+                          for name, value in metering.items()},
+                typical_day={
+                    "generation": np.round(hourly.typical_day(generation), 3),
+                    "load": np.round(hourly.typical_day(load), 3),
+                },
+                hourly=series,
+            )))
+
+        logger.info("simulate-hourly completed", extra={"fields": {
+            "latitude": request.latitude,
+            "longitude": request.longitude,
+            "state": state,
+            "capacity_kw": round(capacity_kw, 3),
+            "uploaded_load": request.hourly_load is not None,
+            "self_consumption_ratio": round(float(results["self_consumption_ratio"]), 4),
+            **timer.summary_ms(),
+        }})
+        observe_stages("/simulate-hourly", timer)
+        return response
+
+    except Exception as e:
+        logger.exception("simulate-hourly failed", extra={"fields": {
+            "latitude": request.latitude,
+            "longitude": request.longitude,
+            **timer.summary_ms(),
+        }})
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error: {str(e)}"
+        )
+
+@app.post("/battery-analysis", response_model=BatteryAnalysisResponse)
+async def battery_analysis(request: BatteryAnalysisRequest):
+    """Cycles, self-sufficiency and savings of candidate battery sizes next to the solar system"""
+    validate_hourly_request(request)
+    capacities = np.asarray(request.battery_capacities_kwh, dtype=np.float64)
+    if request.power_ratings_kw is None:
+        candidates = (capacities, capacities * battery.DEFAULT_C_RATE)
+    else:
+        candidates = tuple(column.ravel() for column in np.meshgrid(
+            capacities, np.asarray(request.power_ratings_kw, dtype=np.float64), indexing="ij"))
+    if not 1 <= len(candidates[0]) <= MAX_BATTERY_CANDIDATES:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Between 1 and {MAX_BATTERY_CANDIDATES} battery candidates are allowed"
+        )
+    if not ((candidates[0] >= 0).all() and (candidates[1] >= 0).all() and np.isfinite(candidates).all()
+            and request.battery_cost_per_kwh >= 0 and 0 < request.round_trip_efficiency <= 1):
+        raise HTTPException(
+            status_code=422,
+            detail="Battery sizes and battery_cost_per_kwh must be non-negative and round_trip_efficiency in (0, 1]"
+        )
+
+    timer = StageTimer()
+    try:
+        site = hourly_site_profiles(request, timer)
+        tariff = get_tariff(site["state"])
+        with timer.stage("dispatch"):
+            results = battery.evaluate_batteries(
+                site["generation"],
+                site["load"],
+                tariff,
+                *candidates,
+                cost_per_kwh=request.battery_cost_per_kwh,
+                round_trip_efficiency=request.round_trip_efficiency,
+            )
+
+        with timer.stage("serialize"):
+            response = ORJSONResponse(dict(BatteryAnalysisResponse.model_construct(
+                state=site["state"],
+                capacity_kw=round(site["capacity_kw"], 3),
+                irradiance_source=site["irradiance_source"],
+                tariff=tariff.info(),
+                batteries={name: np.round(values, 4 if name in ("self_sufficiency", "self_consumption_ratio") else 2)
+                           for name, values in results.items()},
+            )))
+
+        logger.info("battery-analysis completed", extra={"fields": {
+            "latitude": request.latitude,
+            "longitude": request.longitude,
+            "state": site["state"],
+            "capacity_kw": round(site["capacity_kw"], 3),
+            "candidates": len(candidates[0]),
+            **timer.summary_ms(),
+        }})
+        observe_stages("/battery-analysis", timer)
+        return response
+
     except Exception as e:
+        logger.exception("battery-analysis failed", extra={"fields": {
+            "latitude": request.latitude,
+            "longitude": request.longitude,
+            **timer.summary_ms(),
+        }})
         raise HTTPException(
             status_code=500,
             detail=f"Internal server error: {str(e)}"
@@ -417,8 +1380,11 @@ async def fetch_weather(request: WeatherForecastRequest):
 @app.post("/get-state", response_model=StateLookupResponse)
 async def get_state(request: StateLookupRequest):
     """Get state name from latitude and longitude coordinates"""
+    timer = StageTimer()
     try:
-        state = state_lookup.get_state_from_coords(request.latitude, request.longitude)
+        with timer.stage("state_lookup"):
+            state = state_lookup.get_state_from_coords(request.latitude, request.longitude)
+        observe_stages("/get-state", timer)
         
         if state:
             return StateLookupResponse(
@@ -437,6 +1403,129 @@ async def get_state(request: StateLookupRequest):
             detail=f"Error looking up state: {str(e)}"
         )
 
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: Literal["queued", "running", "done", "failed"]
+    format: Literal["csv", "parquet"]
+    total_rows: int
+    processed_rows: int
+    progress: float  # 0..1
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+    result_url: Optional[str] = None
+
+def job_status(job):
+    def timestamp(value):
+        return datetime.fromtimestamp(value, timezone.utc) if value is not None else None
+    return JobStatusResponse(
+        job_id=job["id"],
+        status=job["status"],
+        format=job["format"],
+        total_rows=job["total_rows"],
+        processed_rows=job["processed_rows"],
+        progress=round(min(job["processed_rows"] / job["total_rows"], 1.0), 4) if job["total_rows"] else 0.0,
+        error=job["error"],
+        created_at=timestamp(job["created_at"]),
+        updated_at=timestamp(job["updated_at"]),
+        finished_at=timestamp(job["finished_at"]),
+        result_url=f"/jobs/{job['id']}/result" if job["status"] == "done" else None,
+    )
+
+@app.post("/jobs", response_model=JobStatusResponse, status_code=202)
+async def create_job(request: Request):
+    """
+    Queue a bulk job: the request body is a CSV or Parquet file of sites
+    (lat, lon, roof_area, unit). Poll GET /jobs/{job_id} for progress.
+    """
+    timer = StageTimer()
+    job_id = uuid.uuid4().hex
+    job_dir = job_store.path(job_id)
+    input_path = job_store.path(job_id, "input")
+    if int(request.headers.get("content-length") or 0) > jobs.MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"Upload larger than {jobs.MAX_UPLOAD_BYTES} bytes")
+    try:
+        # Stream the body to disk; the file is never held in memory
+        with timer.stage("upload"):
+            os.makedirs(job_dir)
+            size = 0
+            with open(input_path, "wb") as f:
+                async for chunk in request.stream():
+                    size += len(chunk)
+                    if size > jobs.MAX_UPLOAD_BYTES:
+                        raise HTTPException(status_code=413, detail=f"Upload larger than {jobs.MAX_UPLOAD_BYTES} bytes")
+                    f.write(chunk)
+
+        with timer.stage("inspect"):
+            fmt = jobs.detect_format(input_path)
+            total_rows = await asyncio.to_thread(jobs.inspect_input, input_path, fmt)
+
+        job = job_store.create(job_id, fmt, total_rows)
+        job_runner.wake()
+    except jobs.JobError as e:
+        shutil.rmtree(job_dir, ignore_errors=True)
+        raise HTTPException(status_code=422, detail=str(e))
+    except HTTPException:
+        shutil.rmtree(job_dir, ignore_errors=True)
+        raise
+    except Exception as e:
+        shutil.rmtree(job_dir, ignore_errors=True)
+        logger.exception("create job failed", extra={"fields": {"job_id": job_id, **timer.summary_ms()}})
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error: {str(e)}"
+        )
+
+    logger.info("job queued", extra={"fields": {
+        "job_id": job_id,
+        "format": fmt,
+        "bytes": size,
+        "rows": total_rows,
+        **timer.summary_ms(),
+    }})
+    observe_stages("/jobs", timer)
+    return job_status(job)
+
+@app.get("/jobs/{job_id}", response_model=JobStatusResponse)
+def get_job(job_id: str):
+    """Status and progress of a bulk job"""
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_status(job)
+
+@app.get("/jobs/{job_id}/result")
+def get_job_result(job_id: str):
+    """The results of a finished bulk job, as Parquet"""
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] != "done":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}, not done")
+    return FileResponse(
+        job_store.path(job_id, "result.parquet"),
+        media_type="application/vnd.apache.parquet",
+        filename=f"solar-job-{job_id}.parquet",
+    )
+
+@app.get("/health")
+def health():
+    """Liveness probe: the process is up and serving"""
+    return {"status": "ok"}
+
+@app.get("/ready")
+def ready():
+    """Readiness probe: 200 only once models are loaded and warmed up"""
+    if not getattr(app.state, "ready", False):
+        return JSONResponse(status_code=503, content={"status": "warming up"})
+    return {"status": "ready"}
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus scrape endpoint"""
+    return metrics_response()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
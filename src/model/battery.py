@@ -0,0 +1,133 @@
+"""
+Battery dispatch over the hourly (8760) profiles of hourly.py.
+
+Self-consumption dispatch: surplus solar charges the battery, deficits are met
+from it, and the grid only sees what is left over. The state of charge makes
+hours depend on each other, so the loop runs over the hour axis, with every
+candidate battery (capacity and power rating) updated at once as an array.
+"""
+import numpy as np
+
+try:
+    from . import hourly
+except ImportError:
+    import hourly
+
+DEFAULT_CAPACITIES_KWH = [0.0, 2.5, 5.0, 7.5, 10.0, 15.0]
+DEFAULT_C_RATE = 0.5  # Power rating (kW) per kWh when none is given
+ROUND_TRIP_EFFICIENCY = 0.9
+MIN_STATE_OF_CHARGE = 0.1  # Share of capacity kept in reserve
+COST_PER_KWH = 15000  # ₹ per kWh of storage installed
+
+
+def dispatch(generation, load, capacity_kwh, power_kw,
+             round_trip_efficiency=ROUND_TRIP_EFFICIENCY, min_soc=MIN_STATE_OF_CHARGE):
+    """
+    Simulate every candidate battery against one site's hourly profiles.
+
+    Args:
+        generation, load: (8760,) hourly kWh
+        capacity_kwh, power_kw: (B,) candidate batteries
+        round_trip_efficiency (float): split evenly between charge and discharge
+
+    Returns:
+        dict: (B, 8760) charge, discharge, import and export, (B, 12)
+              monthly_import/monthly_export, and per battery cycles
+              (equivalent full cycles), self_sufficiency and
+              self_consumption_ratio
+    """
+    generation = np.asarray(generation, dtype=np.float64)
+    load = np.asarray(load, dtype=np.float64)
+    capacity_kwh, power_kw = np.broadcast_arrays(np.asarray(capacity_kwh, dtype=np.float64),
+                                                 np.asarray(power_kw, dtype=np.float64))
+    efficiency = np.sqrt(round_trip_efficiency)
+    surplus = np.maximum(generation - load, 0.0)
+    deficit = np.maximum(load - generation, 0.0)
+
+    floor = capacity_kwh * min_soc
+    soc = floor.copy()
+    charge = np.zeros((hourly.HOURS,) + capacity_kwh.shape)
+    discharge = np.zeros((hourly.HOURS,) + capacity_kwh.shape)
+    room = np.empty_like(soc)
+    for hour in range(hourly.HOURS):
+        # One site, so each hour either charges or discharges every battery
+        if surplus[hour] > 0:
+            np.subtract(capacity_kwh, soc, out=room)
+            room /= efficiency
+            np.minimum(room, power_kw, out=room)
+            np.minimum(room, surplus[hour], out=charge[hour])
+            soc += charge[hour] * efficiency
+        elif deficit[hour] > 0:
+            np.subtract(soc, floor, out=room)
+            room *= efficiency
+            np.minimum(room, power_kw, out=room)
+            np.minimum(room, deficit[hour], out=discharge[hour])
+            soc -= discharge[hour] / efficiency
+
+    charge = charge.T
+    discharge = discharge.T
+    grid_import = deficit - discharge
+    grid_export = surplus - charge
+
+    usable = capacity_kwh * (1 - min_soc)
+    total_discharge = discharge.sum(axis=-1)
+    load_served = (load - grid_import).sum(axis=-1)
+    generation_used = (generation - grid_export).sum(axis=-1)
+    return {
+        "charge": charge,
+        "discharge": discharge,
+        "import": grid_import,
+        "export": grid_export,
+        "monthly_import": hourly.monthly_totals(grid_import),
+        "monthly_export": hourly.monthly_totals(grid_export),
+        "cycles": np.divide(total_discharge, usable, out=np.zeros_like(total_discharge), where=usable > 0),
+        "self_sufficiency": load_served / load.sum() if load.sum() > 0 else np.zeros_like(load_served),
+        "self_consumption_ratio": (generation_used / generation.sum() if generation.sum() > 0
+                                   else np.zeros_like(generation_used)),
+    }
+
+
+def evaluate_batteries(generation, load, tariff, capacity_kwh, power_kw,
+                       cost_per_kwh=COST_PER_KWH, round_trip_efficiency=ROUND_TRIP_EFFICIENCY):
+    """
+    Yearly value of each candidate battery on top of the solar system.
+
+    Savings are the extra yearly benefit under hourly net billing (imports at
+    the slab tariff, exports at the export rate where the state allows export)
+    over the same system without storage.
+
+    Returns:
+        dict: per-battery arrays capacity_kwh, power_kw, cycles,
+              self_sufficiency, self_consumption_ratio, yearly_import,
+              yearly_export, yearly_benefit, savings, battery_cost and
+              payback_years (NaN when the battery saves nothing)
+    """
+    capacity_kwh, power_kw = np.broadcast_arrays(np.asarray(capacity_kwh, dtype=np.float64),
+                                                 np.asarray(power_kw, dtype=np.float64))
+    results = dispatch(generation, load, capacity_kwh, power_kw, round_trip_efficiency)
+    baseline = hourly.simulate_hourly(generation, load)
+
+    flows = {
+        "monthly_load": baseline["monthly_load"],
+        "monthly_generation": baseline["monthly_generation"],
+    }
+    with_battery = hourly.compare_metering({**flows, "monthly_import": results["monthly_import"],
+                                            "monthly_export": results["monthly_export"]}, tariff)["net_billing"]
+    without_battery = hourly.compare_metering({**flows, "monthly_import": baseline["monthly_import"],
+                                               "monthly_export": baseline["monthly_export"]}, tariff)["net_billing"]
+
+    savings = with_battery - without_battery
+    battery_cost = capacity_kwh * cost_per_kwh
+    return {
+        "capacity_kwh": capacity_kwh,
+        "power_kw": power_kw,
+        "cycles": results["cycles"],
+        "self_sufficiency": results["self_sufficiency"],
+        "self_consumption_ratio": results["self_consumption_ratio"],
+        "yearly_import": results["import"].sum(axis=-1),
+        "yearly_export": results["export"].sum(axis=-1),
+        "yearly_benefit": with_battery,
+        "savings": savings,
+        "battery_cost": battery_cost,
+        "payback_years": np.divide(battery_cost, savings, out=np.full_like(savings, np.nan), where=savings > 0),
+    }
@@ -0,0 +1,237 @@
+"""
+Hourly (8760) simulation of generation against household load.
+
+Monthly totals hide the mismatch between midday generation and evening load;
+at hourly resolution every hour splits into self-consumed, imported and
+exported energy, which decides how net metering (monthly netting), net billing
+(hourly export at the export rate) and gross metering (everything sold at the
+gross rate) compare.
+
+The site's hourly GHI, diffuse, temperature and wind come from
+india_spectral_tmy.h5 (nearest location), cached as a memory-mapped .npy like
+the daily climatology. Without the .h5 the
+model's monthly GHI is spread over the daylight hours instead. Everything
+works on (..., 8760) arrays, so many sites or load profiles run in one call.
+"""
+import os
+
+import h5py
+import numpy as np
+
+try:
+    from .logger import get_logger
+    from .solar_geometry import DAY_OF_YEAR, HOUR_OF_DAY, HOURS, hourly_geometry
+except ImportError:
+    from logger import get_logger
+    from solar_geometry import DAY_OF_YEAR, HOUR_OF_DAY, HOURS, hourly_geometry
+
+logger = get_logger("hourly")
+
+DATA_PATH = os.path.join("src", "model", "data", "india_spectral_tmy.h5")
+# (locations, 4, 8760) float32: GHI and diffuse (Wh/m²), air temperature (°C), wind speed (m/s)
+HOURLY_TMY_PATH = os.path.join("src", "model", "data", "hourly_tmy.npy")
+HOURLY_COORDS_PATH = os.path.join("src", "model", "data", "hourly_tmy_coords.npy")
+TMY_DATASETS = ["GHI_1000", "DIFF", "AT", "WS"]
+TMY_GHI, TMY_DIFF, TMY_AT, TMY_WS = range(len(TMY_DATASETS))
+
+# Weather assumed when there is no hourly TMY data for the site
+DEFAULT_AIR_TEMPERATURE = 28.0  # °C
+DEFAULT_WIND_SPEED = 2.0  # m/s
+
+DAYS_IN_MONTH = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+MONTH_OF_HOUR = np.repeat(np.arange(12), DAYS_IN_MONTH * 24)
+MONTH_START = np.concatenate(([0], np.cumsum(DAYS_IN_MONTH * 24)[:-1]))
+
+# Share of a day's household consumption in each hour: low overnight, a
+# morning peak and a larger evening peak (lighting, cooking, fans/AC)
+RESIDENTIAL_LOAD_SHAPE = np.array([
+    0.030, 0.026, 0.024, 0.023, 0.024, 0.030,  # 00-05
+    0.042, 0.052, 0.050, 0.043, 0.038, 0.036,  # 06-11
+    0.036, 0.036, 0.035, 0.034, 0.036, 0.044,  # 12-17
+    0.060, 0.070, 0.071, 0.065, 0.054, 0.041,  # 18-23
+])
+RESIDENTIAL_LOAD_SHAPE = RESIDENTIAL_LOAD_SHAPE / RESIDENTIAL_LOAD_SHAPE.sum()
+
+# Loaded lazily by load_hourly_tmy()
+tmy = None
+tmy_coords = None
+
+
+def build_hourly_tmy(data_path=DATA_PATH, tmy_path=HOURLY_TMY_PATH, coords_path=HOURLY_COORDS_PATH):
+    """Cache GHI, diffuse, temperature and wind per location as a contiguous float32 .npy"""
+    with h5py.File(data_path, 'r') as f:
+        hourly = np.stack([f[name][:] for name in TMY_DATASETS])  # (4, 8760, locations)
+        coords = f['coordinates'][:]
+    np.save(tmy_path, np.ascontiguousarray(hourly.transpose(2, 0, 1), dtype=np.float32))
+    np.save(coords_path, coords[:, :2].astype(np.float64))
+
+
+def load_hourly_tmy(data_path=DATA_PATH, tmy_path=HOURLY_TMY_PATH, coords_path=HOURLY_COORDS_PATH):
+    """
+    Memory-map the hourly TMY cache (building it from the .h5 if needed).
+
+    Returns False, leaving the monthly fallback in use, when neither exists.
+    """
+    global tmy, tmy_coords
+
+    if not os.path.exists(tmy_path) or np.load(tmy_path, mmap_mode="r").shape[1] != len(TMY_DATASETS):
+        if not os.path.exists(data_path):
+            logger.warning("Hourly TMY data not found, hourly profiles use the monthly model", extra={"fields": {
+                "path": data_path,
+            }})
+            return False
+        build_hourly_tmy(data_path, tmy_path, coords_path)
+    tmy = np.load(tmy_path, mmap_mode="r")
+    tmy_coords = np.load(coords_path)
+    return True
+
+
+def nearest_tmy_site(lat, lon):
+    """Row of the TMY location closest to (lat, lon)"""
+    distance = (tmy_coords[:, 0] - lat) ** 2 + ((tmy_coords[:, 1] - lon) * np.cos(np.radians(lat))) ** 2
+    return int(np.argmin(distance))
+
+
+def sun_elevation_factor(lat, lon):
+    """
+    cos(zenith) at the middle of every IST hour of the year, clipped at 0.
+
+    lat and lon may be arrays of shape (S,), giving (S, 8760).
+    """
+    return np.maximum(hourly_geometry(lat, lon)["cos_zenith"], 0.0)
+
+
+def disaggregate_monthly(monthly_values, weights):
+    """
+    Spread monthly totals (..., 12) over the hours in proportion to weights (..., 8760).
+
+    Each month's hourly values sum back to its monthly total.
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+    monthly_weight = np.add.reduceat(weights, MONTH_START, axis=-1)
+    monthly_weight = np.where(monthly_weight > 0, monthly_weight, 1.0)
+    scale = np.asarray(monthly_values, dtype=np.float64) / monthly_weight
+    return weights * scale[..., MONTH_OF_HOUR]
+
+
+def site_weather(lat, lon, monthly_ghi=None):
+    """
+    Hourly weather for a site.
+
+    With the TMY loaded: GHI and diffuse (kWh/m²), air temperature and wind of
+    the nearest location, rescaled month by month to monthly_ghi when given
+    (so the model's monthly totals are kept). Without it: monthly_ghi spread
+    over the daylight hours, no measured diffuse and default temperature/wind.
+    """
+    if tmy is not None:
+        site = np.asarray(tmy[nearest_tmy_site(lat, lon)], dtype=np.float64)
+        ghi = site[TMY_GHI] / 1000
+        diffuse = site[TMY_DIFF] / 1000
+        if monthly_ghi is not None:
+            totals = monthly_totals(ghi)
+            scale = np.divide(monthly_ghi, totals, out=np.zeros(12), where=totals > 0)[MONTH_OF_HOUR]
+            ghi, diffuse = ghi * scale, diffuse * scale
+        return {"ghi": ghi, "diffuse": diffuse, "air_temperature": site[TMY_AT], "wind_speed": site[TMY_WS]}
+    if monthly_ghi is None:
+        raise ValueError("monthly_ghi is required when the hourly TMY data is not loaded")
+    return {
+        "ghi": disaggregate_monthly(monthly_ghi, sun_elevation_factor(lat, lon)),
+        "diffuse": None,
+        "air_temperature": DEFAULT_AIR_TEMPERATURE,
+        "wind_speed": DEFAULT_WIND_SPEED,
+    }
+
+
+def synthesize_load(monthly_consumption, shape=RESIDENTIAL_LOAD_SHAPE):
+    """Hourly load (kWh) from 12 (or one) monthly totals and a 24-hour shape"""
+    monthly = np.broadcast_to(np.asarray(monthly_consumption, dtype=np.float64), (12,))
+    return disaggregate_monthly(monthly, np.asarray(shape, dtype=np.float64)[HOUR_OF_DAY])
+
+
+def expand_load(load):
+    """Accept an uploaded load of 8760 hourly values or one 24-hour day repeated all year"""
+    load = np.asarray(load, dtype=np.float64)
+    if load.shape[-1] == 24:
+        return load[..., HOUR_OF_DAY]
+    if load.shape[-1] != HOURS:
+        raise ValueError("Hourly load must have 24 or 8760 values")
+    return load
+
+
+def monthly_totals(hourly):
+    """Sum (..., 8760) hourly values into (..., 12) calendar months"""
+    return np.add.reduceat(hourly, MONTH_START, axis=-1)
+
+
+def simulate_hourly(generation, load):
+    """
+    Split every hour into self-consumption, import and export.
+
+    Args:
+        generation: (..., 8760) hourly generation (kWh)
+        load: (..., 8760) hourly load (kWh); broadcasts with generation
+
+    Returns:
+        dict: hourly self_consumption, import and export arrays, their monthly
+              totals (monthly_*), and self_consumption_ratio (share of
+              generation used on site) and self_sufficiency (share of load
+              met by solar) per profile
+    """
+    generation, load = np.broadcast_arrays(np.asarray(generation, dtype=np.float64),
+                                           np.asarray(load, dtype=np.float64))
+    self_consumption = np.minimum(generation, load)
+    grid_import = load - self_consumption
+    grid_export = generation - self_consumption
+
+    total_generation = generation.sum(axis=-1)
+    total_load = load.sum(axis=-1)
+    total_self = self_consumption.sum(axis=-1)
+    return {
+        "self_consumption": self_consumption,
+        "import": grid_import,
+        "export": grid_export,
+        "monthly_generation": monthly_totals(generation),
+        "monthly_load": monthly_totals(load),
+        "monthly_self_consumption": monthly_totals(self_consumption),
+        "monthly_import": monthly_totals(grid_import),
+        "monthly_export": monthly_totals(grid_export),
+        "self_consumption_ratio": np.divide(total_self, total_generation,
+                                            out=np.zeros_like(total_self), where=total_generation > 0),
+        "self_sufficiency": np.divide(total_self, total_load,
+                                      out=np.zeros_like(total_self), where=total_load > 0),
+    }
+
+
+def compare_metering(results, tariff):
+    """
+    Yearly benefit (₹) of the hourly flows under each metering arrangement.
+
+    net_metering nets generation against load per month (as /analyze does),
+    net_billing credits every exported hour at the export rate, and
+    gross_metering sells all generation at the gross rate (None where the state
+    has no gross rate).
+    """
+    monthly_load = results["monthly_load"]
+    original_bill = tariff.bill(monthly_load)
+
+    net_metering = tariff.analyze(monthly_load, results["monthly_generation"])["total_benefit"]
+    billed_imports = tariff.bill(results["monthly_import"])
+    export_income = results["monthly_export"] * tariff.export_rate if tariff.export_allowed else 0.0
+    net_billing = original_bill - billed_imports + export_income
+
+    gross = None
+    if tariff.gross_rate is not None:
+        gross = (results["monthly_generation"] * tariff.gross_rate).sum(axis=-1)
+    return {
+        "net_metering": net_metering.sum(axis=-1),
+        "net_billing": net_billing.sum(axis=-1),
+        "gross_metering": gross,
+    }
+
+
+def typical_day(hourly):
+    """Average day of each month: (..., 8760) -> (..., 12, 24)"""
+    hourly = np.asarray(hourly, dtype=np.float64)
+    days = hourly.reshape(hourly.shape[:-1] + (365, 24))
+    month_start_day = MONTH_START // 24
+    return np.add.reduceat(days, month_start_day, axis=-2) / DAYS_IN_MONTH[:, None]
@@ -0,0 +1,344 @@
+"""
+Bulk screening jobs: score a file of sites outside the HTTP request.
+
+POST /jobs uploads a CSV or Parquet file of sites (lat, lon, roof_area,
+unit; any other columns are carried through to the results) and returns a
+job id straight away. GET /jobs/{id} reports progress, and once the job is
+done GET /jobs/{id}/result downloads the results as Parquet.
+
+Job state is kept in SQLite next to the job files, so jobs survive
+restarts:
+    JOBS_DIR/jobs.sqlite3          one row per job
+    JOBS_DIR/<id>/input            the upload as received
+    JOBS_DIR/<id>/parts/*.parquet  one file per scored chunk
+    JOBS_DIR/<id>/result.parquet   the parts combined, once the job is done
+
+Every API worker process runs JOB_WORKERS JobRunner tasks. A runner claims
+the oldest queued job with a single UPDATE, so two workers never take the
+same job, and scores it CHUNK_SIZE rows at a time in a thread, recording
+progress after each chunk. Finished chunks are never redone: on shutdown a
+job goes back to the queue after its current chunk, and a job whose process
+died is claimed again once its last progress is STALE_AFTER seconds old;
+either way it resumes at the first chunk without a part file.
+"""
+import asyncio
+import os
+import shutil
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+try:
+    from .logger import get_logger
+    from .metrics import JOB_CHUNK_LATENCY, JOB_ROWS
+except ImportError:
+    from logger import get_logger
+    from metrics import JOB_CHUNK_LATENCY, JOB_ROWS
+
+logger = get_logger("jobs")
+
+JOBS_DIR = os.getenv("JOBS_DIR", os.path.join("src", "model", "data", "jobs"))
+CHUNK_SIZE = int(os.getenv("JOB_CHUNK_SIZE", "5000"))  # Sites per chunk
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "1"))  # Runner tasks per API worker process
+MAX_UPLOAD_BYTES = int(os.getenv("JOB_MAX_UPLOAD_MB", "200")) * 1024 * 1024
+STALE_AFTER = float(os.getenv("JOB_STALE_AFTER", "120"))  # Seconds without progress before a running job is reclaimed
+POLL_INTERVAL = 2.0  # Seconds between queue checks when idle
+SHUTDOWN_TIMEOUT = 30.0  # Seconds to let a running chunk finish on shutdown
+
+SITE_COLUMNS = ("lat", "lon", "roof_area", "unit")
+COLUMN_ALIASES = {"latitude": "lat", "longitude": "lon", "area": "roof_area", "area_unit": "unit"}
+PARQUET_MAGIC = b"PAR1"
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id TEXT PRIMARY KEY,
+        status TEXT NOT NULL,
+        format TEXT NOT NULL,
+        chunk_size INTEGER NOT NULL,
+        total_rows INTEGER NOT NULL,
+        processed_rows INTEGER NOT NULL DEFAULT 0,
+        error TEXT,
+        worker TEXT,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL,
+        finished_at REAL
+    )
+"""
+# Oldest queued job, or a running one whose worker stopped reporting progress
+CLAIM_SQL = """
+    UPDATE jobs SET status = 'running', worker = ?, updated_at = ?
+    WHERE id = (
+        SELECT id FROM jobs
+        WHERE status = 'queued' OR (status = 'running' AND updated_at < ?)
+        ORDER BY created_at
+        LIMIT 1
+    )
+    RETURNING *
+"""
+
+
+class JobError(Exception):
+    """An upload that cannot be processed (unreadable, missing columns, empty)"""
+
+
+class JobStore:
+    """Job rows in SQLite and the job files beside it; safe to share between threads and processes"""
+
+    def __init__(self, root=JOBS_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.db_path = os.path.join(root, "jobs.sqlite3")
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # A connection per call (autocommit): connections must not cross threads or forks
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def path(self, job_id, *names):
+        return os.path.join(self.root, job_id, *names)
+
+    def create(self, job_id, fmt, total_rows, chunk_size=CHUNK_SIZE):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, format, chunk_size, total_rows, created_at, updated_at) "
+                "VALUES (?, 'queued', ?, ?, ?, ?, ?)",
+                (job_id, fmt, chunk_size, total_rows, now, now),
+            )
+        return self.get(job_id)
+
+    def get(self, job_id):
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def claim(self, worker, stale_after=STALE_AFTER):
+        """Mark the next job running for `worker` and return it, or None if there is none"""
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(CLAIM_SQL, (worker, now, now - stale_after)).fetchone()
+        return dict(row) if row else None
+
+    def _update(self, job_id, worker, assignments, values):
+        # Only the job's current worker may update it; False means it was reclaimed
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"UPDATE jobs SET {assignments}, updated_at = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                (*values, time.time(), job_id, worker),
+            )
+        return cursor.rowcount == 1
+
+    def progress(self, job_id, worker, processed_rows):
+        return self._update(job_id, worker, "processed_rows = ?", (processed_rows,))
+
+    def release(self, job_id, worker):
+        """Put a running job back in the queue (it resumes from its last finished chunk)"""
+        return self._update(job_id, worker, "status = 'queued', worker = NULL", ())
+
+    def finish(self, job_id, worker, total_rows):
+        return self._update(
+            job_id, worker, "status = 'done', total_rows = ?, processed_rows = ?, finished_at = ?",
+            (total_rows, total_rows, time.time()),
+        )
+
+    def fail(self, job_id, worker, error):
+        return self._update(job_id, worker, "status = 'failed', error = ?, finished_at = ?", (error, time.time()))
+
+
+def site_columns(names):
+    """{site column: column name in the file}, accepting the aliases and any letter case"""
+    found = {}
+    for name in names:
+        key = str(name).strip().lower()
+        key = COLUMN_ALIASES.get(key, key)
+        if key in SITE_COLUMNS and key not in found:
+            found[key] = name
+    missing = [column for column in SITE_COLUMNS if column not in found]
+    if missing:
+        raise JobError(f"Missing columns: {', '.join(missing)} (expected {', '.join(SITE_COLUMNS)})")
+    return found
+
+
+def detect_format(path):
+    with open(path, "rb") as f:
+        return "parquet" if f.read(len(PARQUET_MAGIC)) == PARQUET_MAGIC else "csv"
+
+
+def count_csv_rows(path, block_size=1 << 20):
+    """Data rows of a CSV file (lines after the header), without parsing it"""
+    lines = 0
+    last = b"\n"
+    with open(path, "rb") as f:
+        while block := f.read(block_size):
+            lines += block.count(b"\n")
+            last = block[-1:]
+    if last != b"\n":
+        lines += 1
+    return max(lines - 1, 0)
+
+
+def inspect_input(path, fmt):
+    """Check that an upload can be processed and return its number of rows"""
+    try:
+        if fmt == "parquet":
+            parquet = pq.ParquetFile(path)
+            names, rows = parquet.schema_arrow.names, parquet.metadata.num_rows
+        else:
+            names, rows = pd.read_csv(path, nrows=0).columns, count_csv_rows(path)
+    except ValueError as e:  # Includes pandas parser and Arrow errors
+        raise JobError(f"Unreadable {fmt} file: {e}")
+    site_columns(names)
+    if rows == 0:
+        raise JobError("The file has no rows")
+    return rows
+
+
+def read_chunks(path, fmt, chunk_size):
+    """DataFrames of up to chunk_size rows, in file order"""
+    if fmt == "parquet":
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        # Read everything as text so a carried-through column has one type in every chunk
+        yield from pd.read_csv(path, chunksize=chunk_size, dtype=str)
+
+
+def score_chunk(chunk, score):
+    """The chunk's columns (site columns as numbers) followed by score()'s result columns"""
+    columns = site_columns(chunk.columns)
+    chunk = chunk.reset_index(drop=True)
+    sites = pd.DataFrame({
+        "lat": pd.to_numeric(chunk[columns["lat"]], errors="coerce"),
+        "lon": pd.to_numeric(chunk[columns["lon"]], errors="coerce"),
+        "roof_area": pd.to_numeric(chunk[columns["roof_area"]], errors="coerce"),
+        "unit": chunk[columns["unit"]].astype(str).str.strip().str.lower(),
+    })
+    for site_column in ("lat", "lon", "roof_area"):
+        chunk[columns[site_column]] = sites[site_column]
+    results = score(sites)
+    chunk = chunk.drop(columns=[c for c in results.columns if c in chunk.columns])
+    return pa.Table.from_pandas(pd.concat([chunk, results], axis=1), preserve_index=False)
+
+
+def write_atomic(table, path):
+    # A part or result file exists only once it is complete
+    tmp = path + ".tmp"
+    pq.write_table(table, tmp)
+    os.replace(tmp, path)
+
+
+def combine_parts(part_paths, result_path):
+    """Concatenate the part files into one Parquet file, a part at a time"""
+    schema = pa.unify_schemas([pq.read_schema(p) for p in part_paths], promote_options="permissive")
+    tmp = result_path + ".tmp"
+    with pq.ParquetWriter(tmp, schema) as writer:
+        for part_path in part_paths:
+            writer.write_table(pq.read_table(part_path).select(schema.names).cast(schema))
+    os.replace(tmp, result_path)
+
+
+class JobRunner:
+    """Claims and processes jobs from a JobStore in `workers` asyncio tasks"""
+
+    def __init__(self, store, score, workers=JOB_WORKERS):
+        """score: DataFrame of sites (lat, lon, roof_area, unit) -> DataFrame of result columns"""
+        self.store = store
+        self.score = score
+        self.workers = workers
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self._stopping = threading.Event()
+        self._wake = None
+        self._tasks = []
+
+    def start(self):
+        self._wake = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._run(f"{self.name}:{i}")) for i in range(self.workers)]
+
+    def wake(self):
+        """Check the queue now instead of at the next poll (after an upload)"""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def stop(self, timeout=SHUTDOWN_TIMEOUT):
+        """Let running jobs finish their chunk and go back to the queue"""
+        self._stopping.set()
+        self.wake()
+        if self._tasks:
+            _, pending = await asyncio.wait(self._tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+
+    async def _run(self, worker):
+        while not self._stopping.is_set():
+            job = await asyncio.to_thread(self.store.claim, worker)
+            if job is None:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await asyncio.to_thread(self.process, job, worker)
+
+    def process(self, job, worker):
+        job_id = job["id"]
+        start = time.perf_counter()
+        try:
+            total_rows = self._score_parts(job, worker)
+        except Exception as e:
+            logger.exception("Job failed", extra={"fields": {"job_id": job_id}})
+            self.store.fail(job_id, worker, str(e))
+            return
+        if total_rows is None:
+            if self._stopping.is_set() and self.store.release(job_id, worker):
+                logger.info("Job paused", extra={"fields": {"job_id": job_id}})
+            return
+        self.store.finish(job_id, worker, total_rows)
+        logger.info("Job completed", extra={"fields": {
+            "job_id": job_id,
+            "rows": total_rows,
+            "seconds": round(time.perf_counter() - start, 3),
+        }})
+
+    def _score_parts(self, job, worker):
+        """Score every chunk without a part file and combine the parts; None if interrupted"""
+        job_id = job["id"]
+        parts_dir = self.store.path(job_id, "parts")
+        os.makedirs(parts_dir, exist_ok=True)
+        part_paths = []
+        processed = 0
+        for index, chunk in enumerate(read_chunks(self.store.path(job_id, "input"), job["format"], job["chunk_size"])):
+            part_path = os.path.join(parts_dir, f"{index:05d}.parquet")
+            part_paths.append(part_path)
+            if os.path.exists(part_path):
+                processed += pq.ParquetFile(part_path).metadata.num_rows
+                continue
+            if self._stopping.is_set():
+                return None
+            start = time.perf_counter()
+            write_atomic(score_chunk(chunk, self.score), part_path)
+            JOB_CHUNK_LATENCY.observe(time.perf_counter() - start)
+            JOB_ROWS.inc(len(chunk))
+            processed += len(chunk)
+            if not self.store.progress(job_id, worker, processed):
+                logger.warning("Job reclaimed by another worker", extra={"fields": {"job_id": job_id}})
+                return None
+        if not part_paths:
+            raise JobError("The file has no rows")
+        combine_parts(part_paths, self.store.path(job_id, "result.parquet"))
+        shutil.rmtree(parts_dir)
+        return processed
@@ -0,0 +1,162 @@
+"""
+Lifetime (default 25-year) financial projection of a rooftop system.
+
+Builds a (years x months) generation matrix with panel degradation, bills it
+with the state's slab tariff (tariffs.py) and escalates tariffs year on year,
+then derives NPV, IRR, payback and LCOE from the discounted cash flows.
+
+Every financial parameter may be an array: they are broadcast together and
+evaluated as independent scenarios in one pass, which makes sensitivity
+sweeps over thousands of combinations cheap. Slab billing only depends on the
+generation profile and the degradation rate, so it is computed once per
+distinct pair and the escalation/discounting is applied on top.
+"""
+import numpy as np
+
+DEFAULT_YEARS = 25
+DEFAULT_DEGRADATION = 0.005  # Panel output lost per year
+DEFAULT_TARIFF_ESCALATION = 0.03  # Yearly increase of the retail (slab) tariff
+DEFAULT_EXPORT_ESCALATION = 0.0  # Export rates are usually fixed by the policy
+DEFAULT_DISCOUNT_RATE = 0.08
+DEFAULT_OM_FRACTION = 0.01  # Yearly O&M as a fraction of the system cost
+DEFAULT_OM_ESCALATION = 0.05
+COST_PER_KW = 50000  # ₹ per kW installed, used when no system cost is given
+
+IRR_BOUNDS = (-0.99, 1.0)
+IRR_ITERATIONS = 50
+
+
+def _npv(by_year, rates):
+    """NPV of (years + 1, N) cash flows at (N,) rates; year 0 is undiscounted"""
+    # Horner's scheme in x = 1 / (1 + rate): one multiply-add per year, no powers
+    x = 1 / (1 + rates)
+    npv = by_year[-1].copy()
+    for flows in by_year[-2::-1]:
+        npv *= x
+        npv += flows
+    return npv
+
+
+def irr(cash_flows):
+    """
+    Internal rate of return of each row of (N, years + 1) cash flows.
+
+    Vectorized bisection over all rows at once; NaN where the NPV does not
+    change sign within IRR_BOUNDS (e.g. the system never pays back).
+    """
+    by_year = np.ascontiguousarray(cash_flows.T)
+    n = cash_flows.shape[0]
+    lo = np.full(n, IRR_BOUNDS[0])
+    hi = np.full(n, IRR_BOUNDS[1])
+    npv_lo = _npv(by_year, lo)
+    valid = np.sign(npv_lo) != np.sign(_npv(by_year, hi))
+
+    for _ in range(IRR_ITERATIONS):
+        mid = (lo + hi) / 2
+        npv_mid = _npv(by_year, mid)
+        same_side = np.sign(npv_mid) == np.sign(npv_lo)
+        lo = np.where(same_side, mid, lo)
+        npv_lo = np.where(same_side, npv_mid, npv_lo)
+        hi = np.where(same_side, hi, mid)
+
+    return np.where(valid, (lo + hi) / 2, np.nan)
+
+
+def payback_years(cash_flows):
+    """
+    Years (interpolated within the year) until cumulative cash flow turns
+    positive; 0 without a positive investment in year 0, NaN if never
+    """
+    cumulative = np.cumsum(cash_flows, axis=1)
+    positive = cumulative >= 0
+    first = positive.argmax(axis=1)
+    reached = positive.any(axis=1)
+    # Interpolate within the year the balance turns (index >= 1 unless year 0 already is)
+    turn = np.maximum(first, 1)
+    rows = np.arange(cash_flows.shape[0])
+    before = cumulative[rows, turn - 1]
+    fraction = -before / np.where(cash_flows[rows, turn] != 0, cash_flows[rows, turn], 1)
+    return np.where(reached, np.where(first == 0, 0.0, turn - 1 + fraction), np.nan)
+
+
+def simulate_lifetime(monthly_generation, monthly_consumption, tariff, system_cost,
+                      years=DEFAULT_YEARS,
+                      degradation=DEFAULT_DEGRADATION,
+                      tariff_escalation=DEFAULT_TARIFF_ESCALATION,
+                      export_escalation=DEFAULT_EXPORT_ESCALATION,
+                      discount_rate=DEFAULT_DISCOUNT_RATE,
+                      om_fraction=DEFAULT_OM_FRACTION,
+                      om_escalation=DEFAULT_OM_ESCALATION):
+    """
+    Project savings and returns over the system lifetime.
+
+    Args:
+        monthly_generation: 12 first-year monthly generation values (kWh), or
+            an (..., 12) array of profiles that broadcasts with the parameters
+            (e.g. one profile per candidate capacity)
+        monthly_consumption: 12 monthly consumption values, or one for all (kWh)
+        tariff (StateTariff): the state's tariff from tariffs.get_tariff()
+        system_cost, degradation, tariff_escalation, export_escalation,
+        discount_rate, om_fraction, om_escalation: scalars or arrays that
+            broadcast together; each element is one scenario
+
+    Returns:
+        dict: npv, irr, payback_years, lcoe, lifetime_generation and
+              lifetime_savings with the broadcast scenario shape, plus yearly
+              generation, savings, cash_flow (year 0 = investment) and
+              cumulative_cash_flow with a trailing years axis
+    """
+    monthly_generation = np.asarray(monthly_generation, dtype=np.float64)
+    generation_shape = monthly_generation.shape[:-1]
+    # Index of each scenario's generation profile, broadcast like the parameters
+    profile = np.arange(int(np.prod(generation_shape))).reshape(generation_shape)
+    params = np.broadcast_arrays(profile, *(np.asarray(p, dtype=np.float64) for p in (
+        system_cost, degradation, tariff_escalation, export_escalation,
+        discount_rate, om_fraction, om_escalation,
+    )))
+    shape = params[0].shape
+    (profile, system_cost, degradation, tariff_escalation, export_escalation,
+     discount_rate, om_fraction, om_escalation) = (p.ravel() for p in params)
+
+    monthly_generation = monthly_generation.reshape(-1, 12)
+    monthly_consumption = np.asarray(monthly_consumption, dtype=np.float64)
+    year_index = np.arange(years)  # Year 1 has exponent 0
+
+    # Bill every distinct (profile, degradation) pair once: (U, years, 12)
+    pairs, scenario_pair = np.unique(np.stack([profile, degradation], axis=1), axis=0, return_inverse=True)
+    scenario_pair = scenario_pair.ravel()
+    output_factor = (1 - pairs[:, 1, None]) ** year_index
+    generation = output_factor[:, :, None] * monthly_generation[pairs[:, 0].astype(np.intp), None, :]
+    results = tariff.analyze(monthly_consumption, generation)
+    yearly_bill_savings = results["bill_savings"].sum(axis=2)[scenario_pair]
+    yearly_export_income = results["export_income"].sum(axis=2)[scenario_pair]
+    yearly_generation = generation.sum(axis=2)[scenario_pair]
+
+    # Escalate per scenario: (N, years)
+    yearly_savings = (yearly_bill_savings * (1 + tariff_escalation[:, None]) ** year_index
+                      + yearly_export_income * (1 + export_escalation[:, None]) ** year_index)
+    yearly_om = (system_cost * om_fraction)[:, None] * (1 + om_escalation[:, None]) ** year_index
+
+    cash_flow = np.concatenate([-system_cost[:, None], yearly_savings - yearly_om], axis=1)
+    discount = (1 + discount_rate[:, None]) ** (year_index + 1)
+    npv = -system_cost + ((yearly_savings - yearly_om) / discount).sum(axis=1)
+    lcoe = (system_cost + (yearly_om / discount).sum(axis=1)) / (yearly_generation / discount).sum(axis=1)
+
+    def scenario(values):
+        return values.reshape(shape)
+
+    def series(values):
+        return values.reshape(shape + values.shape[1:])
+
+    return {
+        "npv": scenario(npv),
+        "irr": scenario(irr(cash_flow)),
+        "payback_years": scenario(payback_years(cash_flow)),
+        "lcoe": scenario(lcoe),
+        "lifetime_generation": scenario(yearly_generation.sum(axis=1)),
+        "lifetime_savings": scenario(yearly_savings.sum(axis=1)),
+        "yearly_generation": series(yearly_generation),
+        "yearly_savings": series(yearly_savings),
+        "cash_flow": series(cash_flow),
+        "cumulative_cash_flow": series(np.cumsum(cash_flow, axis=1)),
+    }
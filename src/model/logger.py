@@ -0,0 +1,30 @@
+"""
+Structured logging for the model API: the JSON lines and background writer
+of src/common/logs.py, under the "solar" logger tree.
+
+Usage:
+    logger = get_logger("api")
+    logger.info("predict completed", extra={"fields": {"state": state}})
+"""
+import os
+import sys
+
+try:
+    from ..common import logs
+except ImportError:
+    # Run from this directory (python src/model/serve.py): make src/common importable
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from common import logs
+
+ROOT_LOGGER_NAME = "solar"
+
+StageTimer = logs.StageTimer
+queue_depth = logs.queue_depth
+
+
+def setup_logging(level=None):
+    return logs.setup_logging(ROOT_LOGGER_NAME, level)
+
+
+def get_logger(name):
+    return logs.get_logger(ROOT_LOGGER_NAME, name)
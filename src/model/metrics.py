@@ -0,0 +1,38 @@
+"""
+Prometheus metrics for the model API, exposed on /metrics.
+
+The request, stage, cache and log-queue metrics are src/common/metrics.py's
+under the "solar_model" prefix. Per-endpoint request latency is recorded by
+MetricsMiddleware; handlers add per-stage latency (state lookup, capacity,
+model, weather fetch, serialize) from their StageTimer with
+observe_stages(), and jobs.py reports its chunks here.
+"""
+import os
+import sys
+
+from prometheus_client import Counter, Histogram
+
+try:
+    from ..common import metrics as common_metrics
+except ImportError:
+    # Run from this directory (python src/model/serve.py): make src/common importable
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from common import metrics as common_metrics
+
+LATENCY_BUCKETS = common_metrics.LATENCY_BUCKETS
+
+service_metrics = common_metrics.ServiceMetrics("solar_model")
+MetricsMiddleware = service_metrics.middleware
+observe_stages = service_metrics.observe_stages
+record_cache = service_metrics.record_cache
+metrics_response = common_metrics.metrics_response
+
+JOB_ROWS = Counter(
+    "solar_model_job_rows_total",
+    "Sites scored by bulk jobs",
+)
+JOB_CHUNK_LATENCY = Histogram(
+    "solar_model_job_chunk_duration_seconds",
+    "Time to score and write one chunk of a bulk job",
+    buckets=LATENCY_BUCKETS + (30.0, 60.0),
+)
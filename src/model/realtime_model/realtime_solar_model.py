@@ -7,187 +7,218 @@ from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import mean_absolute_error, r2_score
 import joblib
-import calendar
-
-# ✅ Step 1: Load and Process .h5 Data into Daily Averages
-file_path = "src/model/data/india_spectral_tmy.h5"
-with h5py.File(file_path, 'r') as f:
-    ghi = f['GHI_1000'][:]     # Wh/m^2 per hour
-    at = f['AT'][:]
-    ws = f['WS'][:]
-    pw = f['PW'][:]
-    tau5 = f['Tau5'][:]
-    diff = f['DIFF'][:]
-    coords = f['coordinates'][:]
-
-# ✅ Step 2: Convert Hourly Data to Daily Values (Sum for GHI, Mean for others)
+import os
+
+DATA_PATH = os.path.join("src", "model", "data", "india_spectral_tmy.h5")
+MODEL_PATH = os.path.join("src", "model", "realtime_model", "xgboost_model_realtime.pkl")
+SCALER_PATH = os.path.join("src", "model", "realtime_model", "scaler_realtime.pkl")
+# Daily dataset cached as a flat .npy so it can be memory-mapped (and shared
+# between forked workers) instead of being rebuilt from the .h5 file.
+CLIMATOLOGY_PATH = os.path.join("src", "model", "realtime_model", "daily_climatology.npy")
+
+FEATURE_COLUMNS = ["lat", "lon", "month", "day", "AT", "WS", "PW", "Tau5", "DIFF"]
+columns = FEATURE_COLUMNS + ["GHI"]
+LAT, LON, MONTH, DAY, AT, WS, PW, TAU5, DIFF, GHI = range(len(columns))
+
+REALTIME_DAYS = 30  # Prediction horizon
+# Days over which weather past the last known day fades into climatology
+BLEND_DAYS = 5
+SUMMER_MONTHS = [4, 5, 6]
+WINTER_MONTHS = [11, 12, 1, 2]
+
+# Loaded lazily by load_realtime_artifacts()
+xgb_model = None
+scaler = None
+climatology = None
+
+# ✅ Step 1: Convert Hourly Data to Daily Values (Sum for GHI, Mean for others)
 def hourly_to_daily(arr, mode="sum"):
     daily = arr.reshape(365, 24, arr.shape[1])
     return (daily.sum(axis=1) / 1000) if mode == "sum" else daily.mean(axis=1)
 
-# Convert to daily values (365, 117)
-ghi_daily = hourly_to_daily(ghi, mode="sum")
-at_daily = hourly_to_daily(at, mode="mean")
-ws_daily = hourly_to_daily(ws, mode="mean")
-pw_daily = hourly_to_daily(pw, mode="mean")
-tau5_daily = hourly_to_daily(tau5, mode="mean")
-diff_daily = hourly_to_daily(diff, mode="mean")
-
-# ✅ Step 3: Build Daily Dataset with Temperature and Wind Speed focus
-data = []
-for day in range(365):
-    month = (day // 30) + 1
-    day_of_month = (day % 30) + 1
-    for loc in range(117):
-        lat, lon = coords[loc]
-        row = [
-            lat, lon,
-            month, day_of_month,
-            at_daily[day, loc],  # Temperature
-            ws_daily[day, loc],  # Wind Speed
-            pw_daily[day, loc],
-            tau5_daily[day, loc],
-            diff_daily[day, loc],
-            ghi_daily[day, loc]  # Target
-        ]
-        data.append(row)
-
-columns = ["lat", "lon", "month", "day", "AT", "WS", "PW", "Tau5", "DIFF", "GHI"]
-df = pd.DataFrame(data, columns=columns)
-
-# Clip target GHI to realistic range for India (3-7 kWh/m²/day)
-df["GHI"] = df["GHI"].clip(lower=0, upper=8)
-if df["GHI"].mean() > 6:
-    df["GHI"] = df["GHI"] * 0.75
-df["GHI"] = df["GHI"].clip(lower=3, upper=7)
-
-# ✅ Step 4: Train Model using XGBoost with focus on Temperature and Wind Speed
-X = df[["lat", "lon", "month", "day", "AT", "WS", "PW", "Tau5", "DIFF"]]
-y = df["GHI"]
-
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-scaler = StandardScaler()
-X_train_scaled = scaler.fit_transform(X_train)
-X_test_scaled = scaler.transform(X_test)
-
-xgb_model = xgb.XGBRegressor(
-    n_estimators=990,
-    max_depth=8,
-    learning_rate=0.09,
-    subsample=0.9,
-    colsample_bytree=0.9,
-    reg_alpha=0.9,
-    reg_lambda=12.5,
-    random_state=42
-)
-
-xgb_model.fit(X_train_scaled, y_train)
-
-# ✅ Step 5: Evaluate
-preds = xgb_model.predict(X_test_scaled)
-print(f"\n✅ MAE: {mean_absolute_error(y_test, preds):.5f} kWh/m²/day")
-print(f"✅ R²: {r2_score(y_test, preds):.4f}")
-
-# Save model and scaler for real-time predictions
-joblib.dump(xgb_model, "src/model/realtime_model/xgboost_model_realtime.pkl")
-joblib.dump(scaler, "src/model/realtime_model/scaler_realtime.pkl")
+# ✅ Step 2: Build Daily Dataset with Temperature and Wind Speed focus
+def build_daily_dataset(file_path=DATA_PATH):
+    """
+    Load the hourly .h5 data and build the daily training dataset.
+
+    Returns:
+        np.ndarray: (365 * n_locations, 10) array ordered day-major, with
+                    columns in the order of `columns`
+    """
+    with h5py.File(file_path, 'r') as f:
+        ghi = f['GHI_1000'][:]     # Wh/m^2 per hour
+        at = f['AT'][:]
+        ws = f['WS'][:]
+        pw = f['PW'][:]
+        tau5 = f['Tau5'][:]
+        diff = f['DIFF'][:]
+        coords = f['coordinates'][:]
+
+    n_locations = coords.shape[0]
+    days = np.arange(365)
+
+    data = np.empty((365 * n_locations, len(columns)), dtype=np.float64)
+    data[:, LAT] = np.tile(coords[:, 0], 365)
+    data[:, LON] = np.tile(coords[:, 1], 365)
+    data[:, MONTH] = np.repeat((days // 30) + 1, n_locations)
+    data[:, DAY] = np.repeat((days % 30) + 1, n_locations)
+    data[:, AT] = hourly_to_daily(at, mode="mean").ravel()     # Temperature
+    data[:, WS] = hourly_to_daily(ws, mode="mean").ravel()     # Wind Speed
+    data[:, PW] = hourly_to_daily(pw, mode="mean").ravel()
+    data[:, TAU5] = hourly_to_daily(tau5, mode="mean").ravel()
+    data[:, DIFF] = hourly_to_daily(diff, mode="mean").ravel()
+
+    # Clip target GHI to realistic range for India (3-7 kWh/m²/day)
+    target = np.clip(hourly_to_daily(ghi, mode="sum").ravel(), 0, 8)
+    if target.mean() > 6:
+        target = target * 0.75
+    data[:, GHI] = np.clip(target, 3, 7)
+
+    return data
+
+# ✅ Step 3: Train Model using XGBoost with focus on Temperature and Wind Speed
+def train_realtime_model(data, model_path=MODEL_PATH, scaler_path=SCALER_PATH):
+    """Train the realtime model on the daily dataset and save it with its scaler"""
+    df = pd.DataFrame(np.asarray(data), columns=columns)
+    X = df[FEATURE_COLUMNS]
+    y = df["GHI"]
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    fitted_scaler = StandardScaler()
+    X_train_scaled = fitted_scaler.fit_transform(X_train)
+    X_test_scaled = fitted_scaler.transform(X_test)
+
+    model = xgb.XGBRegressor(
+        n_estimators=990,
+        max_depth=8,
+        learning_rate=0.09,
+        subsample=0.9,
+        colsample_bytree=0.9,
+        reg_alpha=0.9,
+        reg_lambda=12.5,
+        random_state=42
+    )
+
+    model.fit(X_train_scaled, y_train)
+
+    # ✅ Step 4: Evaluate
+    preds = model.predict(X_test_scaled)
+    print(f"\n✅ MAE: {mean_absolute_error(y_test, preds):.5f} kWh/m²/day")
+    print(f"✅ R²: {r2_score(y_test, preds):.4f}")
+
+    # Save model and scaler for real-time predictions
+    joblib.dump(model, model_path)
+    joblib.dump(fitted_scaler, scaler_path)
+
+    return model, fitted_scaler
+
+# ✅ Step 5: Load saved artifacts once (training only if they are missing)
+def load_realtime_artifacts(model_path=MODEL_PATH, scaler_path=SCALER_PATH,
+                            climatology_path=CLIMATOLOGY_PATH, data_path=DATA_PATH):
+    """
+    Load the realtime model, scaler and daily climatology into module state.
+
+    The climatology is memory-mapped read-only, so processes forked after this
+    call share its pages instead of each holding a private copy.
+    """
+    global xgb_model, scaler, climatology
+
+    if not os.path.exists(climatology_path):
+        np.save(climatology_path, build_daily_dataset(data_path))
+    climatology = np.load(climatology_path, mmap_mode="r")
+
+    if os.path.exists(model_path) and os.path.exists(scaler_path):
+        xgb_model = joblib.load(model_path)
+        scaler = joblib.load(scaler_path)
+    else:
+        xgb_model, scaler = train_realtime_model(climatology, model_path, scaler_path)
 
 # ✅ Step 6: Function for Real-time 30-day Predictions
-def predict_realtime_ghi(lat, lon, start_date, temperature, wind_speed):
+def per_day(values, days):
+    """(days,) array from a scalar (today only), a per-day sequence (None = unknown) or None, NaN where unknown"""
+    out = np.full(days, np.nan)
+    if values is None:
+        return out
+    values = np.array(np.atleast_1d(values)[:days], dtype=np.float64)  # None becomes NaN
+    out[:len(values)] = values
+    return out
+
+def blend_with_climatology(observed, normal, blend_days=BLEND_DAYS):
     """
-    Predict GHI for 30 days starting from the given date using real-time temperature and wind speed.
+    Known values where given; after the last known day, a linear fade from
+    it to the climatological normal over blend_days; the normal before any.
+    """
+    day = np.arange(len(observed))
+    last_known = np.maximum.accumulate(np.where(np.isnan(observed), -1, day))
+    weight = np.where(last_known >= 0, np.clip(1 - (day - last_known) / (blend_days + 1), 0, 1), 0)
+    last_value = np.where(last_known >= 0, observed[np.maximum(last_known, 0)], 0.0)
+    return weight * last_value + (1 - weight) * normal
+
+def monthly_normals(rows, features):
+    """(14, F) mean of each feature per MONTH value of the climatology rows (row 0 unused)"""
+    month = rows[:, MONTH].astype(np.int64)
+    counts = np.maximum(np.bincount(month, minlength=14), 1)
+    return np.stack([np.bincount(month, weights=rows[:, f], minlength=14) for f in features], axis=1) / counts[:, None]
+
+def predict_realtime_ghi(lat, lon, start_date, temperature=None, wind_speed=None, days=REALTIME_DAYS):
+    """
+    Predict daily GHI for the days from the given date, all scored in one model call.
     
     Args:
         lat (float): Latitude
         lon (float): Longitude
         start_date (str): Start date in format 'YYYY-MM-DD'
-        temperature (float): Current temperature
-        wind_speed (float): Current wind speed
+        temperature: °C, either today's value or one value per day from
+            start_date (e.g. a 5-day forecast, None for unknown days)
+        wind_speed: m/s, in the same form
+        days (int): Horizon
+    
+    Days without weather continue from the last known day and blend into the
+    location's climatology over BLEND_DAYS days; the other features come from
+    the climatology of each day's month.
     
     Returns:
-        tuple: (daily_predictions, monthly_total)
+        tuple: (daily_predictions, total)
     """
-    from datetime import datetime, timedelta
+    if xgb_model is None:
+        load_realtime_artifacts()
     
-    # Parse start date
-    start_dt = datetime.strptime(start_date, '%Y-%m-%d')
-    month = start_dt.month
+    dates = np.datetime64(start_date, "D") + np.arange(days)
+    months = dates.astype("datetime64[M]").astype(np.int64) % 12 + 1
+    day_of_month = (dates - dates.astype("datetime64[M]")).astype(np.int64) + 1
     
-    # Get location-specific historical averages
-    location_data = df[(df['lat'].between(lat-0.5, lat+0.5)) &
-                      (df['lon'].between(lon-0.5, lon+0.5)) &
-                      (df['month'] == month)]
+    # Location-specific historical averages per month
+    location_mask = ((climatology[:, LAT] >= lat - 0.5) & (climatology[:, LAT] <= lat + 0.5) &
+                     (climatology[:, LON] >= lon - 0.5) & (climatology[:, LON] <= lon + 0.5))
+    location_data = climatology[location_mask] if location_mask.any() else climatology
+    normals = monthly_normals(location_data, [AT, WS, PW, TAU5, DIFF])[months]
     
-    if len(location_data) > 0:
-        avg_pw = location_data['PW'].mean()
-        avg_tau5 = location_data['Tau5'].mean()
-        avg_diff = location_data['DIFF'].mean()
-        
-        pw_std = location_data['PW'].std()
-        tau5_std = location_data['Tau5'].std()
-        diff_std = location_data['DIFF'].std()
-    else:
-        monthly_data = df[df['month'] == month]
-        avg_pw = monthly_data['PW'].mean()
-        avg_tau5 = monthly_data['Tau5'].mean()
-        avg_diff = monthly_data['DIFF'].mean()
-        
-        pw_std = monthly_data['PW'].std()
-        tau5_std = monthly_data['Tau5'].std()
-        diff_std = monthly_data['DIFF'].std()
-    
-    inputs = []
-    current_date = start_dt
+    inputs = np.empty((days, len(FEATURE_COLUMNS)))
+    inputs[:, LAT] = lat
+    inputs[:, LON] = lon
+    inputs[:, MONTH] = months
+    inputs[:, DAY] = day_of_month
+    inputs[:, AT] = blend_with_climatology(per_day(temperature, days), normals[:, 0])
+    inputs[:, WS] = blend_with_climatology(per_day(wind_speed, days), normals[:, 1])
+    inputs[:, [PW, TAU5, DIFF]] = normals[:, 2:]
     
-    # Generate predictions for 30 days
-    for day in range(30):
-        # Add daily variation patterns
-        day_variation = np.sin(2 * np.pi * day / 30) * 0.1
-        
-        # Temperature variation based on initial temperature
-        temp_variation = temperature + day_variation * 2 + np.random.normal(0, 1)
-        
-        # Wind speed variation based on initial wind speed
-        ws_variation = wind_speed + day_variation + np.random.normal(0, 0.5)
-        
-        # Other parameters with realistic variations
-        pw_value = avg_pw + day_variation * pw_std * 0.2 + np.random.normal(0, pw_std * 0.3)
-        tau5_value = avg_tau5 + np.random.normal(0, tau5_std * 0.3)
-        diff_value = avg_diff + np.random.normal(0, diff_std * 0.3)
-        
-        inputs.append([
-            lat, lon,
-            current_date.month,
-            current_date.day,
-            temp_variation,
-            ws_variation,
-            pw_value,
-            tau5_value,
-            diff_value
-        ])
-        
-        current_date += timedelta(days=1)
+    input_scaled = scaler.transform(pd.DataFrame(inputs, columns=FEATURE_COLUMNS))
+    predictions = np.clip(xgb_model.predict(input_scaled).astype(np.float64), 3.0, 7.0)
     
-    input_df = pd.DataFrame(inputs, columns=["lat", "lon", "month", "day", "AT", "WS", "PW", "Tau5", "DIFF"])
-    input_scaled = scaler.transform(input_df)
-    predictions = xgb_model.predict(input_scaled)
+    # Seasonal adjustments, keeping the Indian GHI range
+    predictions = np.where(np.isin(months, SUMMER_MONTHS), np.minimum(predictions * 1.1, 7.0), predictions)
+    predictions = np.where(np.isin(months, WINTER_MONTHS), np.maximum(predictions * 0.85, 3.0), predictions)
     
-    # Add realistic variations and ensure Indian GHI range
-    for i in range(len(predictions)):
-        daily_factor = 1 + np.random.normal(0, 0.05)
-        predictions[i] *= daily_factor
-        predictions[i] = np.clip(predictions[i], 3.0, 7.0)
-        
-        # Seasonal adjustments
-        if month in [4, 5, 6]:  # Summer
-            predictions[i] = min(predictions[i] * 1.1, 7.0)
-        elif month in [11, 12, 1, 2]:  # Winter
-            predictions[i] = max(predictions[i] * 0.85, 3.0)
-    
-    return predictions.tolist(), float(sum(predictions))
+    return predictions.tolist(), float(predictions.sum())
 
 if __name__ == "__main__":
+    # Retrain from the .h5 data and refresh the saved artifacts
+    data = build_daily_dataset()
+    np.save(CLIMATOLOGY_PATH, data)
+    train_realtime_model(data)
+    load_realtime_artifacts()
+    
     # Example usage
     lat, lon = 26.85, 75.8
     start_date = "2024-03-20"
@@ -0,0 +1,58 @@
+"""
+Fast response path for the prediction endpoints.
+
+ORJSONResponse serializes NumPy arrays and scalars natively, so handlers can
+round with NumPy and hand the arrays straight over without building Python
+lists. add_compression() enables gzip (or brotli, when brotli-asgi is
+installed) for large, batch-sized bodies only; single predictions are below
+the threshold and skip compression entirely.
+"""
+import os
+
+import numpy as np
+import orjson
+from fastapi.middleware.gzip import GZipMiddleware
+from starlette.responses import JSONResponse
+
+try:
+    from .logger import get_logger
+except ImportError:
+    from logger import get_logger
+
+logger = get_logger("responses")
+
+# Bodies smaller than this are sent as-is (a single /predict is ~1 KB)
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "4096"))
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson, including NumPy arrays and scalars"""
+
+    def render(self, content):
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+
+def round_array(values, decimals=2):
+    """Vectorized rounding to a float64 array (no per-element Python work)"""
+    return np.round(np.asarray(values, dtype=np.float64), decimals)
+
+
+def add_compression(app):
+    """
+    Compress large responses according to RESPONSE_COMPRESSION.
+
+    "gzip" (default), "brotli" (falls back to gzip for clients without br, and
+    to plain gzip when brotli-asgi is not installed) or "off".
+    """
+    mode = os.getenv("RESPONSE_COMPRESSION", "gzip").lower()
+    if mode == "off":
+        return
+    if mode == "brotli":
+        try:
+            from brotli_asgi import BrotliMiddleware
+        except ImportError:
+            logger.warning("RESPONSE_COMPRESSION=brotli but brotli-asgi is not installed, using gzip")
+        else:
+            app.add_middleware(BrotliMiddleware, minimum_size=COMPRESSION_MIN_SIZE, gzip_fallback=True)
+            return
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MIN_SIZE)
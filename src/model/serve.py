@@ -0,0 +1,132 @@
+"""
+Pre-fork launcher for the model API.
+
+`api.load_models()` loads every read-only artifact (GHI model, realtime model
+and scaler, memory-mapped daily climatology, state boundaries) once in this
+master process; the app's lifespan then finds them loaded and only warms up.
+The GC is then frozen so collections in the workers never touch those
+objects, and the workers are forked so they share the pages copy-on-write
+instead of each loading (or retraining) their own copy.
+
+Usage (from the repository root):
+    python src/model/serve.py --workers 4 --port 8001
+
+For /metrics to aggregate all workers, point PROMETHEUS_MULTIPROC_DIR at an
+empty directory before starting.
+"""
+import argparse
+import gc
+import os
+import signal
+import socket
+import time
+
+import uvicorn
+from prometheus_client import multiprocess
+
+try:
+    from . import api
+except ImportError:
+    import api
+
+
+def bind_socket(host, port, backlog=2048):
+    """Create the listening socket in the master so every worker accepts on it"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(app, sockets, log_level):
+    """Serve the already-imported app on the inherited sockets (runs in the child)"""
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    config = uvicorn.Config(app, log_level=log_level)
+    server = uvicorn.Server(config)
+    server.run(sockets=sockets)
+
+
+def spawn_worker(app, sockets, log_level):
+    pid = os.fork()
+    if pid == 0:
+        exit_code = 0
+        try:
+            run_worker(app, sockets, log_level)
+        except BaseException:
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+    return pid
+
+
+def preload():
+    """
+    Load (but do not warm up: XGBoost's OpenMP pool must not be started
+    before fork) and move everything that survives a full collection into
+    the permanent generation so the workers' collectors never write to (and
+    un-share) those pages.
+    """
+    api.load_models()
+    gc.collect()
+    gc.freeze()
+
+
+def supervise(workers, respawn):
+    """Wait on the workers, replacing crashed ones, until SIGTERM/SIGINT stops them all"""
+    shutting_down = False
+
+    def shutdown(signum, frame):
+        nonlocal shutting_down
+        shutting_down = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        workers.discard(pid)
+        if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+            # Drop the dead worker's live gauges from the aggregate
+            multiprocess.mark_process_dead(pid)
+        if not shutting_down:
+            # Replace a crashed worker; it is forked from the same warm master
+            print(f"Worker {pid} exited with status {status}, restarting")
+            time.sleep(1)
+            workers.add(respawn())
+
+
+def serve(app, sockets, workers, log_level):
+    """Fork `workers` children serving app on sockets, and keep them running until signalled"""
+    children = {spawn_worker(app, sockets, log_level) for _ in range(workers)}
+    addresses = ", ".join("%s:%s" % sock.getsockname()[:2] for sock in sockets)
+    print(f"Master {os.getpid()} serving on {addresses} with {len(children)} workers")
+    supervise(children, lambda: spawn_worker(app, sockets, log_level))
+    for sock in sockets:
+        sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the model API with pre-forked workers")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--log-level", default="warning")
+    args = parser.parse_args()
+
+    preload()
+    serve(api.app, [bind_socket(args.host, args.port)], args.workers, args.log_level)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Optimal system size for a customer's bill, tariff and roof.
+
+Generation is linear in capacity, so every candidate's monthly generation is
+the per-kW profile scaled by its kW. All candidates go through the lifetime
+engine (lifetime.py) as one batch of scenarios; the best grid point is then
+refined on a finer grid between its neighbours.
+"""
+import numpy as np
+
+try:
+    from . import lifetime
+except ImportError:
+    import lifetime
+
+OBJECTIVES = ("npv", "payback")
+DEFAULT_CANDIDATES = 1000
+REFINE_CANDIDATES = 50
+
+
+def _score(results, objective):
+    """Higher is better; systems that never pay back rank last"""
+    if objective == "npv":
+        return results["npv"]
+    return -np.nan_to_num(results["payback_years"], nan=np.inf)
+
+
+def _evaluate(capacities, generation_per_kw, monthly_consumption, tariff, cost_per_kw, **assumptions):
+    generation = capacities[:, None] * generation_per_kw
+    return lifetime.simulate_lifetime(generation, monthly_consumption, tariff,
+                                      system_cost=capacities * cost_per_kw, **assumptions)
+
+
+def optimize_capacity(generation_per_kw, monthly_consumption, tariff, max_capacity,
+                      objective="npv", candidates=DEFAULT_CANDIDATES,
+                      cost_per_kw=lifetime.COST_PER_KW, **assumptions):
+    """
+    Find the capacity (kW) that maximizes NPV or minimizes payback.
+
+    Args:
+        generation_per_kw: 12 first-year monthly kWh of a 1 kW system
+        monthly_consumption: 12 monthly values, or one for all (kWh)
+        tariff (StateTariff): the state's tariff
+        max_capacity (float): largest allowed size (area and state caps)
+        objective (str): "npv" or "payback"
+        candidates (int): size of the initial grid over (0, max_capacity]
+        **assumptions: degradation, tariff_escalation, ... for simulate_lifetime
+
+    Returns:
+        dict: best capacity and its lifetime results, plus the initial grid
+              (capacities and their npv/payback) for plotting
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"objective must be one of {OBJECTIVES}")
+
+    generation_per_kw = np.asarray(generation_per_kw, dtype=np.float64)
+    grid = np.linspace(max_capacity / candidates, max_capacity, candidates)
+    results = _evaluate(grid, generation_per_kw, monthly_consumption, tariff, cost_per_kw, **assumptions)
+    best = int(np.argmax(_score(results, objective)))
+
+    # Refine between the neighbours of the best grid point; the point itself
+    # stays a candidate so refining can never end up worse than the grid
+    low, high = grid[max(best - 1, 0)], grid[min(best + 1, candidates - 1)]
+    fine = np.union1d(np.linspace(low, high, REFINE_CANDIDATES), grid[best])
+    fine_results = _evaluate(fine, generation_per_kw, monthly_consumption, tariff, cost_per_kw, **assumptions)
+    fine_best = int(np.argmax(_score(fine_results, objective)))
+
+    return {
+        "capacity_kw": float(fine[fine_best]),
+        "system_cost": float(fine[fine_best] * cost_per_kw),
+        "yearly_generation": float(generation_per_kw.sum() * fine[fine_best]),
+        **{name: float(fine_results[name][fine_best]) for name in (
+            "npv", "irr", "payback_years", "lcoe", "lifetime_generation", "lifetime_savings",
+        )},
+        "grid": {
+            "capacity_kw": grid,
+            "npv": results["npv"],
+            "payback_years": results["payback_years"],
+        },
+    }
@@ -0,0 +1,208 @@
+"""
+Sun position and clear-sky irradiance for arrays of times x locations.
+
+solar_position() and clear_sky() are plain NumPy and broadcast any shapes.
+hourly_geometry() serves the standard 8760-hour year (hourly.py, the PV model)
+from a cache of per-grid-cell tables indexed by day of year and hour: sites
+in the same 0.1° cell share one table, computed once for all missing cells
+in a single vectorized call. for_timestamps() handles arbitrary (e.g.
+forecast) times.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+try:
+    from .metrics import record_cache
+except ImportError:
+    from metrics import record_cache
+
+SOLAR_CONSTANT = 1.367  # kW/m²
+IST_OFFSET_HOURS = 5.5  # Hours are Indian Standard Time
+
+# The simulated year: 365 days x 24 hours, hour h covering h:00-h:59 IST
+HOURS = 8760
+DAY_OF_YEAR = np.repeat(np.arange(1, 366), 24)  # 1-based day of each hour
+HOUR_OF_DAY = np.tile(np.arange(24), 365)
+
+GRID_RESOLUTION = 0.1  # Degrees; sun angles differ by < 0.1° inside a cell
+CACHE_MAX_CELLS = 1024  # ~70 KB per cell (cos zenith and azimuth as float32)
+
+# ASHRAE clear-sky model per month: apparent extraterrestrial irradiance A
+# (kW/m²), optical depth B and diffuse factor C
+ASHRAE_A = np.array([1.230, 1.215, 1.186, 1.136, 1.104, 1.088, 1.085, 1.107, 1.151, 1.192, 1.221, 1.233])
+ASHRAE_B = np.array([0.142, 0.144, 0.156, 0.180, 0.196, 0.205, 0.207, 0.201, 0.177, 0.160, 0.149, 0.142])
+ASHRAE_C = np.array([0.058, 0.060, 0.071, 0.097, 0.121, 0.134, 0.136, 0.122, 0.092, 0.073, 0.063, 0.057])
+MONTH_OF_DAY = np.repeat(np.arange(12), [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])  # Indexed by day - 1
+
+
+def solar_position(lat, lon, day_of_year=DAY_OF_YEAR, hour=HOUR_OF_DAY, minute=30):
+    """
+    Sun position (declination and equation of time, Spencer 1971).
+
+    lat/lon (degrees) of shape (...) broadcast against the time axis of
+    day_of_year/hour (IST), giving (..., T) arrays: cos_zenith, zenith and
+    azimuth (radians, clockwise from north) and extraterrestrial normal
+    irradiance (kW/m²). The default times are the middle of each hour of the year.
+    """
+    lat = np.radians(np.asarray(lat, dtype=np.float64))[..., None]
+    lon = np.asarray(lon, dtype=np.float64)[..., None]
+    day_of_year = np.asarray(day_of_year)
+    b = 2 * np.pi * (day_of_year - 1) / 365
+    declination = (0.006918 - 0.399912 * np.cos(b) + 0.070257 * np.sin(b)
+                   - 0.006758 * np.cos(2 * b) + 0.000907 * np.sin(2 * b)
+                   - 0.002697 * np.cos(3 * b) + 0.00148 * np.sin(3 * b))
+    equation_of_time = 229.18 * (0.000075 + 0.001868 * np.cos(b) - 0.032077 * np.sin(b)
+                                 - 0.014615 * np.cos(2 * b) - 0.040849 * np.sin(2 * b))  # minutes
+    solar_time = hour + minute / 60 + (4 * (lon - 15 * IST_OFFSET_HOURS) + equation_of_time) / 60
+    hour_angle = np.radians(15 * (solar_time - 12))
+
+    cos_zenith = np.clip(np.sin(lat) * np.sin(declination)
+                         + np.cos(lat) * np.cos(declination) * np.cos(hour_angle), -1.0, 1.0)
+    azimuth = np.arctan2(np.sin(hour_angle),
+                         np.cos(hour_angle) * np.sin(lat) - np.tan(declination) * np.cos(lat)) + np.pi
+    return {
+        "cos_zenith": cos_zenith,
+        "zenith": np.arccos(cos_zenith),
+        "azimuth": azimuth,
+        "extraterrestrial": np.broadcast_to(extraterrestrial(day_of_year), cos_zenith.shape),
+    }
+
+
+def extraterrestrial(day_of_year):
+    """Extraterrestrial normal irradiance (kW/m²) on the given days"""
+    return SOLAR_CONSTANT * (1 + 0.033 * np.cos(2 * np.pi * np.asarray(day_of_year) / 365))
+
+
+def clear_sky(cos_zenith, day_of_year=DAY_OF_YEAR):
+    """
+    Clear-sky GHI, DNI and DHI (kW/m²) from the ASHRAE model.
+
+    cos_zenith (..., T) and day_of_year (T) as returned/used by solar_position().
+    """
+    month = MONTH_OF_DAY[np.asarray(day_of_year) - 1]
+    up = cos_zenith > 0
+    safe_cos_zenith = np.where(up, cos_zenith, 1.0)
+    dni = np.where(up, ASHRAE_A[month] * np.exp(-ASHRAE_B[month] / safe_cos_zenith), 0.0)
+    dhi = ASHRAE_C[month] * dni
+    return {"ghi": dni * np.maximum(cos_zenith, 0.0) + dhi, "dni": dni, "dhi": dhi}
+
+
+def for_timestamps(lat, lon, timestamps):
+    """
+    Sun position and clear-sky irradiance at arbitrary UTC timestamps.
+
+    Args:
+        lat, lon: site coordinates, scalars or (S,) arrays
+        timestamps: (T,) datetime64 values or ISO strings, in UTC
+
+    Returns:
+        dict: (..., T) arrays from solar_position() plus clear_sky_ghi,
+              clear_sky_dni and clear_sky_dhi
+    """
+    local = np.asarray(timestamps, dtype="datetime64[m]") + np.timedelta64(int(IST_OFFSET_HOURS * 60), "m")
+    day = local.astype("datetime64[D]")
+    day_of_year = np.minimum((day - day.astype("datetime64[Y]")).astype(int) + 1, 365)
+    minutes = (local - day).astype(int)
+    sun = solar_position(lat, lon, day_of_year, minutes // 60, minutes % 60)
+    sky = clear_sky(sun["cos_zenith"], day_of_year)
+    return {**sun, **{f"clear_sky_{name}": values for name, values in sky.items()}}
+
+
+class GeometryCache:
+    """
+    LRU of per-grid-cell sun tables for the 8760-hour year.
+
+    Each entry holds cos zenith and azimuth by (day of year, hour) as float32;
+    clear-sky and extraterrestrial values are cheap functions of those and the
+    day, so they are not stored.
+    """
+
+    def __init__(self, resolution=GRID_RESOLUTION, max_cells=CACHE_MAX_CELLS):
+        self.resolution = resolution
+        self.max_cells = max_cells
+        self._tables = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._tables)
+
+    def clear(self):
+        with self._lock:
+            self._tables.clear()
+            self.hits = self.misses = 0
+
+    def tables(self, lat, lon):
+        """(S, 2, 8760) float32 cos zenith/azimuth for (S,) sites, filling missing cells in one call"""
+        lat = np.atleast_1d(np.asarray(lat, dtype=np.float64))
+        lon = np.atleast_1d(np.asarray(lon, dtype=np.float64))
+        cells = np.stack([np.round(lat / self.resolution), np.round(lon / self.resolution)], axis=1).astype(np.int64)
+        unique_cells, site_cell = np.unique(cells, axis=0, return_inverse=True)
+        keys = [tuple(cell) for cell in unique_cells.tolist()]
+
+        with self._lock:
+            found = [self._tables.get(key) for key in keys]
+            missing = [i for i, table in enumerate(found) if table is None]
+            for i, table in enumerate(found):
+                if table is not None:
+                    self._tables.move_to_end(keys[i])
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+        record_cache("solar_geometry", True, len(keys) - len(missing))
+        record_cache("solar_geometry", False, len(missing))
+
+        if missing:
+            centers = unique_cells[missing] * self.resolution
+            sun = solar_position(centers[:, 0], centers[:, 1])
+            computed = np.stack([sun["cos_zenith"], sun["azimuth"]], axis=1).astype(np.float32)
+            with self._lock:
+                for i, table in zip(missing, computed):
+                    found[i] = table
+                    self._tables[keys[i]] = table
+                while len(self._tables) > self.max_cells:
+                    self._tables.popitem(last=False)
+
+        return np.stack(found)[site_cell.ravel()]
+
+
+_cache = GeometryCache()
+
+
+def hourly_geometry(lat, lon, days=None):
+    """
+    Sun position and clear-sky irradiance for every hour of the year, cached per grid cell.
+
+    Args:
+        lat, lon: scalars (giving (8760,) arrays) or (S,) arrays (giving (S, 8760))
+        days: optional 1-based days of year to return instead of the whole year
+
+    Returns:
+        dict: cos_zenith, azimuth, extraterrestrial, clear_sky_ghi,
+              clear_sky_dni and clear_sky_dhi
+    """
+    scalar = np.ndim(lat) == 0 and np.ndim(lon) == 0
+    tables = _cache.tables(lat, lon)
+    day_of_year = DAY_OF_YEAR
+    if days is not None:
+        days = np.asarray(days)
+        hours = ((days - 1)[:, None] * 24 + np.arange(24)).ravel()
+        tables = tables[..., hours]
+        day_of_year = DAY_OF_YEAR[hours]
+    if scalar:
+        tables = tables[0]
+
+    cos_zenith = tables[..., 0, :].astype(np.float64)
+    sky = clear_sky(cos_zenith, day_of_year)
+    return {
+        "cos_zenith": cos_zenith,
+        "azimuth": tables[..., 1, :].astype(np.float64),
+        "extraterrestrial": np.broadcast_to(extraterrestrial(day_of_year), cos_zenith.shape),
+        **{f"clear_sky_{name}": values for name, values in sky.items()},
+    }
+
+
+def cache_info():
+    return {"cells": len(_cache), "hits": _cache.hits, "misses": _cache.misses}
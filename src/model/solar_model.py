@@ -158,18 +158,44 @@ class SolarGHIModel:
         if not self.is_trained:
             raise ValueError("Model is not trained. Please train or load a model first.")
         
+        # Score all 12 months in a single model call
         months = list(range(1, 13))
-        monthly_ghi = []
-        
-        for month in months:
-            X_input = pd.DataFrame([[latitude, longitude, month]], columns=["lat", "lon", "month"])
-            pred = self.model.predict(X_input)[0]
-            monthly_ghi.append(pred)
+        X_input = pd.DataFrame({"lat": [latitude] * 12, "lon": [longitude] * 12, "month": months})
+        monthly_ghi = list(self.model.predict(X_input))
         
         yearly_ghi = np.mean(monthly_ghi) * 12  # Convert average to yearly total
         
         return monthly_ghi, yearly_ghi
 
+    def predict_batch(self, latitudes, longitudes):
+        """
+        Predict monthly and yearly GHI values for many locations in one model call
+
+        Args:
+            latitudes (array-like): Latitudes of the locations
+            longitudes (array-like): Longitudes of the locations
+
+        Returns:
+            tuple: (monthly_ghi, yearly_ghi) where
+                  monthly_ghi is an (n, 12) array
+                  yearly_ghi is an (n,) array of annual values
+        """
+        if not self.is_trained:
+            raise ValueError("Model is not trained. Please train or load a model first.")
+
+        latitudes = np.asarray(latitudes, dtype=float)
+        longitudes = np.asarray(longitudes, dtype=float)
+        X_input = pd.DataFrame({
+            "lat": np.repeat(latitudes, 12),
+            "lon": np.repeat(longitudes, 12),
+            "month": np.tile(np.arange(1, 13), len(latitudes)),
+        })
+        monthly_ghi = np.asarray(self.model.predict(X_input)).reshape(-1, 12)
+
+        yearly_ghi = monthly_ghi.mean(axis=1) * 12  # Convert average to yearly total
+
+        return monthly_ghi, yearly_ghi
+
 # Example usage:
 if __name__ == "__main__":
     model = SolarGHIModel()
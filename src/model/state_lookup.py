@@ -1,8 +1,15 @@
 import geopandas as gpd
+import numpy as np
 import pandas as pd
 from shapely.geometry import Point
 import json
 import os
+try:
+    from .logger import get_logger
+except ImportError:
+    from logger import get_logger
+
+logger = get_logger("state_lookup")
 
 class StateLookup:
     def __init__(self, geojson_path="INDIA_STATES.geojson"):
@@ -20,15 +27,14 @@ class StateLookup:
     def load_geojson(self):
         """Load and validate the GeoJSON file"""
         try:
-            print(f"Loading GeoJSON file: {self.geojson_path}")
+            logger.debug(f"Loading GeoJSON file: {self.geojson_path}")
             self.gdf = gpd.read_file(self.geojson_path)
-            print(f"✅ Successfully loaded GeoJSON with {len(self.gdf)} features")
             
-            # Print basic info
-            print(f"📊 File Info:")
-            print(f"   - Number of features: {len(self.gdf)}")
-            print(f"   - Geometry types: {self.gdf.geometry.type.value_counts().to_dict()}")
-            print(f"   - Available columns: {list(self.gdf.columns)}")
+            logger.debug("GeoJSON file info", extra={"fields": {
+                "features": len(self.gdf),
+                "geometry_types": self.gdf.geometry.type.value_counts().to_dict(),
+                "columns": list(self.gdf.columns),
+            }})
             
             # Find state name column
             self.find_state_column()
@@ -36,8 +42,14 @@ class StateLookup:
             # Validate geometries
             self.validate_geometries()
             
-        except Exception as e:
-            print(f"❌ Error loading GeoJSON: {str(e)}")
+            logger.info("State boundaries loaded", extra={"fields": {
+                "path": self.geojson_path,
+                "features": len(self.gdf),
+                "state_column": self.state_column,
+            }})
+            
+        except Exception:
+            logger.exception(f"Error loading GeoJSON: {self.geojson_path}")
             raise
     
     def find_state_column(self):
@@ -47,45 +59,45 @@ class StateLookup:
         for col in possible_columns:
             if col in self.gdf.columns:
                 self.state_column = col
-                print(f"✅ Found state column: '{col}'")
-                print(f"   Sample states: {list(self.gdf[col].head())}")
+                logger.debug(f"Found state column: '{col}'", extra={"fields": {
+                    "sample_states": list(self.gdf[col].head()),
+                }})
                 return
         
-        # If no standard column found, show all string columns
+        # If no standard column found, use the first string column as a guess
         string_columns = self.gdf.select_dtypes(include=['object']).columns
-        print(f"⚠️  No standard state column found. String columns: {list(string_columns)}")
         
         if len(string_columns) > 0:
-            # Use the first string column as a guess
             self.state_column = string_columns[0]
-            print(f"   Using '{self.state_column}' as state column")
-            print(f"   Sample values: {list(self.gdf[self.state_column].head())}")
+            logger.debug(f"No standard state column found, using '{self.state_column}'", extra={"fields": {
+                "string_columns": list(string_columns),
+                "sample_values": list(self.gdf[self.state_column].head()),
+            }})
+        else:
+            logger.warning("No state column found", extra={"fields": {"columns": list(self.gdf.columns)}})
     
     def validate_geometries(self):
         """Validate that all geometries are valid polygons"""
-        print(f"🔍 Validating geometries...")
-        
         # Check if geometries are valid
-        valid_count = self.gdf.geometry.is_valid.sum()
+        valid_count = int(self.gdf.geometry.is_valid.sum())
         total_count = len(self.gdf)
         
-        print(f"   - Valid geometries: {valid_count}/{total_count}")
-        
         if valid_count < total_count:
-            print(f"   ⚠️  {total_count - valid_count} invalid geometries found")
             # Try to fix invalid geometries
             self.gdf.geometry = self.gdf.geometry.buffer(0)
-            valid_after_fix = self.gdf.geometry.is_valid.sum()
-            print(f"   - After buffer fix: {valid_after_fix}/{total_count} valid")
-        
-        # Check geometry types
-        geom_types = self.gdf.geometry.type.value_counts()
-        print(f"   - Geometry types: {geom_types.to_dict()}")
+            valid_after_fix = int(self.gdf.geometry.is_valid.sum())
+            logger.warning(f"{total_count - valid_count} invalid geometries found", extra={"fields": {
+                "valid_after_buffer_fix": valid_after_fix,
+                "total": total_count,
+            }})
         
         # Check if we have the expected number of states (28 states + 8 UTs = 36)
-        expected_states = 36
-        actual_states = len(self.gdf)
-        print(f"   - Expected ~{expected_states} states/UTs, found {actual_states}")
+        logger.debug("Geometry validation", extra={"fields": {
+            "valid": valid_count,
+            "total": total_count,
+            "geometry_types": self.gdf.geometry.type.value_counts().to_dict(),
+            "expected_states": 36,
+        }})
     
     def get_state_from_coords(self, lat, lon):
         """
@@ -109,7 +121,33 @@ class StateLookup:
                 return row[self.state_column]
         
         return None
-    
+
+    def get_states(self, lats, lons):
+        """
+        Vectorized get_state_from_coords for many points
+
+        Args:
+            lats (array-like): Latitudes
+            lons (array-like): Longitudes
+
+        Returns:
+            np.ndarray: State name per point (object array), None where not found
+        """
+        if self.gdf is None or self.state_column is None:
+            raise ValueError("GeoJSON not loaded properly")
+
+        points = gpd.points_from_xy(np.asarray(lons, dtype=float), np.asarray(lats, dtype=float))
+        states = np.full(len(points), None, dtype=object)
+
+        # One spatial-index query for all points; where polygons overlap keep
+        # the first one, as the row-by-row scan does
+        point_idx, polygon_idx = self.gdf.sindex.query(points, predicate="within")
+        order = np.lexsort((polygon_idx, point_idx))
+        point_idx, polygon_idx = point_idx[order], polygon_idx[order]
+        first = np.unique(point_idx, return_index=True)[1]
+        states[point_idx[first]] = self.gdf[self.state_column].to_numpy()[polygon_idx[first]]
+        return states
+
     def test_coordinates(self):
         """Test the lookup with known Indian city coordinates"""
         test_cases = [
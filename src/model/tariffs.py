@@ -0,0 +1,193 @@
+"""
+State electricity tariffs and the vectorized bill / net-metering engine.
+
+Server-side port of the tables and calculations in src/Pages/TariffPage.js
+(TARIFF_DATA, SLAB_DATA, fallbackTariff, calculateSlabBill and
+calculatePostSolarBill). Slabs are held as cumulative NumPy arrays, so billing
+any number of consumption values is one searchsorted() plus a few array ops.
+"""
+import numpy as np
+
+INF = np.inf
+
+# Tariff and policy mapping (export rate in ₹/kWh; gross rate where a state has gross metering)
+TARIFF_DATA = {
+    "andhra pradesh": {"metering": "Net & Gross", "export": 2.4, "gross": 3.7, "policy": "APERC 2023 - % of APPC", "export_allowed": True, "status": "confirmed"},
+    "arunachal pradesh": {"metering": "Net", "export": 6.0, "gross": None, "policy": "Retail rate assumed", "export_allowed": True, "status": "estimated"},
+    "assam": {"metering": "Net & Gross", "export": 4.0, "gross": None, "policy": "No fixed rate, APPC-based", "export_allowed": True, "status": "estimated"},
+    "bihar": {"metering": "Net", "export": 6.3, "gross": None, "policy": "Retail tariff tier 2", "export_allowed": True, "status": "confirmed"},
+    "chhattisgarh": {"metering": "Net", "export": 6.1, "gross": None, "policy": "Avg domestic slab", "export_allowed": True, "status": "estimated"},
+    "goa": {"metering": "Net", "export": 6.0, "gross": None, "policy": "Based on low-tension tariff", "export_allowed": True, "status": "estimated"},
+    "gujarat": {"metering": "Net & Gross", "export": 5.5, "gross": 3.0, "policy": "Net: 1:1 until 2030, then 80% of retail", "export_allowed": True, "status": "confirmed"},
+    "haryana": {"metering": "Net & Gross", "export": 3.11, "gross": None, "policy": "HERC 2021", "export_allowed": True, "status": "confirmed"},
+    "himachal pradesh": {"metering": "Net", "export": 5.5, "gross": None, "policy": "Avg residential", "export_allowed": True, "status": "estimated"},
+    "jammu & kashmir": {"metering": "Net", "export": 5.8, "gross": None, "policy": "Per UT policy", "export_allowed": True, "status": "estimated"},
+    "jharkhand": {"metering": "Net & Gross", "export": 3.8, "gross": 4.16, "policy": "JSERC Tariff Order 2023-24", "export_allowed": True, "status": "confirmed"},
+    "karnataka": {"metering": "Net & Gross", "export": 2.9, "gross": None, "policy": "KERC Generic Tariff 2024", "export_allowed": True, "status": "confirmed"},
+    "kerala": {"metering": "Net", "export": 6.0, "gross": None, "policy": "KSERC policy", "export_allowed": True, "status": "confirmed"},
+    "madhya pradesh": {"metering": "Net", "export": 6.2, "gross": None, "policy": "MPSERC", "export_allowed": True, "status": "confirmed"},
+    "maharashtra": {"metering": "Net", "export": 6.1, "gross": None, "policy": "MSEDCL residential rate", "export_allowed": True, "status": "confirmed"},
+    "manipur": {"metering": "Net", "export": 5.8, "gross": None, "policy": "NE state average", "export_allowed": True, "status": "estimated"},
+    "meghalaya": {"metering": "Net", "export": 6.0, "gross": None, "policy": "-", "export_allowed": True, "status": "estimated"},
+    "uttar pradesh": {"metering": "Net", "export": 6.0, "gross": None, "policy": "PVUNL, NPCL rates", "export_allowed": True, "status": "confirmed"},
+    "west bengal": {"metering": "Net", "export": 4.5, "gross": None, "policy": "Net metering paused (2019)", "export_allowed": False, "status": "confirmed"},
+    "delhi": {"metering": "Net", "export": 6.0, "gross": None, "policy": "Adjusted at year-end", "export_allowed": True, "status": "confirmed"},
+    "ladakh": {"metering": "Net", "export": 5.8, "gross": None, "policy": "-", "export_allowed": True, "status": "estimated"},
+    "puducherry": {"metering": "Net", "export": 5.8, "gross": None, "policy": "-", "export_allowed": True, "status": "estimated"},
+    "daman & diu": {"metering": "Net", "export": 3.9, "gross": None, "policy": "Low domestic rate", "export_allowed": True, "status": "estimated"},
+    "andaman & nicobar": {"metering": "Net", "export": 6.5, "gross": None, "policy": "-", "export_allowed": True, "status": "estimated"},
+    "lakshadweep": {"metering": "Net", "export": 6.0, "gross": None, "policy": "-", "export_allowed": True, "status": "estimated"},
+    "chandigarh": {"metering": "Net", "export": 5.9, "gross": None, "policy": "Smart grid zone", "export_allowed": True, "status": "estimated"},
+    "mizoram": {"metering": "Net", "export": 5.5, "gross": None, "policy": "-", "export_allowed": True, "status": "estimated"},
+    "nagaland": {"metering": "Net", "export": 5.8, "gross": None, "policy": "-", "export_allowed": True, "status": "estimated"},
+    "odisha": {"metering": "Net", "export": 5.9, "gross": None, "policy": "CESU", "export_allowed": True, "status": "confirmed"},
+    "punjab": {"metering": "Net", "export": 0.0, "gross": None, "policy": "Surplus not credited", "export_allowed": False, "status": "confirmed"},
+    "rajasthan": {"metering": "Net", "export": 0.0, "gross": None, "policy": "Surplus goes to grid", "export_allowed": False, "status": "confirmed"},
+    "sikkim": {"metering": "Net", "export": 6.2, "gross": None, "policy": "-", "export_allowed": True, "status": "estimated"},
+    "tamil nadu": {"metering": "Net", "export": 6.0, "gross": None, "policy": "≤ 10 kW systems only", "export_allowed": True, "status": "confirmed"},
+    "telangana": {"metering": "Net", "export": 6.3, "gross": None, "policy": "TSSPDCL", "export_allowed": True, "status": "confirmed"},
+    "tripura": {"metering": "Net", "export": 6.0, "gross": None, "policy": "-", "export_allowed": True, "status": "estimated"},
+    "uttarakhand": {"metering": "Net", "export": 6.0, "gross": None, "policy": "UERC domestic slabs", "export_allowed": True, "status": "confirmed"},
+}
+
+FALLBACK_TARIFF = {"metering": "Net", "export": 5.0, "gross": None, "policy": "Fallback rate", "export_allowed": True, "status": None}
+
+# Slab mapping: state -> [(up_to_kwh, rate), ...] in increasing order of usage
+SLAB_DATA = {
+    "andhra pradesh": [(50, 2.60), (100, 3.25), (150, 4.88), (200, 5.63), (250, 6.38), (300, 6.88), (400, 7.38), (500, 7.88), (INF, 8.38)],
+    "telangana": [(50, 1.95), (100, 3.10), (200, 4.80), (300, 7.70), (400, 9.00), (800, 9.50), (INF, 10.00)],
+    "uttar pradesh": [(100, 5.50), (150, 6.00), (300, 6.50), (INF, 7.00)],
+    "delhi": [(200, 3.00), (400, 4.50), (800, 6.50), (1200, 7.00), (INF, 8.00)],
+    "haryana": [(50, 2.20), (100, 2.70), (150, 2.95), (300, 5.25), (500, 6.45), (INF, 7.10)],
+    "kerala": [(50, 3.30), (100, 4.15), (150, 5.25), (200, 7.10), (250, 8.35), (300, 6.55), (350, 7.40), (400, 7.75), (500, 8.05), (INF, 9.00)],
+    "rajasthan": [(50, 3.50), (150, 5.00), (300, 6.50), (INF, 8.00)],
+    "maharashtra": [(100, 3.50), (300, 5.00), (500, 6.50), (INF, 8.00)],
+    "gujarat": [(50, 3.80), (100, 4.80), (200, 6.00), (INF, 7.00)],
+    "bihar": [(50, 4.00), (100, 5.20), (200, 6.20), (INF, 7.20)],
+    "odisha": [(100, 3.50), (200, 4.50), (400, 5.50), (INF, 6.50)],
+    "chhattisgarh": [(100, 3.50), (200, 4.50), (400, 5.50), (INF, 6.50)],
+    "west bengal": [(102, 3.80), (180, 5.20), (INF, 6.80)],
+    "karnataka": [(INF, 5.80)],
+    "jharkhand": [(INF, 6.00)],
+    "punjab": [(300, 5.72), (500, 6.44), (INF, 6.80)],
+    "jammu & kashmir": [(100, 3.00), (200, 4.00), (INF, 5.50)],
+    "ladakh": [(100, 3.00), (200, 4.00), (INF, 5.50)],
+    "tripura": [(100, 3.50), (200, 4.80), (INF, 6.00)],
+    "mizoram": [(100, 3.50), (200, 4.80), (INF, 6.00)],
+    "manipur": [(100, 3.50), (200, 4.80), (INF, 6.00)],
+    "nagaland": [(100, 3.50), (200, 4.80), (INF, 6.00)],
+    "meghalaya": [(100, 3.50), (200, 4.80), (INF, 6.00)],
+    "arunachal pradesh": [(100, 3.50), (200, 4.80), (INF, 6.00)],
+    "sikkim": [(100, 3.50), (200, 4.80), (INF, 6.00)],
+    "puducherry": [(100, 3.00), (200, 4.50), (INF, 6.00)],
+    "andaman & nicobar": [(100, 3.00), (200, 4.50), (INF, 6.00)],
+    "chandigarh": [(100, 3.00), (200, 4.50), (INF, 6.00)],
+    "lakshadweep": [(100, 3.00), (200, 4.50), (INF, 6.00)],
+    "dadra & nagar haveli & diu": [(100, 3.00), (200, 4.50), (INF, 6.00)],
+    "himachal pradesh": [(60, 3.10), (250, 4.60), (INF, 6.00)],
+    "uttarakhand": [(100, 3.20), (200, 4.70), (INF, 6.20)],
+    "goa": [(100, 2.85), (200, 4.50), (INF, 6.00)],
+    "madhya pradesh": [(100, 3.75), (200, 5.00), (500, 6.25), (INF, 7.50)],
+    "tamil nadu": [(100, 3.00), (200, 4.50), (500, 6.00), (INF, 7.00)],
+    "assam": [(100, 3.50), (200, 4.80), (INF, 6.00)],
+}
+
+# States without slabs are billed at a flat rate, as in TariffPage.js
+FALLBACK_SLABS = [(INF, 5.0)]
+
+
+class StateTariff:
+    """Slab schedule and export policy of one state, stored as cumulative arrays"""
+
+    def __init__(self, name, info, slabs):
+        self.name = name
+        self.metering = info["metering"]
+        self.export_rate = float(info["export"])
+        self.gross_rate = info["gross"]
+        self.policy = info["policy"]
+        self.export_allowed = info["export_allowed"]
+        self.status = info["status"]
+        self.has_slabs = slabs is not FALLBACK_SLABS
+
+        # upper[i] is the top of slab i, lower[i] its bottom and base[i] the
+        # bill for all units below lower[i]
+        self.upper = np.array([up_to for up_to, _ in slabs], dtype=np.float64)
+        self.rates = np.array([rate for _, rate in slabs], dtype=np.float64)
+        self.lower = np.concatenate(([0.0], self.upper[:-1]))
+        self.base = np.concatenate(([0.0], np.cumsum((self.upper[:-1] - self.lower[:-1]) * self.rates[:-1])))
+
+    def bill(self, consumption):
+        """Slab-wise bill (₹) for any array of monthly consumption values (kWh)"""
+        units = np.maximum(np.asarray(consumption, dtype=np.float64), 0.0)
+        slab = np.searchsorted(self.upper, units, side="left")
+        return self.base[slab] + (units - self.lower[slab]) * self.rates[slab]
+
+    def post_solar_bill(self, consumption, generation):
+        """
+        Bill after solar offsets the most expensive (highest-slab) units first.
+
+        Removing units from the top slab down leaves exactly the slab fill of
+        the remaining consumption, so this is the bill of max(consumption -
+        generation, 0).
+        """
+        consumption = np.asarray(consumption, dtype=np.float64)
+        return self.bill(np.maximum(consumption - np.asarray(generation, dtype=np.float64), 0.0))
+
+    def export_income(self, consumption, generation):
+        """Income (₹) for surplus units exported to the grid, where the state allows it"""
+        if not self.export_allowed:
+            return np.zeros(np.broadcast(np.asarray(consumption), np.asarray(generation)).shape)
+        surplus = np.asarray(generation, dtype=np.float64) - np.asarray(consumption, dtype=np.float64)
+        return np.maximum(surplus, 0.0) * self.export_rate
+
+    def analyze(self, consumption, generation):
+        """
+        Price matching (or broadcastable) arrays of monthly consumption and generation (kWh).
+
+        Returns:
+            dict: per-pair arrays original_bill, new_bill, bill_savings,
+                  export_units, export_income and total_benefit
+        """
+        consumption = np.asarray(consumption, dtype=np.float64)
+        generation = np.asarray(generation, dtype=np.float64)
+        # The original bill only depends on consumption: price it before
+        # broadcasting so a batch of generation profiles bills it once
+        original_bill = self.bill(consumption)
+        consumption, generation, original_bill = np.broadcast_arrays(consumption, generation, original_bill)
+        new_bill = self.post_solar_bill(consumption, generation)
+        export_income = self.export_income(consumption, generation)
+        bill_savings = original_bill - new_bill
+        return {
+            "original_bill": original_bill,
+            "new_bill": new_bill,
+            "bill_savings": bill_savings,
+            "export_units": np.maximum(generation - consumption, 0.0),
+            "export_income": export_income,
+            "total_benefit": bill_savings + export_income,
+        }
+
+    def info(self):
+        return {
+            "state": self.name,
+            "metering": self.metering,
+            "export_rate": self.export_rate,
+            "gross_rate": self.gross_rate,
+            "policy": self.policy,
+            "export_allowed": self.export_allowed,
+            "status": self.status,
+            "slab_tariff": self.has_slabs,
+        }
+
+
+_tariffs = {
+    key: StateTariff(key, TARIFF_DATA.get(key, FALLBACK_TARIFF), SLAB_DATA.get(key, FALLBACK_SLABS))
+    for key in set(TARIFF_DATA) | set(SLAB_DATA)
+}
+_fallback = StateTariff("fallback", FALLBACK_TARIFF, FALLBACK_SLABS)
+
+
+def get_tariff(state_name):
+    """Tariff for a state name (case-insensitive, exact match like the frontend), else the fallback"""
+    if not state_name:
+        return _fallback
+    return _tariffs.get(state_name.strip().lower(), _fallback)
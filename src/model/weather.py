@@ -0,0 +1,137 @@
+"""
+OpenWeather 5-day forecast: fetching, parsing and a cloud-aware hourly GHI nowcast.
+
+The forecast comes in 3-hour steps. parse_forecast() keeps every step's
+temperature, humidity, cloud cover and wind as arrays, to_hourly()
+interpolates them to the middle of each hour, and nowcast() scales the
+clear-sky irradiance of solar_geometry.py by the cloud cover (Kasten and
+Czeplak, 1980), all steps at once.
+"""
+import os
+
+import numpy as np
+import requests
+
+try:
+    from .solar_geometry import IST_OFFSET_HOURS, for_timestamps
+except ImportError:
+    from solar_geometry import IST_OFFSET_HOURS, for_timestamps
+
+OPENWEATHER_BASE_URL = "http://api.openweathermap.org/data/2.5/forecast"
+FORECAST_STEPS = 40  # 5 days of 3-hourly readings
+REQUEST_TIMEOUT = 10  # Seconds
+
+# Cloud attenuation: GHI = clear-sky GHI * (1 - A * cloud_cover ** B), cloud cover 0-1
+KASTEN_A = 0.75
+KASTEN_B = 3.4
+
+IST_OFFSET = np.timedelta64(int(IST_OFFSET_HOURS * 60), "m")
+HALF_HOUR = np.timedelta64(30, "m")
+
+
+class ForecastError(ValueError):
+    """The forecast does not span enough steps to interpolate"""
+VARIABLES = ("temperature", "humidity", "cloud_cover", "wind_speed")
+
+# Keep-alive connections to OpenWeather; src/server.py swaps in a shared session
+http = requests.Session()
+
+
+def fetch_forecast(latitude, longitude):
+    """Raw 5-day / 3-hour forecast payload for a location (metric units)"""
+    params = {
+        "lat": latitude,
+        "lon": longitude,
+        "appid": os.getenv('OPENWEATHER_API_KEY'),
+        "units": "metric",  # For Celsius and m/s
+        "cnt": FORECAST_STEPS,
+    }
+    response = http.get(OPENWEATHER_BASE_URL, params=params, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return response.json()
+
+
+def parse_forecast(payload):
+    """
+    Forecast steps as arrays.
+
+    Returns:
+        dict: time (datetime64, UTC), temperature (°C), humidity (%),
+              cloud_cover (0-1) and wind_speed (m/s), one value per step
+    """
+    items = payload["list"]
+    return {
+        "time": np.array([item["dt"] for item in items], dtype="datetime64[s]"),
+        "temperature": np.array([item["main"]["temp"] for item in items], dtype=np.float64),
+        "humidity": np.array([item["main"].get("humidity", np.nan) for item in items], dtype=np.float64),
+        "cloud_cover": np.array([item.get("clouds", {}).get("all", 0) for item in items], dtype=np.float64) / 100,
+        "wind_speed": np.array([item["wind"]["speed"] for item in items], dtype=np.float64),
+    }
+
+
+def local_dates(times):
+    """IST calendar date of each UTC time"""
+    return (times.astype("datetime64[m]") + IST_OFFSET).astype("datetime64[D]")
+
+
+def daily_means(forecast, start_date, days=5):
+    """Mean temperature and wind per IST day from start_date, for the days the forecast covers"""
+    dates = local_dates(forecast["time"])
+    start = np.datetime64(start_date, "D")
+    daily = []
+    for date in start + np.arange(days):
+        day = dates == date
+        if day.any():
+            daily.append({
+                "date": str(date),
+                "temperature": round(float(forecast["temperature"][day].mean()), 2),
+                "wind_speed": round(float(forecast["wind_speed"][day].mean()), 2),
+            })
+    return daily
+
+
+def to_hourly(forecast):
+    """
+    Forecast linearly interpolated to hourly steps.
+
+    Hour k starts k hours after the first forecast step; values are taken at
+    the middle of the hour, which is also where the sun position is computed.
+    """
+    seconds = forecast["time"].astype(np.int64)
+    hours = (seconds[-1] - seconds[0]) // 3600 if len(seconds) >= 2 else 0
+    if hours < 1:
+        raise ForecastError(f"Forecast has {len(seconds)} steps, at least two an hour or more apart are needed")
+    start = forecast["time"][0] + np.arange(hours).astype("timedelta64[h]")
+    middle = (start + HALF_HOUR).astype("datetime64[s]").astype(np.int64)
+    hourly = {"time": start, "middle": middle.astype("datetime64[s]")}
+    for name in VARIABLES:
+        hourly[name] = np.interp(middle, seconds, forecast[name])
+    return hourly
+
+
+def cloud_adjusted_ghi(clear_sky_ghi, cloud_cover):
+    """GHI under the given cloud cover (0-1), same units as clear_sky_ghi"""
+    return clear_sky_ghi * (1 - KASTEN_A * np.clip(cloud_cover, 0.0, 1.0) ** KASTEN_B)
+
+
+def nowcast(latitude, longitude, forecast):
+    """
+    Hourly GHI (kWh/m² per hour) over the forecast window.
+
+    Returns:
+        dict: the to_hourly() series plus clear_sky_ghi, ghi and sun (the
+              for_timestamps() geometry, for the PV model)
+    """
+    hourly = to_hourly(forecast)
+    sun = for_timestamps(latitude, longitude, hourly["middle"])
+    hourly["clear_sky_ghi"] = sun["clear_sky_ghi"]
+    hourly["ghi"] = cloud_adjusted_ghi(sun["clear_sky_ghi"], hourly["cloud_cover"])
+    hourly["sun"] = sun
+    return hourly
+
+
+def daily_totals(hourly, values):
+    """Sum (..., H) hourly values per IST day; returns (dates, (..., D) totals)"""
+    dates = local_dates(hourly["time"])
+    starts = np.flatnonzero(np.r_[True, dates[1:] != dates[:-1]])
+    return dates[starts], np.add.reduceat(values, starts, axis=-1)
@@ -0,0 +1,86 @@
+"""
+Optional combined backend: the model API and the profile service in one process.
+
+Normally src/model/api.py (port 8001) and src/fApi/main.py (port 8000) run
+as separate processes. `app` here is a single ASGI application serving both:
+requests under /api/ go to the profile service and everything else to the
+model API, each through its own middleware (CORS, metrics, compression), so
+both behave exactly as they do standalone. One lifespan runs both apps'
+lifespans (model loading and warm-up, the database pool, the JWKS refresher)
+and gives the OpenWeather and JWKS clients one keep-alive HTTP session.
+
+In a combined worker the model artifacts, the database pool, the verified
+token and profile caches and the HTTP session exist once, and persistence
+code can call the prediction engines directly instead of over HTTP. /metrics
+returns both services' series (solar_model_* and solar_profile_*).
+
+Usage (from the repository root):
+    python -m src.server --workers 4
+listens on 8000 and 8001 at once, so the frontend needs no change; the
+workers are pre-forked from a master that has loaded the models, as with
+src/model/serve.py. A single uvicorn process also works:
+    uvicorn src.server:app --port 8000
+"""
+import argparse
+import os
+from contextlib import asynccontextmanager
+
+import requests
+from starlette.routing import Router
+
+from src.fApi import main as profile_api
+from src.model import api as model_api
+from src.model import serve, weather
+
+PROFILE_PREFIX = "/api/"
+
+
+@asynccontextmanager
+async def lifespan(_):
+    http = requests.Session()
+    weather.http = http
+    if profile_api.jwks_cache is not None:
+        profile_api.jwks_cache.session = http
+    try:
+        async with model_api.app.router.lifespan_context(model_api.app), \
+                profile_api.app.router.lifespan_context(profile_api.app):
+            yield
+    finally:
+        http.close()
+
+
+class CombinedApp:
+    """Dispatch by path between the two apps; lifespan events run both apps' lifespans"""
+
+    def __init__(self, model_app, profile_app, lifespan):
+        self.model_app = model_app
+        self.profile_app = profile_app
+        self._lifespan = Router(lifespan=lifespan)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan.lifespan(scope, receive, send)
+        elif scope["path"].startswith(PROFILE_PREFIX):
+            await self.profile_app(scope, receive, send)
+        else:
+            await self.model_app(scope, receive, send)
+
+
+app = CombinedApp(model_api.app, profile_api.app, lifespan)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the model API and the profile service in one set of workers")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--ports", type=int, nargs="+", default=[8000, 8001])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--log-level", default="warning")
+    args = parser.parse_args()
+
+    serve.preload()
+    sockets = [serve.bind_socket(args.host, port) for port in args.ports]
+    serve.serve(app, sockets, args.workers, args.log_level)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import asyncio
+import math
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+from src.model import api, battery, hourly
+from src.model.tariffs import get_tariff
+
+MONTHLY_GHI = np.array([120, 135, 170, 185, 195, 165, 140, 135, 145, 150, 130, 115], dtype=float)
+GENERATION = hourly.site_weather(28.61, 77.21, MONTHLY_GHI)["ghi"] * 5
+LOAD = hourly.synthesize_load([400]) + np.random.default_rng(3).uniform(0, 0.8, hourly.HOURS)
+
+# Reference: the same dispatch rules, one battery and one hour at a time
+def reference_dispatch(capacity, power, round_trip_efficiency=0.9, min_soc=0.1):
+    efficiency = math.sqrt(round_trip_efficiency)
+    soc = capacity * min_soc
+    grid_import = grid_export = discharged = 0.0
+    for gen, load in zip(GENERATION, LOAD):
+        if gen >= load:
+            charge = min(gen - load, power, (capacity - soc) / efficiency)
+            soc += charge * efficiency
+            grid_export += gen - load - charge
+        else:
+            out = min(load - gen, power, (soc - capacity * min_soc) * efficiency)
+            soc -= out / efficiency
+            discharged += out
+            grid_import += load - gen - out
+    return grid_import, grid_export, discharged
+
+def test_dispatch_matches_reference_for_every_candidate():
+    capacities = np.array([0.0, 2.0, 5.0, 5.0, 12.0])
+    powers = np.array([0.0, 1.0, 0.5, 5.0, 3.0])
+    results = battery.dispatch(GENERATION, LOAD, capacities, powers)
+    for i, (capacity, power) in enumerate(zip(capacities, powers)):
+        grid_import, grid_export, discharged = reference_dispatch(capacity, power)
+        assert np.isclose(results["import"][i].sum(), grid_import)
+        assert np.isclose(results["export"][i].sum(), grid_export)
+        if capacity:
+            assert np.isclose(results["cycles"][i], discharged / (capacity * 0.9))
+    # Bigger batteries never make self-sufficiency worse
+    assert np.all(np.diff(results["self_sufficiency"][[0, 1, 2, 4]]) >= 0)
+
+def test_no_battery_matches_hourly_simulation():
+    results = battery.dispatch(GENERATION, LOAD, [0.0], [0.0])
+    baseline = hourly.simulate_hourly(GENERATION, LOAD)
+    assert np.allclose(results["monthly_import"][0], baseline["monthly_import"])
+    assert np.isclose(results["self_sufficiency"][0], baseline["self_sufficiency"])
+
+def test_storage_is_worth_more_without_export():
+    capacities = np.array([0.0, 5.0, 10.0])
+    no_export = battery.evaluate_batteries(GENERATION, LOAD, get_tariff("West Bengal"), capacities, capacities / 2)
+    paid_export = battery.evaluate_batteries(GENERATION, LOAD, get_tariff("Kerala"), capacities, capacities / 2)
+    assert no_export["savings"][0] == 0 and np.isnan(no_export["payback_years"][0])
+    assert np.all(no_export["savings"][1:] > paid_export["savings"][1:])
+    assert np.allclose(no_export["payback_years"][1:], no_export["battery_cost"][1:] / no_export["savings"][1:])
+
+def test_unusable_battery_requests_are_rejected():
+    site = {"latitude": 28.61, "longitude": 77.21, "roof_area": 50, "area_unit": "sqm", "monthly_consumption": [400]}
+    for bad in ({"capacity_kw": 0}, {"capacity_kw": -3}, {"battery_capacities_kwh": [-1.0]},
+                {"battery_cost_per_kwh": -1}, {"battery_capacities_kwh": [1.0] * 11, "power_ratings_kw": [1.0] * 10}):
+        # Rejected before the models are needed, so the app's lifespan is not run
+        with pytest.raises(HTTPException) as rejected:
+            asyncio.run(api.battery_analysis(api.BatteryAnalysisRequest(**site, **bad)))
+        assert rejected.value.status_code == 422
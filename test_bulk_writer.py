@@ -0,0 +1,54 @@
+import asyncio
+import contextlib
+
+import pytest
+
+from src.fApi.bulk_writer import BulkWriter
+
+class StandInConnection:
+    """Records COPY batches and how the job's transaction ended"""
+
+    def __init__(self, fail_on_copy=None):
+        self.copies = []
+        self.outcome = None
+        self.fail_on_copy = fail_on_copy
+
+    @contextlib.asynccontextmanager
+    async def transaction(self):
+        try:
+            yield
+        except BaseException:
+            self.outcome = "rolled back"
+            raise
+        self.outcome = "committed"
+
+    async def copy_records_to_table(self, table, records, columns, schema_name, timeout):
+        if len(self.copies) == self.fail_on_copy:
+            raise ConnectionError("copy failed")
+        self.copies.append(list(records))
+
+def write(conn, count, batch_size=2, fail=False):
+    async def run():
+        async with BulkWriter("predictions", ("user_id", "input_data"), batch_size=batch_size, conn=conn) as writer:
+            await writer.write_many((f"user-{i}", "{}") for i in range(count))
+            if fail:
+                raise ValueError("job failed")
+        return writer
+    return asyncio.run(run())
+
+def test_batches_and_commits_once():
+    conn = StandInConnection()
+    writer = write(conn, 5)
+    assert [len(batch) for batch in conn.copies] == [2, 2, 1]
+    assert conn.outcome == "committed" and writer.stats["rows"] == 5 and writer.stats["batches"] == 3
+
+def test_job_is_rolled_back_on_error():
+    conn = StandInConnection()
+    with pytest.raises(ValueError):
+        write(conn, 3, fail=True)
+    assert conn.outcome == "rolled back"
+    # A failing final flush rolls back the batches already copied, too
+    conn = StandInConnection(fail_on_copy=2)
+    with pytest.raises(ConnectionError):
+        write(conn, 5)
+    assert conn.outcome == "rolled back" and len(conn.copies) == 2
@@ -0,0 +1,85 @@
+import numpy as np
+
+from src.model import hourly
+from src.model.tariffs import get_tariff
+
+MONTHLY_GHI = np.array([120, 135, 170, 185, 195, 165, 140, 135, 145, 150, 130, 115], dtype=float)
+MONTHLY_CONSUMPTION = np.array([300, 280, 350, 450, 550, 600, 520, 480, 450, 380, 320, 310], dtype=float)
+
+def test_profiles_keep_monthly_totals():
+    ghi = hourly.site_weather(28.61, 77.21, MONTHLY_GHI)["ghi"]
+    assert ghi.shape == (hourly.HOURS,)
+    assert np.allclose(hourly.monthly_totals(ghi), MONTHLY_GHI)
+    # No generation at midnight, most around solar noon
+    day = ghi.reshape(365, 24)
+    assert np.all(day[:, 0] == 0) and np.all(day.argmax(axis=1) >= 11) and np.all(day.argmax(axis=1) <= 13)
+
+    load = hourly.synthesize_load(MONTHLY_CONSUMPTION)
+    assert np.allclose(hourly.monthly_totals(load), MONTHLY_CONSUMPTION)
+    assert np.allclose(hourly.monthly_totals(hourly.synthesize_load([400])), 400)
+
+    typical = hourly.typical_day(load)
+    assert typical.shape == (12, 24)
+    assert np.allclose(typical.sum(axis=1) * hourly.DAYS_IN_MONTH, MONTHLY_CONSUMPTION)
+
+def test_tmy_is_rescaled_to_monthly_ghi(monkeypatch):
+    # One TMY location with a flat 0.5 kWh/m² in daylight hours, on a different scale from the model
+    site = np.zeros((1, len(hourly.TMY_DATASETS), hourly.HOURS))
+    site[0, hourly.TMY_GHI] = np.where(hourly.sun_elevation_factor(28.61, 77.21) > 0, 500.0, 0.0)
+    site[0, hourly.TMY_DIFF] = site[0, hourly.TMY_GHI] / 4
+    monkeypatch.setattr(hourly, "tmy", site)
+    monkeypatch.setattr(hourly, "tmy_coords", np.array([[28.6, 77.2]]))
+
+    weather = hourly.site_weather(28.61, 77.21, MONTHLY_GHI)
+    assert np.allclose(hourly.monthly_totals(weather["ghi"]), MONTHLY_GHI)
+    # Only the shape comes from the TMY: zero hours stay zero, diffuse keeps its share
+    assert np.all(weather["ghi"][site[0, hourly.TMY_GHI] == 0] == 0)
+    assert np.allclose(weather["diffuse"], weather["ghi"] / 4)
+
+def test_simulation_matches_hour_by_hour_loop():
+    rng = np.random.default_rng(7)
+    generation = hourly.site_weather(19.07, 72.88, MONTHLY_GHI)["ghi"] * 7.5
+    load = rng.uniform(0.1, 2.0, hourly.HOURS)
+    results = hourly.simulate_hourly(generation, load)
+
+    monthly_import = np.zeros(12)
+    monthly_export = np.zeros(12)
+    self_used = 0.0
+    for hour in range(hourly.HOURS):
+        month = hourly.MONTH_OF_HOUR[hour]
+        used = min(generation[hour], load[hour])
+        self_used += used
+        monthly_import[month] += load[hour] - used
+        monthly_export[month] += generation[hour] - used
+
+    assert np.allclose(results["monthly_import"], monthly_import)
+    assert np.allclose(results["monthly_export"], monthly_export)
+    assert np.isclose(results["self_consumption_ratio"], self_used / generation.sum())
+    assert np.isclose(results["self_sufficiency"], self_used / load.sum())
+    # Energy balance every hour
+    assert np.allclose(generation - results["export"] + results["import"], load)
+
+def test_batch_of_sites_matches_single_runs():
+    lats = np.array([8.5, 19.07, 28.61, 34.08])
+    lons = np.array([76.9, 72.88, 77.21, 74.8])
+    generation = hourly.disaggregate_monthly(MONTHLY_GHI * 5, hourly.sun_elevation_factor(lats, lons))
+    load = hourly.synthesize_load(MONTHLY_CONSUMPTION)
+    batch = hourly.simulate_hourly(generation, load)
+    for i in range(len(lats)):
+        single = hourly.simulate_hourly(generation[i], load)
+        assert np.allclose(batch["monthly_export"][i], single["monthly_export"])
+        assert np.isclose(batch["self_sufficiency"][i], single["self_sufficiency"])
+
+def test_metering_comparison():
+    generation = hourly.site_weather(28.61, 77.21, MONTHLY_GHI)["ghi"] * 7.5
+    results = hourly.simulate_hourly(generation, hourly.synthesize_load(MONTHLY_CONSUMPTION))
+    tariff = get_tariff("Gujarat")
+    metering = hourly.compare_metering(results, tariff)
+    expected = (tariff.bill(results["monthly_load"]) - tariff.bill(results["monthly_import"])
+                + results["monthly_export"] * tariff.export_rate).sum()
+    assert np.isclose(metering["net_billing"], expected)
+    # Monthly netting offsets evening imports too, so it is worth more with a low export rate
+    karnataka = hourly.compare_metering(results, get_tariff("Karnataka"))
+    assert karnataka["net_metering"] > karnataka["net_billing"] > 0
+    assert np.isclose(metering["gross_metering"], generation.sum() * 3.0)
+    assert hourly.compare_metering(results, get_tariff("Delhi"))["gross_metering"] is None
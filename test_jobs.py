@@ -0,0 +1,88 @@
+import os
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from src.model import jobs
+
+SITES = "site,Latitude,longitude,roof_area,unit\na,28.61,77.21,100,sqm\nb,19.07,72.87,1000,sqft\nc,12.97,77.59,,sqm\n" \
+        "d,22.57,88.36,50,sqm\ne,13.08,80.27,75,sqm\n"
+
+class StandInScorer:
+    """Scores without the models and counts the sites it was given"""
+
+    def __init__(self, after_call=None):
+        self.calls = []
+        self.after_call = after_call
+
+    def __call__(self, sites):
+        self.calls.append(len(sites))
+        if self.after_call:
+            self.after_call()
+        return pd.DataFrame({"area_sqm": sites["roof_area"].where(sites["unit"] == "sqm", sites["roof_area"] * 0.092903)})
+
+def queue_job(store, chunk_size=2):
+    job_id = "job1"
+    path = store.path(job_id, "input")
+    os.makedirs(store.path(job_id))
+    with open(path, "w") as f:
+        f.write(SITES)
+    fmt = jobs.detect_format(path)
+    return store.create(job_id, fmt, jobs.inspect_input(path, fmt), chunk_size=chunk_size)
+
+def test_job_runs_in_chunks_and_keeps_input_columns(tmp_path):
+    store = jobs.JobStore(str(tmp_path))
+    job = queue_job(store)
+    assert (job["status"], job["format"], job["total_rows"]) == ("queued", "csv", 5)
+
+    score = StandInScorer()
+    runner = jobs.JobRunner(store, score)
+    runner.process(store.claim("w1"), "w1")
+
+    assert score.calls == [2, 2, 1]
+    job = store.get("job1")
+    assert (job["status"], job["processed_rows"]) == ("done", 5)
+    result = pq.read_table(store.path("job1", "result.parquet")).to_pandas()
+    assert list(result.columns) == ["site", "Latitude", "longitude", "roof_area", "unit", "area_sqm"]
+    assert list(result["site"]) == ["a", "b", "c", "d", "e"]
+    assert result["area_sqm"][1] == pytest.approx(92.903) and pd.isna(result["roof_area"][2])
+
+def test_stopped_job_resumes_without_redoing_chunks(tmp_path):
+    store = jobs.JobStore(str(tmp_path))
+    queue_job(store)
+    first = jobs.JobRunner(store, None)
+    first.score = StandInScorer(after_call=first._stopping.set)  # Shut down during the first chunk
+    first.process(store.claim("w1"), "w1")
+    job = store.get("job1")
+    assert (job["status"], job["processed_rows"], job["worker"]) == ("queued", 2, None)
+
+    score = StandInScorer()
+    jobs.JobRunner(store, score).process(store.claim("w2"), "w2")
+    assert score.calls == [2, 1]
+    assert store.get("job1")["status"] == "done"
+    assert pq.read_metadata(store.path("job1", "result.parquet")).num_rows == 5
+
+def test_stale_running_job_is_reclaimed(tmp_path):
+    store = jobs.JobStore(str(tmp_path))
+    queue_job(store)
+    assert store.claim("w1")["id"] == "job1"
+    assert store.claim("w2") is None
+    assert store.claim("w2", stale_after=-1)["worker"] == "w2"
+    # The first worker lost the job and can no longer update it
+    assert not store.progress("job1", "w1", 2)
+    assert store.progress("job1", "w2", 2)
+
+def test_unusable_uploads_are_rejected(tmp_path):
+    missing = tmp_path / "missing.csv"
+    missing.write_text("lat,lon,area\n1,2,3\n")
+    with pytest.raises(jobs.JobError, match="unit"):
+        jobs.inspect_input(str(missing), "csv")
+    empty = tmp_path / "empty.csv"
+    empty.write_text("lat,lon,roof_area,unit\n")
+    with pytest.raises(jobs.JobError, match="no rows"):
+        jobs.inspect_input(str(empty), "csv")
+    broken = tmp_path / "broken.parquet"
+    broken.write_bytes(b"PAR1 not really")
+    with pytest.raises(jobs.JobError, match="Unreadable"):
+        jobs.inspect_input(str(broken), jobs.detect_format(str(broken)))
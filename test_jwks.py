@@ -0,0 +1,99 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+import rsa
+from jose import jwk, jwt as jose_jwt
+from jose.exceptions import JOSEError
+
+from src.fApi.jwks import JWKSCache, UnknownKeyError
+
+AUDIENCE = "authenticated"
+KEYS = {kid: rsa.newkeys(1024)[1].save_pkcs1().decode() for kid in ("key-1", "key-2")}
+
+class StandInJWKS:
+    """Local stand-in for the Supabase JWKS endpoint, counting requests"""
+
+    def __init__(self):
+        self.kids = ["key-1"]
+        self.status = 200
+        self.requests = 0
+        self.respond = threading.Event()  # Cleared to hold responses back
+        self.respond.set()
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stand_in.requests += 1
+                stand_in.respond.wait()
+                keys = [{**jwk.construct(KEYS[kid], "RS256").public_key().to_dict(), "kid": kid, "use": "sig"}
+                        for kid in stand_in.kids]
+                body = json.dumps({"keys": keys}).encode()
+                self.send_response(stand_in.status)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = HTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/auth/v1/.well-known/jwks.json"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+@pytest.fixture
+def server():
+    stand_in = StandInJWKS()
+    yield stand_in
+    stand_in.respond.set()
+    stand_in.server.shutdown()
+
+def token(kid, sub="user-1"):
+    claims = {"sub": sub, "aud": AUDIENCE, "exp": int(time.time()) + 60}
+    return jose_jwt.encode(claims, KEYS[kid], algorithm="RS256", headers={"kid": kid})
+
+def test_verifies_from_cache_without_network(server):
+    cache = JWKSCache(server.url)
+    assert cache.refresh() and len(cache) == 1
+    for _ in range(20):
+        assert cache.verify(token("key-1"), AUDIENCE)["sub"] == "user-1"
+    assert server.requests == 1
+
+def test_unknown_kid_schedules_one_refresh(server):
+    cache = JWKSCache(server.url, min_refresh_interval=60)
+    cache.refresh()
+    server.kids = ["key-1", "key-2"]  # Key rotation
+    server.respond.clear()  # Keep the refresh running until both lookups missed
+    with pytest.raises(UnknownKeyError):
+        cache.verify(token("key-2"), AUDIENCE)
+    with pytest.raises(UnknownKeyError):
+        cache.verify(token("key-2"), AUDIENCE)
+    server.respond.set()
+    for _ in range(100):
+        if len(cache) == 2:
+            break
+        time.sleep(0.01)
+    assert server.requests == 2
+    assert cache.verify(token("key-2"), AUDIENCE)["sub"] == "user-1"
+
+def test_failed_refresh_keeps_keys(server):
+    cache = JWKSCache(server.url)
+    cache.refresh()
+    server.status = 500
+    assert not cache.refresh()
+    assert cache.verify(token("key-1"), AUDIENCE)["sub"] == "user-1"
+
+def test_rejects_bad_tokens(server):
+    cache = JWKSCache(server.url)
+    cache.refresh()
+    forged = jose_jwt.encode({"sub": "admin", "aud": AUDIENCE}, "secret", algorithm="HS256", headers={"kid": "key-1"})
+    with pytest.raises(JOSEError):
+        cache.verify(forged, AUDIENCE)
+    with pytest.raises(JOSEError):
+        cache.verify(token("key-1")[:-4] + "AAAA", AUDIENCE)
+    expired = jose_jwt.encode({"sub": "user-1", "aud": AUDIENCE, "exp": int(time.time()) - 10}, KEYS["key-1"],
+                              algorithm="RS256", headers={"kid": "key-1"})
+    with pytest.raises(JOSEError):
+        cache.verify(expired, AUDIENCE)
@@ -0,0 +1,101 @@
+import numpy as np
+from starlette.testclient import TestClient
+
+from src.model import api
+from src.model.lifetime import payback_years, simulate_lifetime
+from src.model.tariffs import get_tariff
+
+MONTHLY_GENERATION = np.array([420, 480, 560, 600, 620, 540, 430, 410, 450, 480, 440, 400], dtype=float)
+MONTHLY_CONSUMPTION = np.array([300, 280, 350, 450, 550, 600, 520, 480, 450, 380, 320, 310], dtype=float)
+
+# Reference: plain year-by-year loop over the same assumptions
+def reference(state, system_cost, years, degradation, escalation, discount_rate, om_fraction=0.01, om_escalation=0.05):
+    tariff = get_tariff(state)
+    cash_flows = [-system_cost]
+    generation_total = 0.0
+    for year in range(years):
+        generation = MONTHLY_GENERATION * (1 - degradation) ** year
+        results = tariff.analyze(MONTHLY_CONSUMPTION, generation)
+        savings = (results["bill_savings"].sum() * (1 + escalation) ** year
+                   + results["export_income"].sum())
+        om = system_cost * om_fraction * (1 + om_escalation) ** year
+        cash_flows.append(savings - om)
+        generation_total += generation.sum()
+    npv = sum(cf / (1 + discount_rate) ** t for t, cf in enumerate(cash_flows))
+    return cash_flows, npv, generation_total
+
+def test_single_scenario_matches_loop():
+    for state in ("Delhi", "Maharashtra", "West Bengal", "Atlantis"):
+        results = simulate_lifetime(MONTHLY_GENERATION, MONTHLY_CONSUMPTION, get_tariff(state),
+                                    system_cost=200000, degradation=0.007, tariff_escalation=0.04, discount_rate=0.09)
+        cash_flows, npv, generation_total = reference(state, 200000, 25, 0.007, 0.04, 0.09)
+        assert np.allclose(results["cash_flow"], cash_flows)
+        assert np.isclose(results["npv"], npv)
+        assert np.isclose(results["lifetime_generation"], generation_total)
+
+        # NPV at the IRR is zero
+        irr = float(results["irr"])
+        assert abs(sum(cf / (1 + irr) ** t for t, cf in enumerate(cash_flows))) < 1e-3
+
+        # Cumulative cash flow crosses zero at the payback year
+        cumulative = np.cumsum(cash_flows)
+        year = int(results["payback_years"])
+        assert cumulative[year] < 0 <= cumulative[year + 1]
+
+def test_never_pays_back():
+    results = simulate_lifetime(MONTHLY_GENERATION, MONTHLY_CONSUMPTION, get_tariff("Delhi"), system_cost=1e9)
+    assert np.isnan(results["irr"]) and np.isnan(results["payback_years"])
+
+def test_payback_without_investment():
+    assert payback_years(np.array([[0.0, 100, 100], [-150.0, 100, 100]])).tolist() == [0.0, 1.5]
+    assert np.isnan(payback_years(np.array([[-500.0, 100, 100]]))[0])
+
+def test_costs_and_discount_rates_that_break_the_math_are_rejected():
+    client = TestClient(api.app)  # Not entered: the lifespan is not needed here
+    scenario = {"state": "Delhi", "monthly_generation": MONTHLY_GENERATION.tolist(), "monthly_consumption": [400]}
+    assert client.post("/lifetime-analysis", json={**scenario, "system_cost": 200000}).status_code == 200
+    for bad in ({"system_cost": 0}, {"system_cost": -200000}, {"system_cost": [200000, 0]}, {"capacity_kw": 0},
+                {"capacity_kw": 3, "discount_rate": -1}, {"system_cost": 200000, "discount_rate": [0.08, -1.5]}):
+        assert client.post("/lifetime-analysis", json={**scenario, **bad}).status_code == 422
+
+def test_sweep_matches_individual_runs():
+    tariff = get_tariff("Karnataka")
+    degradation, escalation, discount = np.meshgrid([0.0, 0.005, 0.01], [0.0, 0.03], [0.06, 0.1], indexing="ij")
+    sweep = simulate_lifetime(MONTHLY_GENERATION, MONTHLY_CONSUMPTION, tariff, 180000,
+                              degradation=degradation, tariff_escalation=escalation, discount_rate=discount)
+    assert sweep["npv"].shape == degradation.shape
+    assert sweep["cash_flow"].shape == degradation.shape + (26,)
+    for index in np.ndindex(degradation.shape):
+        single = simulate_lifetime(MONTHLY_GENERATION, MONTHLY_CONSUMPTION, tariff, 180000,
+                                   degradation=degradation[index], tariff_escalation=escalation[index],
+                                   discount_rate=discount[index])
+        for name in ("npv", "irr", "payback_years", "lcoe"):
+            assert np.isclose(sweep[name][index], single[name], equal_nan=True)
+
+def test_lcoe_without_degradation_or_om():
+    results = simulate_lifetime(MONTHLY_GENERATION, MONTHLY_CONSUMPTION, get_tariff("Delhi"), system_cost=100000,
+                                years=10, degradation=0.0, discount_rate=0.0, om_fraction=0.0)
+    assert np.isclose(results["lcoe"], 100000 / (MONTHLY_GENERATION.sum() * 10))
+
+def test_optimal_capacity_matches_brute_force():
+    from src.model.sizing import optimize_capacity
+
+    tariff = get_tariff("West Bengal")  # No export, so oversizing stops paying off
+    per_kw = MONTHLY_GENERATION / 4
+    for objective, metric, sign in (("npv", "npv", 1), ("payback", "payback_years", -1)):
+        result = optimize_capacity(per_kw, MONTHLY_CONSUMPTION, tariff, max_capacity=10, objective=objective, candidates=200)
+        brute = max(
+            (sign * float(simulate_lifetime(per_kw * kw, MONTHLY_CONSUMPTION, tariff, kw * 50000)[metric]), kw)
+            for kw in np.linspace(0.05, 10, 200)
+        )
+        # At least as good as the best of a same-size grid, and within the cap
+        assert sign * result[metric] >= brute[0] - 1e-6
+        assert 0 < result["capacity_kw"] <= 10
+
+def test_refined_capacity_never_scores_below_grid():
+    from src.model.sizing import optimize_capacity
+
+    # With an even fine grid, refining around this optimum skipped the grid point itself
+    result = optimize_capacity(MONTHLY_GENERATION / 4, MONTHLY_CONSUMPTION, get_tariff("Rajasthan"),
+                               max_capacity=10, cost_per_kw=60000)
+    assert result["npv"] >= result["grid"]["npv"].max()
@@ -0,0 +1,72 @@
+import asyncio
+import time
+
+from src.fApi.profile_cache import MemoryBackend, ProfileCache, RedisBackend
+
+PROFILE = {"firstName": "Asha", "lastName": "Rao", "mobileNumber": "9999999999", "isSocialLogin": True}
+
+class Clock:
+    def __init__(self):
+        self.now = time.monotonic()
+
+    def __call__(self):
+        return self.now
+
+class StandInRedis:
+    """The part of the redis.asyncio client RedisBackend uses, on a dict"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.data = {}
+
+    async def get(self, key):
+        value, expires_at = self.data.get(key, (None, None))
+        if expires_at is not None and self.clock() >= expires_at:
+            del self.data[key]
+            return None
+        return value
+
+    async def set(self, key, value, ex):
+        self.data[key] = (value.encode(), self.clock() + ex)
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+    async def aclose(self):
+        pass
+
+def test_entries_expire_after_ttl():
+    async def run():
+        clock = Clock()
+        cache = ProfileCache(MemoryBackend(clock=clock), ttl=60)
+        assert await cache.get("user-1") is None
+        await cache.set("user-1", PROFILE)
+        assert await cache.get("user-1") == PROFILE
+        clock.now += 60
+        assert await cache.get("user-1") is None
+    asyncio.run(run())
+
+def test_write_invalidates_across_workers_sharing_a_backend():
+    async def run():
+        shared = StandInRedis(Clock())
+        worker_a = ProfileCache(RedisBackend(client=shared), ttl=60)
+        worker_b = ProfileCache(RedisBackend(client=shared), ttl=60)
+        await worker_a.set("user-1", PROFILE)
+        assert await worker_b.get("user-1") == PROFILE
+        # A save handled by worker B is seen by worker A on its next read
+        await worker_b.invalidate("user-1")
+        assert await worker_a.get("user-1") is None
+    asyncio.run(run())
+
+def test_backend_errors_are_misses():
+    class Down:
+        async def get(self, *args):
+            raise ConnectionError("cache down")
+        set = delete = get
+
+    async def run():
+        cache = ProfileCache(Down())
+        assert await cache.get("user-1") is None
+        await cache.set("user-1", PROFILE)
+        await cache.invalidate("user-1")
+    asyncio.run(run())
@@ -0,0 +1,51 @@
+import numpy as np
+
+from src.model import hourly, pv_performance, solar_geometry
+
+MONTHLY_GHI = np.array([120, 135, 170, 185, 195, 165, 140, 135, 145, 150, 130, 115], dtype=float)
+LATS = np.array([8.5, 19.07, 28.61, 34.08])
+LONS = np.array([76.9, 72.88, 77.21, 74.8])
+
+def test_sun_position():
+    sun = solar_geometry.solar_position(LATS, LONS)
+    noon = sun["cos_zenith"].reshape(len(LATS), 365, 24).argmax(axis=2)
+    assert np.all((noon >= 11) & (noon <= 13))
+    # Around the March equinox the noon zenith angle is close to the latitude
+    equinox = (79 - 1) * 24
+    day = sun["cos_zenith"][:, equinox:equinox + 24]
+    assert np.allclose(np.degrees(np.arccos(day.max(axis=1))), LATS, atol=3)
+    # Sun in the east in the morning, south at noon, west in the evening (degrees from north)
+    azimuth = np.degrees(sun["azimuth"][2, equinox:equinox + 24])
+    assert 60 < azimuth[7] < 120 and 150 < azimuth[12] < 210 and 240 < azimuth[17] < 300
+
+def test_horizontal_plane_sees_ghi():
+    ghi = hourly.disaggregate_monthly(MONTHLY_GHI, hourly.sun_elevation_factor(LATS, LONS))
+    sun = solar_geometry.solar_position(LATS, LONS)
+    poa = pv_performance.plane_of_array(ghi, sun, tilt=np.zeros(len(LATS)))
+    assert np.allclose(poa, ghi)
+
+def test_tilted_south_plane_gains_over_the_year():
+    ghi = hourly.disaggregate_monthly(MONTHLY_GHI, hourly.sun_elevation_factor(LATS, LONS))
+    sun = solar_geometry.solar_position(LATS, LONS)
+    south = pv_performance.plane_of_array(ghi, sun, tilt=LATS).sum(axis=1)
+    north = pv_performance.plane_of_array(ghi, sun, tilt=LATS, azimuth=0).sum(axis=1)
+    assert np.all(south > north)
+    # Away from the equator a latitude tilt collects clearly more than flat
+    assert np.all(south[1:] > ghi.sum(axis=1)[1:] * 1.02)
+
+def test_temperature_derating():
+    assert np.isclose(pv_performance.temperature_derating(0.0, 25.0, 1.0), 1.0)
+    hot, windy = pv_performance.temperature_derating(1.0, np.array([40.0, 40.0]), np.array([0.0, 10.0]))
+    assert hot < windy < 1
+
+def test_batch_of_sites_matches_single_runs():
+    ghi = hourly.disaggregate_monthly(MONTHLY_GHI, hourly.sun_elevation_factor(LATS, LONS))
+    batch = pv_performance.pv_generation(LATS, LONS, ghi, 30.0, 2.0, array_kw=np.full(len(LATS), 7.5))
+    assert batch.shape == (len(LATS), hourly.HOURS)
+    for i in range(len(LATS)):
+        single = pv_performance.pv_generation(LATS[i], LONS[i], ghi[i], 30.0, 2.0, array_kw=7.5)
+        assert np.allclose(batch[i], single)
+    # Same ballpark as the constant 0.75 performance ratio on the module plane
+    poa = pv_performance.plane_of_array(ghi, solar_geometry.hourly_geometry(LATS, LONS), tilt=LATS)
+    ratio = batch.sum(axis=1) / (poa.sum(axis=1) * 7.5)
+    assert np.all((ratio > 0.7) & (ratio < 0.95))
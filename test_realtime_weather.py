@@ -0,0 +1,97 @@
+import asyncio
+
+import numpy as np
+import requests
+from starlette.testclient import TestClient
+
+from src.model import api
+from src.model.realtime_model import realtime_solar_model as realtime
+
+SITE = {"latitude": 28.61, "longitude": 77.21, "roof_area": 50, "area_unit": "sqm", "start_date": "2025-03-10"}
+
+def day(date, temperature, wind_speed=2.0):
+    return {"date": date, "temperature": temperature, "wind_speed": wind_speed}
+
+def weather_for(**fields):
+    return asyncio.run(api.realtime_weather(api.RealtimePredictionRequest(**SITE, **fields)))
+
+def test_per_day_inputs():
+    assert np.isnan(realtime.per_day(None, 3)).all()
+    assert np.array_equal(realtime.per_day(31.0, 3)[:1], [31.0]) and np.isnan(realtime.per_day(31.0, 3)[1:]).all()
+    days = realtime.per_day([30.0, None, 32.0], 5)
+    assert days[0] == 30.0 and np.isnan(days[1]) and days[2] == 32.0 and np.isnan(days[3:]).all()
+
+def test_forecast_blends_into_climatology():
+    normal = np.full(12, 20.0)
+    observed = realtime.per_day([30.0, 32.0], 12)
+    blended = realtime.blend_with_climatology(observed, normal, blend_days=4)
+    # Known days kept, then a linear fade from the last one, then the normal
+    assert np.allclose(blended[:2], [30.0, 32.0])
+    assert np.allclose(blended[2:7], [29.6, 27.2, 24.8, 22.4, 20.0])
+    assert np.allclose(blended[7:], 20.0)
+    # Nothing known: climatology throughout
+    assert np.allclose(realtime.blend_with_climatology(realtime.per_day(None, 12), normal), normal)
+
+def test_monthly_normals():
+    rows = np.zeros((4, len(realtime.columns)))
+    rows[:, realtime.MONTH] = [1, 1, 2, 13]
+    rows[:, realtime.AT] = [10.0, 20.0, 30.0, 40.0]
+    normals = realtime.monthly_normals(rows, [realtime.AT])
+    assert normals.shape == (14, 1)
+    assert np.allclose(normals[[1, 2, 13], 0], [15.0, 30.0, 40.0])
+
+def test_forecast_days_are_placed_by_date():
+    source, temperature, wind_speed = weather_for(forecast=[day("2025-03-10", 30.0, 1.0), day("2025-03-13", 33.0, 4.0)])
+    assert source == "forecast"
+    assert (temperature[0], wind_speed[0], temperature[3], wind_speed[3]) == (30.0, 1.0, 33.0, 4.0)
+    assert np.isnan(temperature[[1, 2]]).all() and np.isnan(temperature[4:]).all() and np.isnan(wind_speed[4:]).all()
+    # Days before start_date or past the horizon are dropped
+    early = [day("2025-03-08", 28.0), day("2025-03-09", 29.0), day("2025-03-10", 30.0), day("2025-04-20", 35.0)]
+    source, temperature, _ = weather_for(forecast=early)
+    assert temperature[0] == 30.0 and np.isnan(temperature[1:]).all()
+
+def test_weather_falls_back_in_order(monkeypatch):
+    def unreachable(latitude, longitude):
+        raise requests.ConnectionError("OpenWeather is down")
+    monkeypatch.setattr(api.weather, "fetch_forecast", unreachable)
+    # A forecast wins over single values, which win over fetching
+    source, temperature, _ = weather_for(forecast=[day("2025-03-11", 29.0)], temperature=31.5)
+    assert source == "forecast" and np.isnan(temperature[0]) and temperature[1] == 29.0
+    source, temperature, wind_speed = weather_for(temperature=31.5)
+    assert source == "current" and temperature[0] == 31.5
+    assert np.isnan(temperature[1:]).all() and np.isnan(wind_speed).all()
+    source, temperature, wind_speed = weather_for()
+    assert source == "climatology" and np.isnan(temperature).all() and np.isnan(wind_speed).all()
+
+def test_fetched_forecast_is_averaged_per_day(monkeypatch):
+    # 3-hourly steps from 2025-03-10 00:00 IST (18:30 UTC the day before)
+    steps = [{"dt": 1741545000 + 3 * 3600 * i, "main": {"temp": 20.0 + i}, "wind": {"speed": 3.0}} for i in range(16)]
+    monkeypatch.setattr(api.weather, "fetch_forecast", lambda latitude, longitude: {"list": steps})
+    source, temperature, wind_speed = weather_for()
+    assert source == "openweather"
+    assert np.allclose(temperature[:2], [23.5, 31.5]) and np.allclose(wind_speed[:2], 3.0)
+    assert np.isnan(temperature[2:]).all()
+
+def test_predict_realtime_uses_placed_weather(monkeypatch):
+    class StandInLookup:
+        def get_state_from_coords(self, latitude, longitude):
+            return "Delhi"
+    calls = []
+    def stand_in_model(lat, lon, start_date, temperature, wind_speed, days):
+        calls.append((temperature, wind_speed))
+        return np.full(days, 5.0), 5.0 * days
+    monkeypatch.setattr(api, "state_lookup", StandInLookup())
+    monkeypatch.setattr(api, "predict_realtime_ghi", stand_in_model)
+
+    client = TestClient(api.app)  # Not entered, so the lifespan (and its model loading) does not run
+    forecast = [day("2025-03-10", 30.0), day("2025-03-12", 32.0)]
+    response = client.post("/predict-realtime", json={**SITE, "forecast": forecast})
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["weather_source"], body["forecast_days"]) == ("forecast", 2)
+    assert body["daily_labels"][:3] == ["2025-03-10", "2025-03-11", "2025-03-12"] and len(body["daily_ghi"]) == 30
+    temperature, _ = calls[0]
+    assert temperature[0] == 30.0 and np.isnan(temperature[1]) and temperature[2] == 32.0
+
+    response = client.post("/predict-realtime", json={**SITE, "forecast": [day("2025-03-1O", 30.0)]})
+    assert response.status_code == 422 and len(calls) == 1
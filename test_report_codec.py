@@ -0,0 +1,44 @@
+from datetime import date, timedelta
+
+import pytest
+
+from src.fApi import report_codec
+
+DAYS = [(date(2025, 2, 20) + timedelta(days=i)).isoformat() for i in range(30)]
+
+def test_series_and_labels_round_trip():
+    prediction = {
+        "monthly_ghi": [152.37, 160.0, 171.25] * 4, "yearly_ghi": 1935.48,
+        "monthly_generation": [98765.43, 2104.5, 0] * 4, "yearly_generation": 403479.72,
+        "monthly_labels": report_codec.MONTH_LABELS, "state": "KERALA",
+    }
+    realtime = {"daily_ghi": [5.31] * 30, "daily_generation": [61.07] * 30, "daily_labels": DAYS, "state": "KERALA"}
+    for result in (prediction, realtime):
+        inputs = {"latitude": "10.85", "predictionMode": "historical"}
+        new_input, new_result, blob = report_codec.compact(inputs, result)
+        assert set(new_result) == {key for key in result if not isinstance(result[key], list)}
+        assert report_codec.expand(new_input, new_result, blob) == (inputs, result)
+
+def test_what_cannot_be_packed_stays_json():
+    result = {"daily_generation": [1.5, None], "daily_labels": ["2025-02-20", "2025-02-22"], "monthly_labels": ["Jan"]}
+    inputs = {"monthly_generation": None, "daily_generation": [4.25, 3.5]}
+    new_input, new_result, blob = report_codec.compact(inputs, result)
+    assert new_result == result and new_input == {"monthly_generation": None}
+    assert report_codec.expand(new_input, new_result, blob) == (inputs, result)
+
+def test_rows_without_a_blob_and_corrupt_blobs():
+    assert report_codec.expand({"a": 1}, {"b": [2]}, None) == ({"a": 1}, {"b": [2]})
+    _, _, blob = report_codec.compact({}, {"daily_ghi": [5.0] * 30, "daily_labels": DAYS})
+    for bad in (blob[:-3], b"\x09" + blob[1:]):
+        with pytest.raises(report_codec.CodecError):
+            report_codec.expand({}, {}, bad)
+
+def test_series_float32_cannot_hold_are_kept_exact():
+    large = [225000.37, 1.5] * 6  # Above 2^17 float32 cannot hold 2 decimals
+    precise = [1 / 3] * 30  # More decimals than DECIMALS
+    new_input, new_result, blob = report_codec.compact({"monthly_generation": large}, {"daily_ghi": precise})
+    assert new_input == {} and new_result == {"daily_ghi": precise}
+    assert report_codec.expand(new_input, new_result, blob) == ({"monthly_generation": large}, {"daily_ghi": precise})
+    small = report_codec.compact({}, {"monthly_ghi": [152.37] * 12})[2]
+    large_blob = report_codec.compact({}, {"monthly_ghi": large})[2]
+    assert len(large_blob) - len(small) == 4 * 12
@@ -0,0 +1,30 @@
+import datetime
+import uuid
+
+import pytest
+
+from src.fApi import reports
+
+def test_cursor_round_trips_bigint_and_uuid_ids():
+    created_at = datetime.datetime(2025, 3, 1, 12, 30, tzinfo=datetime.timezone.utc)
+    assert reports.decode_cursor(reports.encode_cursor(created_at, 42)) == (created_at, 42)
+    report_id = uuid.uuid4()
+    assert reports.decode_cursor(reports.encode_cursor(created_at, report_id)) == (created_at, str(report_id))
+    for bad in ("", "not a cursor", "e30"):
+        with pytest.raises(reports.InvalidCursor):
+            reports.decode_cursor(bad)
+
+def test_summary_projects_scalars_only():
+    row = {
+        "id": 7,
+        "created_at": datetime.datetime(2025, 3, 1, tzinfo=datetime.timezone.utc),
+        "state": "Kerala", "month": "March", "unitsConsumed": "250",
+        "billSavings": "812.5", "originalBill": "1400", "newBill": "587.5", "yearlyGeneration": None,
+    }
+    summary = reports._summary("financial-analyses", row)
+    assert summary["id"] == "7" and summary["state"] == "Kerala"
+    assert summary["billSavings"] == 812.5 and summary["yearlyGeneration"] is None
+    # Every list query pages on the (user_id, created_at, id) index key
+    for first_page, next_page in reports.LIST_SQL.values():
+        assert "ORDER BY created_at DESC, id DESC" in first_page
+        assert "(created_at, id) < ($3, $4)" in next_page
@@ -0,0 +1,24 @@
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+from starlette.testclient import TestClient
+
+from src.server import CombinedApp
+
+def test_dispatches_by_path_and_runs_one_lifespan():
+    events = []
+    model_app, profile_app = FastAPI(), FastAPI()
+    model_app.get("/predict")(lambda: {"app": "model"})
+    profile_app.get("/api/user-profile")(lambda: {"app": "profile"})
+
+    @asynccontextmanager
+    async def lifespan(_):
+        events.append("startup")
+        yield
+        events.append("shutdown")
+
+    with TestClient(CombinedApp(model_app, profile_app, lifespan)) as client:
+        assert client.get("/predict").json() == {"app": "model"}
+        assert client.get("/api/user-profile").json() == {"app": "profile"}
+        assert client.get("/api/predict").status_code == 404
+    assert events == ["startup", "shutdown"]
@@ -0,0 +1,56 @@
+import numpy as np
+
+from src.model import solar_geometry
+
+LATS = np.array([8.5, 19.07, 28.61, 34.08])
+LONS = np.array([76.9, 72.88, 77.21, 74.8])
+
+def test_cached_tables_match_direct_computation():
+    solar_geometry._cache.clear()
+    cached = solar_geometry.hourly_geometry(LATS, LONS)
+    direct = solar_geometry.solar_position(LATS, LONS)
+    assert cached["cos_zenith"].shape == (len(LATS), solar_geometry.HOURS)
+    # Sites are snapped to the centre of their 0.1° cell
+    assert np.allclose(cached["cos_zenith"], direct["cos_zenith"], atol=2e-3)
+    assert np.allclose(cached["extraterrestrial"], direct["extraterrestrial"])
+    assert solar_geometry.cache_info()["misses"] == len(LATS)
+
+    # A second call, and a nearby site in the same cell, hit the cache
+    again = solar_geometry.hourly_geometry(LATS[2] + 0.01, LONS[2] - 0.01)
+    assert again["cos_zenith"].shape == (solar_geometry.HOURS,)
+    assert np.array_equal(again["cos_zenith"], cached["cos_zenith"][2])
+    assert solar_geometry.cache_info() == {"cells": len(LATS), "hits": 1, "misses": len(LATS)}
+
+def test_cache_evicts_least_recently_used_cells():
+    cache = solar_geometry.GeometryCache(max_cells=2)
+    cache.tables(LATS[:2], LONS[:2])
+    cache.tables(LATS[0], LONS[0])
+    cache.tables(LATS[2], LONS[2])
+    assert len(cache) == 2
+    cache.tables(LATS[0], LONS[0])
+    assert (cache.hits, cache.misses) == (2, 3)
+
+def test_clear_sky_is_bounded_and_dark_at_night():
+    sky = solar_geometry.hourly_geometry(LATS, LONS)
+    night = sky["cos_zenith"] <= 0
+    assert np.all(sky["clear_sky_ghi"][night] == 0)
+    assert np.all(sky["clear_sky_ghi"] <= solar_geometry.SOLAR_CONSTANT * 1.04)
+    # Clear-sky noon GHI in India is roughly 0.8-1.1 kW/m²
+    noon = sky["clear_sky_ghi"].reshape(len(LATS), 365, 24).max(axis=2)
+    assert np.all((noon > 0.5) & (noon < 1.15))
+    assert np.allclose(sky["clear_sky_ghi"],
+                       sky["clear_sky_dni"] * np.maximum(sky["cos_zenith"], 0) + sky["clear_sky_dhi"])
+
+def test_subset_of_days():
+    year = solar_geometry.hourly_geometry(LATS, LONS)
+    days = solar_geometry.hourly_geometry(LATS, LONS, days=[1, 172])
+    assert days["cos_zenith"].shape == (len(LATS), 48)
+    assert np.array_equal(days["clear_sky_ghi"][:, 24:], year["clear_sky_ghi"][:, 171 * 24:172 * 24])
+
+def test_timestamps_are_converted_from_utc():
+    # 06:30 UTC on 21 June is 12:00 IST
+    sun = solar_geometry.for_timestamps(LATS, LONS, np.array(["2024-06-20T06:30", "2024-06-20T18:30"]))
+    direct = solar_geometry.solar_position(LATS, LONS, np.array([172, 173]), np.array([12, 0]), 0)
+    assert sun["clear_sky_ghi"].shape == (len(LATS), 2)
+    assert np.allclose(sun["cos_zenith"], direct["cos_zenith"])
+    assert np.all(sun["clear_sky_ghi"][:, 0] > 0.7) and np.all(sun["clear_sky_ghi"][:, 1] == 0)
@@ -0,0 +1,78 @@
+import numpy as np
+
+from src.model.tariffs import SLAB_DATA, TARIFF_DATA, get_tariff
+
+# Reference: direct ports of calculateSlabBill / calculatePostSolarBill and the
+# export income rule from src/Pages/TariffPage.js, one value at a time
+def js_slab_bill(consumption, slabs):
+    bill = 0
+    prev = 0
+    for up_to, rate in slabs:
+        slab_units = max(0, min(consumption, up_to) - prev)
+        bill += slab_units * rate
+        prev = up_to
+        if consumption <= up_to:
+            break
+    return bill
+
+def js_post_solar_bill(consumption, solar_gen, slabs):
+    remaining_solar = solar_gen
+    slab_alloc = []
+    prev = 0
+    for up_to, rate in slabs:
+        slab_alloc.append(max(0, min(consumption, up_to) - prev))
+        prev = up_to
+        if consumption <= up_to:
+            break
+    for i in range(len(slab_alloc) - 1, -1, -1):
+        if remaining_solar <= 0:
+            break
+        used = min(slab_alloc[i], remaining_solar)
+        slab_alloc[i] -= used
+        remaining_solar -= used
+    return sum(units * slabs[i][1] for i, units in enumerate(slab_alloc))
+
+def js_analysis(state, consumed, produced):
+    key = state.strip().lower()
+    info = TARIFF_DATA.get(key, {"export": 5.0, "export_allowed": True})
+    slabs = SLAB_DATA.get(key)
+    if slabs:
+        original_bill = js_slab_bill(consumed, slabs)
+        new_bill = js_post_solar_bill(consumed, produced, slabs)
+    else:
+        original_bill = consumed * 5.0
+        new_bill = max(0, consumed - produced) * 5.0
+    export_income = 0.0
+    if info["export_allowed"] and produced > consumed:
+        export_income = (produced - consumed) * info["export"]
+    return original_bill, new_bill, export_income
+
+def test_vectorized_engine_matches_tariff_page():
+    rng = np.random.default_rng(7)
+    consumption = np.concatenate([rng.uniform(0, 1500, 200), [0, 50, 100, 102, 300, 800, 1200]])
+    generation = np.concatenate([rng.uniform(0, 1500, 200), [0, 50, 0, 200, 150, 900, 1200]])
+
+    for state in sorted(set(TARIFF_DATA) | set(SLAB_DATA)) + ["Unknown Location", "GUJARAT"]:
+        results = get_tariff(state).analyze(consumption, generation)
+        for i, (consumed, produced) in enumerate(zip(consumption, generation)):
+            original_bill, new_bill, export_income = js_analysis(state, consumed, produced)
+            assert np.isclose(results["original_bill"][i], original_bill), state
+            assert np.isclose(results["new_bill"][i], new_bill), state
+            assert np.isclose(results["export_income"][i], export_income), state
+
+def test_state_lookup_is_case_insensitive_with_fallback():
+    assert get_tariff("  West Bengal ").name == "west bengal"
+    assert not get_tariff("WEST BENGAL").export_allowed
+    fallback = get_tariff("Unknown Location")
+    assert fallback.export_rate == 5.0 and not fallback.has_slabs
+
+def test_single_consumption_value_broadcasts():
+    results = get_tariff("Delhi").analyze([400], [0, 100, 500])
+    assert np.allclose(results["original_bill"], [1500, 1500, 1500])
+    assert np.allclose(results["export_units"], [0, 0, 100])
+
+if __name__ == "__main__":
+    test_vectorized_engine_matches_tariff_page()
+    test_state_lookup_is_case_insensitive_with_fallback()
+    test_single_consumption_value_broadcasts()
+    print("✅ Tariff engine matches TariffPage.js")
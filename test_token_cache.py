@@ -0,0 +1,50 @@
+import time
+
+import jwt
+
+from src.fApi.token_cache import VerifiedTokenCache
+
+SECRET = "test-secret-at-least-32-bytes-long!"
+
+class Clock:
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self):
+        return self.now
+
+def token(sub, exp):
+    return jwt.encode({"sub": sub, "aud": "authenticated", "exp": exp}, SECRET, algorithm="HS256")
+
+def test_cached_until_expiry_only():
+    clock = Clock()
+    cache = VerifiedTokenCache(clock=clock)
+    exp = int(clock.now) + 60
+    t = token("user-1", exp)
+    assert cache.get(t) is None
+    cache.put(t, jwt.decode(t, SECRET, algorithms=["HS256"], audience="authenticated"))
+    assert cache.get(t)["sub"] == "user-1"
+    clock.now = exp
+    assert cache.get(t) is None and len(cache) == 0
+
+def test_modified_and_expired_tokens_are_not_served():
+    clock = Clock()
+    cache = VerifiedTokenCache(clock=clock)
+    t = token("user-1", int(clock.now) + 60)
+    cache.put(t, {"sub": "user-1", "exp": int(clock.now) + 60})
+    assert cache.get(t[:-2] + ("AA" if not t.endswith("AA") else "BB")) is None
+    # Already expired, or without an expiry: never cached
+    cache.put("expired", {"sub": "user-2", "exp": int(clock.now) - 1})
+    cache.put("forever", {"sub": "user-3"})
+    assert cache.get("expired") is None and cache.get("forever") is None
+
+def test_least_recently_used_is_evicted():
+    clock = Clock()
+    cache = VerifiedTokenCache(max_size=2, clock=clock)
+    claims = {"exp": int(clock.now) + 60}
+    cache.put("a", {**claims, "sub": "a"})
+    cache.put("b", {**claims, "sub": "b"})
+    cache.get("a")
+    cache.put("c", {**claims, "sub": "c"})
+    assert len(cache) == 2
+    assert cache.get("b") is None and cache.get("a")["sub"] == "a" and cache.get("c")["sub"] == "c"
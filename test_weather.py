@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from starlette.testclient import TestClient
+
+from src.model import api, weather
+
+START = 1718841600  # 2024-06-20 00:00 UTC (05:30 IST)
+
+def forecast_payload(clouds, steps=40):
+    """OpenWeather-style 3-hourly payload with the given cloud cover (%) per step"""
+    return {"list": [{
+        "dt": START + 3 * 3600 * i,
+        "main": {"temp": 30.0 + (i % 8), "humidity": 60},
+        "clouds": {"all": clouds[i % len(clouds)]},
+        "wind": {"speed": 3.0},
+    } for i in range(steps)]}
+
+def test_parse_and_daily_means():
+    forecast = weather.parse_forecast(forecast_payload([0, 50, 100]))
+    assert forecast["time"][0] == np.datetime64("2024-06-20T00:00:00")
+    assert np.allclose(forecast["cloud_cover"][:3], [0, 0.5, 1])
+    daily = weather.daily_means(forecast, "2024-06-20")
+    assert [day["date"] for day in daily] == ["2024-06-20", "2024-06-21", "2024-06-22", "2024-06-23", "2024-06-24"]
+    # IST days: the first one holds the 00:00-18:00 UTC steps
+    assert daily[0]["temperature"] == round(float(np.mean(30.0 + np.arange(7))), 2)
+    assert daily[1]["wind_speed"] == 3.0
+
+def test_hourly_interpolation():
+    hours = weather.to_hourly(weather.parse_forecast(forecast_payload([0, 60])))
+    assert len(hours["time"]) == 39 * 3
+    # Middle of the second hour (01:30) is halfway between 0% and 60% cloud
+    assert np.isclose(hours["cloud_cover"][1], 0.3)
+    assert np.isclose(hours["temperature"][1], 30.5)
+
+def test_too_short_forecasts_are_rejected(monkeypatch):
+    for steps in (0, 1):
+        with pytest.raises(weather.ForecastError):
+            weather.to_hourly(weather.parse_forecast(forecast_payload([0], steps=steps)))
+
+    class StandInLookup:
+        def get_state_from_coords(self, latitude, longitude):
+            return "Delhi"
+    monkeypatch.setattr(api, "state_lookup", StandInLookup())
+    monkeypatch.setattr(api.weather, "fetch_forecast", lambda latitude, longitude: forecast_payload([0], steps=1))
+    site = {"latitude": 28.61, "longitude": 77.21, "roof_area": 50, "area_unit": "sqm"}
+    assert TestClient(api.app).post("/nowcast", json=site).status_code == 502  # Lifespan not run
+
+def test_clouds_reduce_ghi():
+    clear = weather.nowcast(28.61, 77.21, weather.parse_forecast(forecast_payload([0])))
+    overcast = weather.nowcast(28.61, 77.21, weather.parse_forecast(forecast_payload([100])))
+    assert np.allclose(clear["ghi"], clear["clear_sky_ghi"])
+    assert np.allclose(overcast["ghi"], clear["ghi"] * (1 - weather.KASTEN_A))
+    # Five IST days of sunshine, nothing at night
+    dates, daily = weather.daily_totals(clear, clear["ghi"])
+    assert len(dates) == 6 and np.all(daily[1:5] > 6)
+    assert np.all(clear["ghi"][clear["sun"]["cos_zenith"] <= 0] == 0)